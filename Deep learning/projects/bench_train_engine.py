@@ -0,0 +1,109 @@
+"""Compare the notebook's DataLoader loop with train_engine.Trainer on samples/s and time to a target loss.
+
+students.csv only has ten rows, so this trains on --samples synthetic
+students drawn around the linear trend of the real ones (plus noise with
+standard deviation --noise, which puts the best reachable MSE near its
+square). Each run trains a fresh model from the same seed for up to
+--epochs and stops timing once the validation MSE reaches --target-loss.
+
+    python bench_train_engine.py --samples 20000 --epochs 20 --target-loss 9.7
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from torch import nn
+from torch.utils.data import DataLoader, TensorDataset
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from train_engine import BASE_LR, FEATURES, TARGET, Trainer, as_tensor, build_model
+
+
+def synthetic_students(samples, noise, seed=0):
+    """Scaled train/validation tensors following a least-squares fit of students.csv"""
+    df = pd.read_csv(HERE / "students.csv")
+    design = np.column_stack([df[FEATURES].to_numpy(dtype=float), np.ones(len(df))])
+    weights = np.linalg.lstsq(design, df[TARGET].to_numpy(dtype=float), rcond=None)[0]
+
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(0, 10, samples), rng.integers(4, 10, samples), rng.integers(55, 101, samples)])
+    y = np.column_stack([X, np.ones(samples)]) @ weights + rng.normal(0, noise, samples)
+    X = (X - X.mean(axis=0)) / X.std(axis=0)
+    split = int(samples * 0.8)
+    return (as_tensor(X[:split]), as_tensor(y[:split]).unsqueeze(1),
+            as_tensor(X[split:]), as_tensor(y[split:]).unsqueeze(1))
+
+
+def notebook_loop(X, y, X_val, y_val, epochs, target_loss):
+    """The notebook's training cell, with a validation pass after each epoch"""
+    model = build_model()
+    loader = DataLoader(TensorDataset(X, y), batch_size=4, shuffle=True)
+    loss_fn = nn.MSELoss()
+    optimizer = torch.optim.Adam(params=model.parameters(), lr=BASE_LR)
+    start, reached_at, samples, best = time.perf_counter(), None, 0, float("inf")
+
+    for epoch in range(epochs):
+        model.train()
+        for X_batch, y_batch in loader:
+            loss = loss_fn(model(X_batch), y_batch)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+        samples += len(X)
+        model.eval()
+        with torch.inference_mode():
+            val_loss = loss_fn(model(X_val), y_val).item()
+        best = min(best, val_loss)
+        if val_loss <= target_loss:
+            reached_at = time.perf_counter() - start
+            break
+    elapsed = time.perf_counter() - start
+    return {"samples_per_second": samples / elapsed, "seconds_to_target": reached_at, "best_loss": best,
+            "epochs": epoch + 1}
+
+
+def engine(X, y, X_val, y_val, epochs, target_loss, batch_size, compile):
+    trainer = Trainer(build_model(), batch_size, compile=compile)
+    return trainer.fit(X, y, epochs, X_val, y_val, target_loss=target_loss, log_every=0)
+
+
+def main(args):
+    X, y, X_val, y_val = synthetic_students(args.samples, args.noise)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    runs = {}
+    torch.manual_seed(args.seed)
+    runs["notebook, batch 4"] = notebook_loop(X, y, X_val, y_val, args.epochs, args.target_loss)
+    for batch_size in args.batch_sizes:
+        torch.manual_seed(args.seed)
+        runs[f"engine, batch {batch_size}"] = engine(X, y, X_val, y_val, args.epochs, args.target_loss, batch_size,
+                                                     args.compile)
+
+    print(f"{len(X)} training samples, target validation MSE {args.target_loss}, "
+          f"{torch.get_num_threads()} intra-op threads")
+    for label, run in runs.items():
+        reached = f"{run['seconds_to_target']:7.2f}s" if run["seconds_to_target"] is not None else "    not reached"
+        print(f"{label:>18}: {run['samples_per_second']:10.0f} samples/s  to target {reached}  "
+              f"({run['epochs']} epochs, best {run['best_loss']:.2f})")
+    baseline = runs["notebook, batch 4"]["samples_per_second"]
+    return 0 if all(run["samples_per_second"] > baseline for label, run in runs.items() if "engine" in label) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--noise", type=float, default=3.0)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--target-loss", type=float, default=9.7)
+    parser.add_argument("--batch-sizes", type=lambda text: [int(size) for size in text.split(",")], default=[4, 64, 256])
+    parser.add_argument("--compile", choices=["none", "auto", "compile", "script"], default="none")
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(main(parser.parse_args()))
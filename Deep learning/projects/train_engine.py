@@ -0,0 +1,206 @@
+"""Fast CPU training loop for the students score model from traintestsave.ipynb.
+
+The whole training set stays in two contiguous tensors. Each epoch draws one
+index permutation and slices batches out of the permuted copy, so there is
+no per-sample Dataset indexing or collation. Losses are summed on-tensor and
+read once per epoch. Larger batches scale the learning rate, the model can
+be compiled with torch.compile (or TorchScript) when that works here, and
+training stops early once the validation loss stops improving.
+
+    python train_engine.py --batch-size 64 --epochs 500 --patience 50
+"""
+import argparse
+import copy
+import math
+import time
+import numpy as np
+import pandas as pd
+import torch
+from torch import nn
+
+FEATURES = ["Hours_Studied", "Sleep_Hours", "Attendance"]
+TARGET = "Score"
+BASE_BATCH_SIZE = 4  # The notebook's batch size, which its learning rate was tuned for
+BASE_LR = 0.01
+
+
+def build_model():
+    """The notebook's 3 -> 32 -> 16 -> 1 regressor"""
+    return nn.Sequential(
+        nn.Linear(3, 32),
+        nn.ReLU(),
+        nn.Linear(32, 16),
+        nn.ReLU(),
+        nn.Linear(16, 1)
+    )
+
+
+def load_students(path="students.csv", test_size=0.2, seed=42):
+    """Train/test tensors scaled as in the notebook, plus the fitted StandardScaler"""
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    df = pd.read_csv(path)
+    X_train, X_test, y_train, y_test = train_test_split(df[FEATURES], df[TARGET], test_size=test_size,
+                                                        random_state=seed)
+    scaler = StandardScaler()
+    return (as_tensor(scaler.fit_transform(X_train)), as_tensor(y_train.values).unsqueeze(1),
+            as_tensor(scaler.transform(X_test)), as_tensor(y_test.values).unsqueeze(1), scaler)
+
+
+def as_tensor(values):
+    """A contiguous float32 tensor"""
+    return torch.as_tensor(np.ascontiguousarray(values, dtype=np.float32))
+
+
+def scaled_lr(batch_size, base_lr=BASE_LR, base_batch_size=BASE_BATCH_SIZE, rule="sqrt"):
+    """Learning rate for batch_size: linear scaling for SGD, square root (the default) for Adam"""
+    ratio = batch_size / base_batch_size
+    if rule == "linear":
+        return base_lr * ratio
+    if rule == "sqrt":
+        return base_lr * math.sqrt(ratio)
+    return base_lr
+
+
+def compile_model(model, mode="auto", example=None):
+    """model compiled with torch.compile or TorchScript, whichever works first; (model, backend).
+
+    mode is auto, compile, script or none. A backend that fails to build or
+    to run a forward and backward pass on example is skipped.
+    """
+    candidates = {"auto": ["compile", "script"], "compile": ["compile"], "script": ["script"]}.get(mode, [])
+    for backend in candidates:
+        try:
+            if backend == "compile":
+                if not hasattr(torch, "compile"):
+                    continue
+                compiled = torch.compile(model, dynamic=True)
+            else:
+                compiled = torch.jit.script(model)
+            if example is not None:
+                compiled(example).sum().backward()
+                model.zero_grad(set_to_none=True)
+            return compiled, backend
+        except Exception:
+            continue
+    return model, "eager"
+
+
+class Trainer:
+    """Trains a regressor on in-memory tensors with Adam and MSE loss.
+
+    `lr` defaults to BASE_LR scaled for `batch_size` by `lr_rule`.
+    `threads` sets torch's intra-op thread count. With validation data,
+    training stops once the validation loss hasn't improved by `min_delta`
+    for `patience` epochs, and the best weights are restored.
+    """
+
+    def __init__(self, model, batch_size=BASE_BATCH_SIZE, lr=None, lr_rule="sqrt", compile="none", threads=None,
+                 patience=None, min_delta=0.0, seed=0):
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = model
+        self.batch_size = batch_size
+        self.lr = lr or scaled_lr(batch_size, rule=lr_rule)
+        self.compile_mode = compile
+        self.patience = patience
+        self.min_delta = min_delta
+        self.generator = torch.Generator().manual_seed(seed)
+        self.loss_fn = nn.MSELoss()
+        self.optimizer = torch.optim.Adam(model.parameters(), lr=self.lr)
+        self.forward = model
+        self.backend = "eager"
+        self.history = []
+
+    def fit(self, X, y, epochs=500, X_val=None, y_val=None, target_loss=None, log_every=50):
+        """Train for up to epochs; returns a summary dict.
+
+        With target_loss, training stops as soon as the validation (or
+        training) loss reaches it, and the time taken is reported.
+        """
+        X, y = X.contiguous(), y.contiguous()
+        start = time.perf_counter()
+        self.forward, self.backend = compile_model(self.model, self.compile_mode, X[:self.batch_size])
+        compile_seconds = time.perf_counter() - start
+        samples, start = 0, time.perf_counter()
+        best, best_state, best_epoch, reached_at = math.inf, None, 0, None
+
+        for epoch in range(epochs):
+            train_loss = self._train_epoch(X, y)
+            samples += len(X)
+            val_loss = self.evaluate(X_val, y_val) if X_val is not None else None
+            watched = val_loss if val_loss is not None else train_loss
+            self.history.append({"epoch": epoch, "train_loss": train_loss, "val_loss": val_loss})
+
+            if log_every and epoch % log_every == 0:
+                shown = f", Val Loss = {val_loss:.4f}" if val_loss is not None else ""
+                print(f"Epoch {epoch}: Train Loss = {train_loss:.4f}{shown}")
+
+            if watched < best - self.min_delta:
+                best, best_epoch = watched, epoch
+                if val_loss is not None and self.patience:
+                    best_state = copy.deepcopy(self.model.state_dict())
+            elif self.patience and val_loss is not None and epoch - best_epoch >= self.patience:
+                break
+            if target_loss is not None and watched <= target_loss:
+                reached_at = time.perf_counter() - start
+                break
+
+        elapsed = time.perf_counter() - start
+        if best_state is not None:
+            self.model.load_state_dict(best_state)
+        return {"epochs": epoch + 1, "seconds": elapsed, "samples_per_second": samples / elapsed,
+                "best_loss": best, "best_epoch": best_epoch, "seconds_to_target": reached_at,
+                "backend": self.backend, "compile_seconds": compile_seconds, "lr": self.lr}
+
+    def evaluate(self, X, y):
+        """Mean squared error over X in one pass"""
+        self.model.eval()
+        with torch.inference_mode():
+            return self.loss_fn(self.model(X), y).item()
+
+    def _train_epoch(self, X, y):
+        """One shuffled pass; returns the mean training loss"""
+        self.model.train()
+        order = torch.randperm(len(X), generator=self.generator)
+        X, y = X[order], y[order]  # one gather per epoch; batches below are views
+        total = torch.zeros(())
+        for begin in range(0, len(X), self.batch_size):
+            X_batch, y_batch = X[begin:begin + self.batch_size], y[begin:begin + self.batch_size]
+            loss = self.loss_fn(self.forward(X_batch), y_batch)
+            self.optimizer.zero_grad(set_to_none=True)
+            loss.backward()
+            self.optimizer.step()
+            total += loss.detach() * len(X_batch)
+        return total.item() / len(X)
+
+
+def main(args):
+    torch.manual_seed(args.seed)
+    X_train, y_train, X_test, y_test, _ = load_students(args.path)
+    model = build_model()
+    trainer = Trainer(model, args.batch_size, args.lr, compile=args.compile, threads=args.threads,
+                      patience=args.patience, seed=args.seed)
+    summary = trainer.fit(X_train, y_train, args.epochs, X_test, y_test)
+    print(f"✅ {summary['epochs']} epochs in {summary['seconds']:.2f}s "
+          f"({summary['samples_per_second']:.0f} samples/s, {summary['backend']} built in "
+          f"{summary['compile_seconds']:.1f}s, lr {summary['lr']:.4f})")
+    print(f"Test Loss: {trainer.evaluate(X_test, y_test):.4f}")
+    if args.save:
+        torch.save(model.state_dict(), args.save)
+        print("model saved")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="students.csv")
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=BASE_BATCH_SIZE)
+    parser.add_argument("--lr", type=float, help="default: 0.01 scaled for the batch size")
+    parser.add_argument("--compile", choices=["none", "auto", "compile", "script"], default="none")
+    parser.add_argument("--threads", type=int, help="intra-op threads (torch.set_num_threads)")
+    parser.add_argument("--patience", type=int, help="stop after this many epochs without validation improvement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the trained state_dict here, e.g. student_model.pth")
+    main(parser.parse_args())
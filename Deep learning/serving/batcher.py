@@ -0,0 +1,110 @@
+"""Dynamic request batching in front of a LoadedModel.
+
+Whatever requests are queued when the worker is free are stacked into one
+array and run through the model in a single forward pass, up to
+`max_batch` rows, then each request gets its own slice of the result back
+through a Future. Requests pile up while a batch runs, so under load the
+batches grow by themselves and a lone request is never held back. For
+models slow enough that it pays, `wait_ms` also holds the first request of
+a batch that long for company.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 64  # Rows per forward pass
+WAIT_MS = 0.0  # How long the first request of a batch waits for company
+
+
+class MicroBatcher:
+    """Runs the queued requests for one model together on a worker thread"""
+
+    def __init__(self, model, max_batch=MAX_BATCH, wait_ms=WAIT_MS):
+        self.model = model
+        self.max_batch = max_batch
+        self.wait = wait_ms / 1000
+        self.requests = queue.Queue()
+        self.counters = {"requests": 0, "rows": 0, "batches": 0, "errors": 0, "cancelled": 0}
+        self.worker_thread = threading.Thread(target=self._serve, daemon=True)
+        self.worker_thread.start()
+
+    def submit(self, rows):
+        """Queue rows (a (n, features) array) for the next batch; returns a Future of n predictions"""
+        rows = np.asarray(rows, dtype=np.float32)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        future = Future()
+        self.requests.put((rows, future))
+        return future
+
+    def predict(self, rows, timeout=10):
+        return self.submit(rows).result(timeout=timeout)
+
+    def stats(self):
+        """Batching counters"""
+        stats = dict(self.counters)
+        stats["queued"] = self.requests.qsize()
+        stats["avg_batch_rows"] = round(stats["rows"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def _serve(self):
+        """Collect requests for up to wait seconds or max_batch rows, then run them together"""
+        while True:
+            try:
+                batch = self._collect()
+                if batch:
+                    self._run(batch)
+            except Exception as e:
+                # The worker is the only thread serving this model; it must outlive any one batch
+                logger.error(f"❌ {self.model.name} batching worker error: {e}")
+
+    def _collect(self):
+        """The next batch, leaving out requests whose callers already gave up"""
+        batch, rows = [], 0
+        item = self.requests.get()
+        deadline = time.monotonic() + self.wait
+        while True:
+            # Marks the Future running, so it can no longer be cancelled under us
+            if item[1].set_running_or_notify_cancel():
+                batch.append(item)
+                rows += len(item[0])
+            else:
+                self.counters["cancelled"] += 1
+            if rows >= self.max_batch:
+                return batch
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                return batch
+
+    def _run(self, batch):
+        self.counters["requests"] += len(batch)
+        self.counters["batches"] += 1
+        try:
+            stacked = batch[0][0] if len(batch) == 1 else np.concatenate([rows for rows, _ in batch])
+            predictions = self.model.predict(stacked)
+            self.counters["rows"] += len(stacked)
+        except Exception as e:
+            # One malformed request shouldn't fail the others: retry them one at a time
+            if len(batch) > 1:
+                self.counters["batches"] -= 1
+                self.counters["requests"] -= len(batch)
+                for item in batch:
+                    self._run([item])
+                return
+            self.counters["errors"] += 1
+            logger.error(f"❌ {self.model.name} prediction failed: {e}")
+            batch[0][1].set_exception(e)
+            return
+
+        offset = 0
+        for rows, future in batch:
+            future.set_result(predictions[offset:offset + len(rows)])
+            offset += len(rows)
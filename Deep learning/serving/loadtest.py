@@ -0,0 +1,155 @@
+"""Load test the model server with single-row requests, with and without batching.
+
+Starts server.py in its own process for each configuration (batching off
+with --max-batch 1, batching on, and batching on with int8 quantization),
+then runs --concurrency closed-loop clients for --duration seconds, each
+posting one random student row at a time to /api/predict/students.
+Reports throughput and p50/p99 latency per configuration, plus the average
+batch size the server saw. Served predictions are checked against the
+fp32 model run directly, and the exit code is 1 on errors or when a
+prediction is off by more than the tolerance (2% for int8).
+
+    python loadtest.py --concurrency 1,32 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from model_registry import ModelRegistry
+
+MODEL = "students"
+CONFIGS = {
+    "unbatched": ["--max-batch", "1"],
+    "batched": ["--max-batch", "64"],
+    "batched int8": ["--max-batch", "64", "--quantize"],
+}
+FP32_TOLERANCE = 1e-5  # Error allowed, as a fraction of the largest prediction, from the fp32 model run here
+INT8_TOLERANCE = 0.02
+
+
+def random_row(rng):
+    return [round(rng.uniform(0, 10), 1), rng.randint(4, 9), rng.randint(55, 100)]
+
+
+def start_server(port, extra):
+    server = subprocess.Popen([sys.executable, str(HERE / "server.py"), "--port", str(port), *extra],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if json.load(response)["ready"]:
+                    return server
+        except OSError:
+            pass
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float("nan")
+
+
+async def client(session, url, rng, stop_at, latencies, samples, errors):
+    while time.monotonic() < stop_at:
+        row = random_row(rng)
+        start = time.perf_counter()
+        try:
+            async with session.post(url, json={"rows": [row]}) as response:
+                body = await response.json()
+                if response.status != 200:
+                    errors.append(response.status)
+                    continue
+        except aiohttp.ClientError as e:
+            errors.append(str(e))
+            continue
+        latencies.append(time.perf_counter() - start)
+        if len(samples) < 200:
+            samples.append((row, body["predictions"][0]))
+
+
+async def warm_up(session, url):
+    async with session.post(url, json={"rows": [[5, 7, 85]]}) as response:
+        await response.read()
+
+
+async def drive(port, concurrency, duration, seed):
+    url = f"http://127.0.0.1:{port}/api/predict/{MODEL}"
+    latencies, samples, errors = [], [], []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Warm up connections and the server's first-request paths
+        await asyncio.gather(*(warm_up(session, url) for _ in range(concurrency)))
+        stop_at = time.monotonic() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session, url, random.Random(seed + i), stop_at, latencies, samples, errors)
+                               for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        async with session.get(f"http://127.0.0.1:{port}/api/status") as response:
+            status = await response.json()
+    return {"requests_per_second": len(latencies) / elapsed, "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000, "errors": len(errors), "samples": samples,
+            "avg_batch_rows": status["batchers"][MODEL]["avg_batch_rows"]}
+
+
+def compare(samples, tolerance):
+    """(largest error, count beyond tolerance) of served predictions against the fp32 model run here.
+
+    int8 dynamic quantization picks its activation scale per batch, so its
+    predictions move slightly with whatever they were batched with.
+    """
+    if not samples:
+        return 0.0, 0
+    rows = np.array([row for row, _ in samples])
+    expected = np.array(ModelRegistry().get(MODEL).predict(rows))
+    error = np.abs(np.array([prediction for _, prediction in samples]) - expected)
+    return float(error.max()), int((error > tolerance * max(1.0, np.abs(expected).max())).sum())
+
+
+def main(args):
+    results = {}
+    for index, (label, extra) in enumerate(CONFIGS.items()):
+        port = args.port + index
+        server = start_server(port, [*extra, "--wait-ms", str(args.wait_ms)])
+        try:
+            for concurrency in args.concurrency:
+                result = asyncio.run(drive(port, concurrency, args.duration, args.seed))
+                tolerance = INT8_TOLERANCE if "--quantize" in extra else FP32_TOLERANCE
+                result["max_error"], result["mismatches"] = compare(result.pop("samples"), tolerance)
+                results[(label, concurrency)] = result
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"single-row requests to /api/predict/{MODEL}, {args.duration}s per run, wait {args.wait_ms} ms")
+    for (label, concurrency), result in results.items():
+        print(f"{label:>13} x{concurrency:<3}: {result['requests_per_second']:8.0f} req/s  "
+              f"p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms  "
+              f"avg batch {result['avg_batch_rows']:5.1f}  errors {result['errors']}  "
+              f"max error {result['max_error']:.4f}")
+    failed = sum(result["errors"] + result["mismatches"] for result in results.values())
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=lambda text: [int(n) for n in text.split(",")], default=[1, 32])
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--wait-ms", type=float, default=0)
+    parser.add_argument("--port", type=int, default=8110)
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,147 @@
+"""Registry of the saved .pth models and a warm cache of the loaded ones.
+
+models.json names each servable model: the architecture its state_dict
+belongs to, the weights file (relative to models.json), its input features
+in order and the mean/scale of the StandardScaler it was trained behind
+(null when the inputs are used as they are). A loaded model is kept in
+eval mode, optionally with its Linear layers dynamically quantized to int8,
+and stays cached until more than `max_models` are in use.
+
+    python model_registry.py --quantize
+"""
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import nn
+
+HERE = Path(__file__).resolve().parent
+REGISTRY_PATH = HERE / "models.json"
+MAX_MODELS = 8  # Loaded models kept warm; the least recently used is dropped first
+
+
+def students_mlp():
+    """traintestsave.ipynb's 3 -> 32 -> 16 -> 1 score regressor"""
+    return nn.Sequential(
+        nn.Linear(3, 32),
+        nn.ReLU(),
+        nn.Linear(32, 16),
+        nn.ReLU(),
+        nn.Linear(16, 1)
+    )
+
+
+def linear_regression():
+    """practiceTraining.workflow.ipynb's single Linear(1, 1)"""
+    return nn.Sequential(
+        nn.Linear(1, 1,)
+    )
+
+
+ARCHITECTURES = {"students_mlp": students_mlp, "linear_regression": linear_regression}
+
+
+class LoadedModel:
+    """A model ready for inference, with its input scaling folded into predict()"""
+
+    def __init__(self, name, spec, module, quantized, load_seconds):
+        self.name = name
+        self.features = spec["features"]
+        self.target = spec.get("target")
+        self.module = module
+        self.quantized = quantized
+        self.load_seconds = load_seconds
+        scaler = spec.get("scaler")
+        self.mean = torch.tensor(scaler["mean"], dtype=torch.float32) if scaler else None
+        self.scale = torch.tensor(scaler["scale"], dtype=torch.float32) if scaler else None
+
+    def predict(self, rows):
+        """Predictions for a (n, features) array of raw, unscaled inputs, as a list of floats"""
+        X = torch.as_tensor(np.ascontiguousarray(rows, dtype=np.float32))
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(f"{self.name} expects rows of {len(self.features)} values ({', '.join(self.features)})")
+        with torch.inference_mode():
+            if self.mean is not None:
+                X = (X - self.mean) / self.scale
+            return self.module(X).reshape(-1).tolist()
+
+    def info(self):
+        return {"name": self.name, "features": self.features, "target": self.target,
+                "scaled": self.mean is not None, "quantized": self.quantized,
+                "load_seconds": round(self.load_seconds, 4)}
+
+
+class ModelRegistry:
+    """Reads models.json and hands out loaded models, loading each one once"""
+
+    def __init__(self, path=REGISTRY_PATH, quantize=False, max_models=MAX_MODELS):
+        self.path = Path(path)
+        with open(self.path) as f:
+            self.specs = json.load(f)
+        self.quantize = quantize
+        self.max_models = max_models
+        self.loaded = OrderedDict()  # (name, quantized) -> LoadedModel, least recently used first
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def names(self):
+        return list(self.specs)
+
+    def get(self, name, quantize=None):
+        """The loaded model called name; raises KeyError for unregistered names"""
+        if name not in self.specs:
+            raise KeyError(name)
+        key = (name, self.quantize if quantize is None else quantize)
+        with self.lock:
+            model = self.loaded.get(key)
+            if model is not None:
+                self.loaded.move_to_end(key)
+                self.counters["hits"] += 1
+                return model
+            model = self._load(name, key[1])
+            self.loaded[key] = model
+            self.counters["loads"] += 1
+            while len(self.loaded) > self.max_models:
+                self.loaded.popitem(last=False)
+                self.counters["evictions"] += 1
+            return model
+
+    def warm(self, names=None):
+        """Load names (default: every registered model) ahead of the first request"""
+        return [self.get(name) for name in names or self.names()]
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["warm"] = [name + (" (int8)" if quantized else "") for name, quantized in self.loaded]
+        return stats
+
+    def _load(self, name, quantize):
+        spec = self.specs[name]
+        start = time.perf_counter()
+        module = ARCHITECTURES[spec["architecture"]]()
+        state = torch.load(self.path.parent / spec["weights"], map_location="cpu", weights_only=True)
+        module.load_state_dict(state)
+        module.eval()
+        if quantize:
+            module = torch.quantization.quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+        return LoadedModel(name, spec, module, quantize, time.perf_counter() - start)
+
+
+def main(args):
+    registry = ModelRegistry(args.registry, quantize=args.quantize)
+    for model in registry.warm():
+        example = np.zeros((1, len(model.features)))
+        print(f"✅ {model.name}: {', '.join(model.features)} -> {model.target} "
+              f"loaded in {model.load_seconds * 1000:.1f} ms, f(0) = {model.predict(example)[0]:.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registry", default=REGISTRY_PATH)
+    parser.add_argument("--quantize", action="store_true", help="dynamically quantize Linear layers to int8")
+    main(parser.parse_args())
@@ -0,0 +1,137 @@
+"""HTTP inference server for the models registered in models.json.
+
+Every model listed is loaded (and optionally quantized) at startup, so the
+first request doesn't pay for it, and gets a MicroBatcher: concurrent
+requests for the same model share one forward pass under
+torch.inference_mode. Rows are sent unscaled; the registered
+StandardScaler parameters are applied on the server.
+
+    python server.py --port 8100 --max-batch 64 --quantize
+    curl -X POST localhost:8100/api/predict/students -H 'Content-Type: application/json' \\
+         -d '{"rows": [[6.5, 7, 90]]}'
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import torch
+import uvicorn
+from fastapi import APIRouter, FastAPI, HTTPException
+from pydantic import BaseModel
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from batcher import MicroBatcher
+from model_registry import REGISTRY_PATH, ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = os.getenv("SERVING_REGISTRY", str(REGISTRY_PATH))
+MAX_BATCH = int(os.getenv("SERVING_MAX_BATCH", "64"))  # Rows per forward pass; 1 turns batching off
+WAIT_MS = float(os.getenv("SERVING_WAIT_MS", "0"))  # How long a batch waits to fill up
+QUANTIZE = os.getenv("SERVING_QUANTIZE", "").lower() in ("1", "true", "yes")  # int8 dynamic quantization
+THREADS = int(os.getenv("SERVING_THREADS", "1"))  # torch intra-op threads; batches are small
+MAX_ROWS = 10_000  # Per request
+PREDICT_TIMEOUT = float(os.getenv("SERVING_PREDICT_TIMEOUT", "10"))  # Seconds before a queued request gives up
+
+router = APIRouter()
+
+# Request/Response models
+class PredictRequest(BaseModel):
+    rows: List[List[float]]
+
+class PredictResponse(BaseModel):
+    model: str
+    target: Optional[str] = None
+    predictions: List[float]
+
+class ModelInfo(BaseModel):
+    name: str
+    features: List[str]
+    target: Optional[str] = None
+    scaled: bool
+    quantized: bool
+    load_seconds: float
+
+class StatusResponse(BaseModel):
+    status: str
+    max_batch: int
+    wait_ms: float
+    registry: dict
+    batchers: dict
+
+# Set at startup
+registry = None
+batchers = {}
+
+@router.post("/predict/{name}", response_model=PredictResponse)
+async def predict(name: str, request: PredictRequest):
+    """Predictions for rows of raw feature values, batched with concurrent requests"""
+    batcher = batchers.get(name)
+    if batcher is None:
+        raise HTTPException(status_code=404, detail=f"No model called {name!r}; see /api/models")
+    if not request.rows:
+        return PredictResponse(model=name, target=batcher.model.target, predictions=[])
+    if len(request.rows) > MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_ROWS} rows per request")
+    width = len(batcher.model.features)
+    if any(len(row) != width for row in request.rows):
+        raise HTTPException(status_code=422,
+                            detail=f"{name} expects rows of {width} values ({', '.join(batcher.model.features)})")
+
+    try:
+        predictions = await asyncio.wait_for(asyncio.wrap_future(batcher.submit(request.rows)), PREDICT_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"{name} did not answer within {PREDICT_TIMEOUT:g}s")
+    return PredictResponse(model=name, target=batcher.model.target, predictions=predictions)
+
+@router.get("/models", response_model=List[ModelInfo])
+async def list_models():
+    """The registered models with their input features"""
+    return [ModelInfo(**batcher.model.info()) for batcher in batchers.values()]
+
+@router.get("/status", response_model=StatusResponse)
+async def status():
+    """Warm cache and batching counters"""
+    return StatusResponse(status="online" if batchers else "starting", max_batch=MAX_BATCH, wait_ms=WAIT_MS,
+                          registry=registry.stats() if registry else {},
+                          batchers={name: batcher.stats() for name, batcher in batchers.items()})
+
+
+app = FastAPI(title="Deep learning model server", version="1.0.0")
+app.include_router(router, prefix="/api")
+
+@app.on_event("startup")
+async def startup_event():
+    global registry
+    torch.set_num_threads(THREADS)
+    registry = ModelRegistry(REGISTRY, quantize=QUANTIZE)
+    for model in registry.warm():
+        batchers[model.name] = MicroBatcher(model, MAX_BATCH, WAIT_MS)
+        logger.info(f"🧠 {model.name} ready in {model.load_seconds * 1000:.1f} ms")
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "ready": bool(batchers), "models": list(batchers)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--registry", default=REGISTRY)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="rows per forward pass; 1 disables batching")
+    parser.add_argument("--wait-ms", type=float, default=WAIT_MS)
+    parser.add_argument("--quantize", action="store_true", default=QUANTIZE,
+                        help="dynamically quantize Linear layers to int8")
+    parser.add_argument("--threads", type=int, default=THREADS)
+    args = parser.parse_args()
+    REGISTRY, MAX_BATCH, WAIT_MS, QUANTIZE, THREADS = (args.registry, args.max_batch, args.wait_ms, args.quantize,
+                                                      args.threads)
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -1,93 +1,245 @@
-import schedule
+import logging
+import heapq
+import itertools
 import time
 import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Callable
+from typing import Callable, Dict, Optional
+from automation.task_store import TaskStore
+from voice.speaker import PRIORITY_REMINDER
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+class Task:
+    def __init__(self, task_id: str, message: str, action: str, due: float, interval: Optional[float] = None,
+                 time_of_day: Optional[str] = None):
+        self.task_id = task_id
+        self.message = message
+        self.action = action
+        self.due = due  # Unix time
+        self.interval = interval  # Seconds between runs, None for one-shot tasks
+        self.time_of_day = time_of_day  # Local HH:MM of daily tasks; the next run is recomputed from it
+
+    def row(self):
+        return (self.task_id, self.message, self.action, self.due, self.interval, self.time_of_day)
 
 class TaskScheduler:
-    def __init__(self, voice_speaker=None):
+    """Runs one-shot and recurring tasks at their due time.
+
+    Pending tasks sit in a min-heap keyed by due time. The worker thread
+    sleeps on a condition variable until the earliest task is due, and adding
+    or removing a task wakes it early only when the head of the heap changes.
+    Removed tasks are left in the heap and skipped when popped; the heap is
+    rebuilt once they outnumber the live ones. Tasks are stored in SQLite
+    (Settings.DATABASE_PATH), so they survive restarts; reminders that fell due
+    while Jarvis was down fire as soon as it starts again.
+    """
+
+    def __init__(self, voice_speaker=None, database_path: Optional[str] = None, persist: bool = True):
         self.voice_speaker = voice_speaker
-        self.scheduled_tasks: Dict[str, schedule.Job] = {}
+        self.actions: Dict[str, Callable[[str], None]] = {"reminder": self._reminder_task}
+        self.scheduled_tasks: Dict[str, Task] = {}
+        self.heap = []  # (due, seq, Task), may hold removed tasks
+        self.seq = itertools.count()
+        self.condition = threading.Condition()
+        self.counters = {"dispatched": 0, "errors": 0, "compactions": 0}
         self.running = False
         self.scheduler_thread = None
-    
+
+        self.store = TaskStore(database_path) if persist else None
+        if self.store:
+            for row in self.store.load():
+                self._push(Task(*row))
+
     def start(self):
         """Start the scheduler in a background thread"""
         if not self.running:
             self.running = True
             self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
             self.scheduler_thread.start()
-            print("📅 Task scheduler started")
-    
+            logger.info(f"📅 Task scheduler started ({len(self.scheduled_tasks)} pending)")
+
     def stop(self):
         """Stop the scheduler"""
-        self.running = False
+        with self.condition:
+            self.running = False
+            self.condition.notify()
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=1)
-        print("📅 Task scheduler stopped")
-    
-    def _run_scheduler(self):
-        """Run the scheduler loop"""
-        while self.running:
-            schedule.run_pending()
-            time.sleep(1)
-    
+        if self.store:
+            self.store.close()
+        logger.info("📅 Task scheduler stopped")
+
+    def register_action(self, name: str, handler: Callable[[str], None]):
+        """Make handler(message) available to tasks scheduled with action=name"""
+        self.actions[name] = handler
+
+    def add_task(self, task_id: str, message: str, due: float, interval: Optional[float] = None,
+                 action: str = "reminder"):
+        """Schedule a task at Unix time due, repeating every interval seconds if given"""
+        self.add_tasks([Task(task_id, message, action, due, interval)])
+
+    def add_tasks(self, tasks):
+        """Schedule many Task objects with a single database transaction"""
+        with self.condition:
+            for task in tasks:
+                if task.action not in self.actions:
+                    raise ValueError(f"Unknown task action: {task.action}")
+            head = self.heap[0][0] if self.heap else None
+            for task in tasks:
+                self._push(task)
+            self._maybe_compact()
+            if self.store:
+                self.store.save([task.row() for task in tasks])
+            if head is None or self.heap[0][0] < head:
+                self.condition.notify()
+
     def add_reminder(self, task_id: str, message: str, when: str):
-        """Add a reminder task"""
+        """Add a one-shot reminder for the next HH:MM"""
         try:
             # Parse time format (e.g., "10:30", "15:45")
             if ":" in when:
-                job = schedule.every().day.at(when).do(self._reminder_task, message)
-                self.scheduled_tasks[task_id] = job
+                self.add_task(task_id, message, self._next_occurrence(when))
                 return f"Reminder set for {when}: {message}"
             else:
                 return "Please provide time in HH:MM format (e.g., 10:30)"
-                
+
         except Exception as e:
             return f"Error setting reminder: {str(e)}"
-    
+
     def add_daily_task(self, task_id: str, message: str, time_str: str):
         """Add a daily recurring task"""
         try:
-            job = schedule.every().day.at(time_str).do(self._reminder_task, message)
-            self.scheduled_tasks[task_id] = job
+            self.add_tasks([Task(task_id, message, "reminder", self._next_occurrence(time_str), interval=DAY,
+                                 time_of_day=time_str.strip())])
             return f"Daily task set for {time_str}: {message}"
-            
+
         except Exception as e:
             return f"Error setting daily task: {str(e)}"
-    
+
     def remove_task(self, task_id: str):
         """Remove a scheduled task"""
-        if task_id in self.scheduled_tasks:
-            schedule.cancel_job(self.scheduled_tasks[task_id])
-            del self.scheduled_tasks[task_id]
-            return f"Task {task_id} removed"
-        else:
-            return f"Task {task_id} not found"
-    
+        with self.condition:
+            task = self.scheduled_tasks.pop(task_id, None)
+            if task is None:
+                return f"Task {task_id} not found"
+            if self.store:
+                self.store.delete([task_id])
+            if self.heap[0][2] is task:
+                self.condition.notify()
+            self._maybe_compact()
+        return f"Task {task_id} removed"
+
     def list_tasks(self):
         """List all scheduled tasks"""
-        if not self.scheduled_tasks:
+        with self.condition:
+            tasks = sorted(self.scheduled_tasks.values(), key=lambda task: task.due)
+        if not tasks:
             return "No scheduled tasks"
-        
+
         task_list = []
-        for task_id, job in self.scheduled_tasks.items():
-            next_run = job.next_run.strftime("%Y-%m-%d %H:%M:%S") if job.next_run else "Not scheduled"
-            task_list.append(f"{task_id}: Next run at {next_run}")
-        
+        for task in tasks:
+            next_run = datetime.fromtimestamp(task.due).strftime("%Y-%m-%d %H:%M:%S")
+            task_list.append(f"{task.task_id}: Next run at {next_run}")
+
         return "Scheduled tasks: " + ", ".join(task_list)
-    
+
+    def stats(self):
+        """Pending tasks, heap size and dispatch counters"""
+        with self.condition:
+            stats = dict(self.counters)
+            stats["pending"] = len(self.scheduled_tasks)
+            stats["heap_size"] = len(self.heap)
+            stats["next_due"] = self.heap[0][0] if self.heap else None
+        return stats
+
+    def _push(self, task: Task):
+        """Add task to the heap, replacing any task with the same id; caller holds the lock"""
+        self.scheduled_tasks[task.task_id] = task
+        heapq.heappush(self.heap, (task.due, next(self.seq), task))
+
+    def _maybe_compact(self):
+        """Drop removed tasks from the heap once they outnumber live ones; caller holds the lock"""
+        if len(self.heap) <= 2 * len(self.scheduled_tasks) + 64:
+            return
+        self.heap = [entry for entry in self.heap if self.scheduled_tasks.get(entry[2].task_id) is entry[2]]
+        heapq.heapify(self.heap)
+        self.counters["compactions"] += 1
+
+    def _pop_due(self, now: float):
+        """Pop every task due by now, rescheduling recurring ones; caller holds the lock"""
+        due, finished, rescheduled = [], [], []
+        while self.heap and self.heap[0][0] <= now:
+            _, _, task = heapq.heappop(self.heap)
+            if self.scheduled_tasks.get(task.task_id) is not task:
+                continue  # removed or replaced
+            due.append(task)
+            if task.time_of_day:
+                # Wall-clock time, so a daily task stays at its HH:MM across DST changes
+                task.due = self._next_occurrence(task.time_of_day, now)
+                heapq.heappush(self.heap, (task.due, next(self.seq), task))
+                rescheduled.append((task.due, task.task_id))
+            elif task.interval:
+                # Skip runs missed while we were not running
+                missed = max(int((now - task.due) // task.interval), 0)
+                task.due += (missed + 1) * task.interval
+                heapq.heappush(self.heap, (task.due, next(self.seq), task))
+                rescheduled.append((task.due, task.task_id))
+            else:
+                del self.scheduled_tasks[task.task_id]
+                finished.append(task.task_id)
+
+        if self.store:
+            self.store.delete(finished)
+            self.store.reschedule(rescheduled)
+        return due
+
+    def _run_scheduler(self):
+        """Sleep until the next task is due, then run everything that is due"""
+        while True:
+            with self.condition:
+                while self.running:
+                    if self.heap:
+                        delay = self.heap[0][0] - time.time()
+                        if delay <= 0:
+                            break
+                        self.condition.wait(delay)
+                    else:
+                        self.condition.wait()
+                if not self.running:
+                    return
+                tasks = self._pop_due(time.time())
+
+            for task in tasks:
+                try:
+                    self.actions[task.action](task.message)
+                    self.counters["dispatched"] += 1
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    logger.error(f"❌ Task {task.task_id} error: {e}")
+
+    def _next_occurrence(self, time_str: str, after: Optional[float] = None) -> float:
+        """Unix time of the next local HH:MM after the given Unix time (default now), today or tomorrow"""
+        at = datetime.strptime(time_str.strip(), "%H:%M")
+        now = datetime.fromtimestamp(after) if after is not None else datetime.now()
+        target = now.replace(hour=at.hour, minute=at.minute, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        return target.timestamp()
+
     def _reminder_task(self, message: str):
         """Execute a reminder task"""
-        print(f"⏰ Reminder: {message}")
+        logger.info(f"⏰ Reminder: {message}")
         if self.voice_speaker:
-            self.voice_speaker.speak(f"Reminder: {message}")
-    
+            self.voice_speaker.speak_async(f"Reminder: {message}", priority=PRIORITY_REMINDER)
+
     def parse_natural_time(self, time_text: str):
         """Parse natural language time expressions"""
         time_text = time_text.lower()
         now = datetime.now()
-        
+
         # Handle "in X minutes/hours"
         if "in" in time_text:
             if "minute" in time_text:
@@ -98,12 +250,12 @@ class TaskScheduler:
                 hours = int(''.join(filter(str.isdigit, time_text)))
                 target_time = now + timedelta(hours=hours)
                 return target_time.strftime("%H:%M")
-        
+
         # Handle "at X pm/am"
         if "at" in time_text:
             # Extract time part
             time_part = time_text.split("at")[1].strip()
             # Simple parsing - could be enhanced
             return time_part
-        
-        return None
\ No newline at end of file
+
+        return None
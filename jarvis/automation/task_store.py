@@ -0,0 +1,54 @@
+import sqlite3
+import threading
+from config.settings import settings
+
+
+class TaskStore:
+    """SQLite table of pending scheduled tasks.
+
+    The database runs in write-ahead-log mode with synchronous=NORMAL, so each
+    change is a small append to the log rather than a rewrite of the database
+    file.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.DATABASE_PATH
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS scheduled_tasks ("
+            "task_id TEXT PRIMARY KEY, message TEXT NOT NULL, action TEXT NOT NULL, "
+            "due REAL NOT NULL, interval REAL, time_of_day TEXT)"
+        )
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(scheduled_tasks)")}
+        if "time_of_day" not in columns:  # databases created before daily tasks kept their HH:MM
+            self.connection.execute("ALTER TABLE scheduled_tasks ADD COLUMN time_of_day TEXT")
+        self.connection.commit()
+
+    def load(self):
+        """All stored tasks as (task_id, message, action, due, interval, time_of_day) rows"""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT task_id, message, action, due, interval, time_of_day FROM scheduled_tasks"
+            ).fetchall()
+
+    def save(self, rows):
+        """Insert or replace (task_id, message, action, due, interval, time_of_day) rows in one transaction"""
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO scheduled_tasks VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def reschedule(self, updates):
+        """Move tasks to new due times given (due, task_id) pairs"""
+        with self.lock, self.connection:
+            self.connection.executemany("UPDATE scheduled_tasks SET due = ? WHERE task_id = ?", updates)
+
+    def delete(self, task_ids):
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM scheduled_tasks WHERE task_id = ?",
+                                        [(task_id,) for task_id in task_ids])
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
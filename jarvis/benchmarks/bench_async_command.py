@@ -0,0 +1,89 @@
+"""Show that concurrent /api/command requests overlap their upstream waits.
+
+Runs the API router under uvicorn against a stub upstream that sleeps for
+--latency seconds per call, then compares one request with N concurrent ones.
+
+    python benchmarks/bench_async_command.py --requests 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import itertools
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp
+import uvicorn
+from fastapi import FastAPI
+
+from config.settings import settings
+from brain.ai_handler import AIHandler
+from web import api
+from benchmarks.stub_upstream import StubUpstream
+
+# Every request asks about a new city so the response cache never answers it
+CITIES = itertools.count()
+
+
+def start_api(port):
+    """Serve the API router from a background thread"""
+    app = FastAPI()
+    app.include_router(api.router, prefix="/api")
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+
+async def post_commands(url, count):
+    """Send count commands at once and return the wall time"""
+    async with aiohttp.ClientSession() as session:
+        async def one():
+            command = f"What's the weather in City{next(CITIES)}?"
+            async with session.post(url, json={"command": command}) as response:
+                body = await response.json()
+                assert body["success"], body
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(count)))
+        return time.perf_counter() - start
+
+
+async def main(args):
+    stub = await StubUpstream(latency=args.latency).start()
+    stub.point_settings(settings)
+
+    api.ai_handler = AIHandler()
+    server, thread = await asyncio.to_thread(start_api, args.port)
+    url = f"http://127.0.0.1:{args.port}/api/command"
+
+    try:
+        await post_commands(url, 1)  # warm up
+        single = await post_commands(url, 1)
+        concurrent = await post_commands(url, args.requests)
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(thread.join)
+        await stub.stop()
+
+    ratio = concurrent / single
+    print(f"upstream latency : {args.latency:.3f}s")
+    print(f"1 request        : {single:.3f}s")
+    print(f"{args.requests} concurrent   : {concurrent:.3f}s  ({ratio:.2f}x a single request)")
+    print(f"serialized bound : {single * args.requests:.3f}s")
+    return 0 if ratio <= args.max_ratio else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-ratio", type=float, default=2.0,
+                        help="fail if N concurrent requests take longer than this many single requests")
+    sys.exit(asyncio.run(main(parser.parse_args())))
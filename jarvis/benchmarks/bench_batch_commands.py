@@ -0,0 +1,83 @@
+"""Compare one POST /api/commands batch with the same commands sent one by one.
+
+    python benchmarks/bench_batch_commands.py --commands 300 --latency 0.1
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp
+
+from config.settings import settings
+from brain.ai_handler import AIHandler
+from web import api
+from benchmarks.stub_upstream import StubUpstream
+from benchmarks.bench_async_command import start_api
+
+
+def make_commands(count, seed=0):
+    rng = random.Random(seed)
+    cities = [f"City{i}" for i in range(20)]
+    topics = [f"topic{i}" for i in range(10)]
+    templates = [
+        lambda: f"What's the weather in {rng.choice(cities)}?",
+        lambda: f"search for {rng.choice(topics)}",
+        lambda: "hello there",
+        lambda: f"calculate {rng.randint(1, 9)} plus {rng.randint(1, 9)}",
+    ]
+    return [rng.choice(templates)() for _ in range(count)]
+
+
+async def main(args):
+    stub = await StubUpstream(latency=args.latency).start()
+    stub.point_settings(settings)
+    commands = make_commands(args.commands)
+    server, thread = await asyncio.to_thread(start_api, args.port)
+    base = f"http://127.0.0.1:{args.port}/api"
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            api.ai_handler = AIHandler()
+            hits = stub.hits
+            start = time.perf_counter()
+            for command in commands:
+                async with session.post(f"{base}/command", json={"command": command}) as response:
+                    await response.json()
+            sequential = time.perf_counter() - start
+            sequential_hits = stub.hits - hits
+
+            # Start the batch cold too
+            api.ai_handler.weather_service.cache.invalidate()
+            api.ai_handler.web_search.cache.invalidate()
+            hits = stub.hits
+            start = time.perf_counter()
+            payload = {"commands": commands, "concurrency": args.concurrency}
+            async with session.post(f"{base}/commands", json=payload) as response:
+                body = await response.json()
+            batch = time.perf_counter() - start
+            batch_hits = stub.hits - hits
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(thread.join)
+        await stub.stop()
+
+    results = body["results"]
+    ok = sum(result["success"] for result in results)
+    print(f"commands   : {len(commands)} ({ok} succeeded in the batch)")
+    print(f"one by one : {sequential:.3f}s, {sequential_hits} upstream calls")
+    print(f"batch      : {batch:.3f}s, {batch_hits} upstream calls ({sequential / batch:.1f}x faster)")
+    return 0 if ok == len(commands) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8766)
+    sys.exit(asyncio.run(main(parser.parse_args())))
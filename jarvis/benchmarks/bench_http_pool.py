@@ -0,0 +1,58 @@
+"""Check that the shared HttpClient reuses keep-alive connections under load.
+
+    python benchmarks/bench_http_pool.py --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings
+from brain.ai_handler import AIHandler
+from benchmarks.stub_upstream import StubUpstream
+
+
+async def main(args):
+    stub = await StubUpstream(latency=args.latency).start()
+    stub.point_settings(settings)
+    handler = AIHandler()
+
+    try:
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(i):
+            async with semaphore:
+                await handler.weather_service.get_weather_async(f"City{i}")
+
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        async_elapsed = time.perf_counter() - start
+
+        def run_sync():
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                list(pool.map(lambda i: handler.weather_service.get_weather(f"Town{i}"), range(args.requests)))
+
+        # The stub shares this event loop, so drive the sync client from a worker thread
+        start = time.perf_counter()
+        await asyncio.to_thread(run_sync)
+        sync_elapsed = time.perf_counter() - start
+
+        print(f"async: {args.requests} requests in {async_elapsed:.3f}s")
+        print(f"sync : {args.requests} requests in {sync_elapsed:.3f}s")
+        print(json.dumps(handler.http_client.stats(), indent=2))
+    finally:
+        await handler.close()
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,142 @@
+"""Measure what metrics and tracing cost per request, and check /metrics end to end.
+
+Times the primitives the hot path uses (histogram observe, a span outside and
+inside a trace, a /metrics render), then serves the API with the metrics
+middleware against a stub upstream, sends commands and checks that the route
+histograms, upstream histograms and Server-Timing header are all populated.
+
+    python benchmarks/bench_instrumentation.py --requests 200 --latency 0.01
+"""
+import argparse
+import asyncio
+import itertools
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from config.settings import settings
+from brain.ai_handler import AIHandler
+from monitoring.metrics import REGISTRY, Histogram, MetricsMiddleware, MetricsRegistry
+from monitoring.tracing import span, start_trace
+from web import api
+from benchmarks.stub_upstream import StubUpstream
+
+CITIES = itertools.count()
+
+
+def per_call_ns(function, count):
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        function()
+    return (time.perf_counter_ns() - start) / count
+
+
+def primitives(count):
+    """Nanoseconds per call of each instrumentation primitive"""
+    histogram = Histogram("bench_seconds", "Benchmark histogram", ["route"], registry=MetricsRegistry())
+    child = histogram.labels("/api/command")
+
+    def observe():
+        child.observe(0.003)
+
+    def labelled_observe():
+        histogram.labels("/api/command").observe(0.003)
+
+    def bare_span():
+        with span("fetch:weather"):
+            pass
+
+    def traced_span():
+        with span("fetch:weather"):
+            pass
+
+    results = {
+        "histogram observe": per_call_ns(observe, count),
+        "labels() + observe": per_call_ns(labelled_observe, count),
+        "span, no trace": per_call_ns(bare_span, count),
+    }
+    with start_trace("bench") as trace:
+        results["span inside trace"] = per_call_ns(traced_span, count)
+        trace.spans.clear()
+    return results
+
+
+def start_app(port):
+    """Serve the API router, the metrics middleware and /metrics from a background thread"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(api.router, prefix="/api")
+    app.add_api_route("/metrics", lambda: PlainTextResponse(REGISTRY.render()), methods=["GET"])
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+
+async def end_to_end(args):
+    stub = await StubUpstream(latency=args.latency).start()
+    stub.point_settings(settings)
+    api.ai_handler = AIHandler()
+    server, thread = await asyncio.to_thread(start_app, args.port)
+    base = f"http://127.0.0.1:{args.port}"
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            timing = None
+            for _ in range(args.requests):
+                command = f"What's the weather in City{next(CITIES)}?"
+                async with session.post(f"{base}/api/command", json={"command": command}) as response:
+                    timing = response.headers.get("Server-Timing")
+                    assert (await response.json())["success"]
+
+            renders = []
+            for _ in range(20):
+                start = time.perf_counter()
+                async with session.get(f"{base}/metrics") as response:
+                    text = await response.text()
+                renders.append(time.perf_counter() - start)
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(thread.join)
+        await stub.stop()
+    return timing, text, min(renders)
+
+
+def main(args):
+    for name, ns in primitives(args.calls).items():
+        print(f"{name:<20}: {ns:7.0f} ns")
+
+    timing, text, render = asyncio.run(end_to_end(args))
+    print(f"/metrics scrape     : {render * 1000:7.2f} ms ({len(text.splitlines())} lines)")
+    print(f"Server-Timing       : {timing}")
+
+    # Depending on the FastAPI version the route template carries the /api prefix or not
+    expected = [
+        rf'jarvis_http_request_duration_seconds_count{{route="(/api)?/command",method="POST",status="200"}} {args.requests}$',
+        r'jarvis_upstream_request_duration_seconds_count{service="weather"} \d',
+        r'jarvis_intent_duration_seconds_count{intent="weather"} \d',
+    ]
+    missing = [pattern for pattern in expected if not re.search(pattern, text, re.M)]
+    for line in missing:
+        print(f"missing from /metrics: {line}")
+    return 1 if missing or not timing or "fetch-weather" not in timing else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000, help="iterations per primitive")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--port", type=int, default=8766)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+"""Throughput of the local chat model with and without micro-batching.
+
+--tiny swaps in a randomly initialised two-layer GPT-2, so this runs offline.
+
+    python benchmarks/bench_local_model.py --tiny --requests 64
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from brain.local_model import LocalChatModel, tiny_random_loader
+
+PROMPTS = ["hello jarvis", "how are you", "tell me a joke", "what is the news today",
+           "i think so", "good music", "what about python", "maybe tomorrow"]
+
+
+def main(args):
+    loader = tiny_random_loader if args.tiny else None
+    model_name = "tiny-random-gpt2" if args.tiny else None
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.requests)]
+
+    results = {}
+    for label, max_batch in (("unbatched", 1), ("batched", args.max_batch)):
+        model = LocalChatModel(model_name=model_name, loader=loader, max_new_tokens=args.max_new_tokens,
+                               max_batch=max_batch, quantize=args.quantize)
+        start = time.perf_counter()
+        model.start()
+        model.load_thread.join()
+        if not model.ready.is_set():
+            print(f"model failed to load: {model.error}")
+            return 1
+        load_time = time.perf_counter() - start
+
+        model.generate("hello")  # warm up
+        model.counters.update(requests=0, batches=0)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.requests) as pool:
+            replies = list(pool.map(model.generate, prompts))
+        elapsed = time.perf_counter() - start
+        results[label] = elapsed
+
+        stats = model.stats()
+        print(f"{label:9s}: {args.requests / elapsed:7.1f} replies/s, avg batch {stats['avg_batch_size']}, "
+              f"load {load_time:.2f}s, {sum(r is not None for r in replies)} replies")
+
+    session = LocalChatModel(model_name=model_name, loader=loader, max_new_tokens=args.max_new_tokens,
+                             quantize=args.quantize)
+    session.start()
+    session.load_thread.join()
+    session.generate("hello jarvis", session_id="demo")
+    session.generate("tell me a joke", session_id="demo")
+    print(f"session context: {len(session.sessions['demo'])} tokens kept for 'demo'")
+    print(f"speed-up from batching: {results['unbatched'] / results['batched']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiny", action="store_true", help="use a tiny random model instead of AI_MODEL_NAME")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=20)
+    parser.add_argument("--quantize", action="store_true")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,133 @@
+"""Measure how weather lookups behave while the upstream hangs, with and without circuit breakers.
+
+Sends --rate lookups per second for --seconds against a stub upstream that
+stops answering, first with the breaker and adaptive limit effectively
+disabled and then with the configured ones. Also checks that a cached city is still answered from
+its expired entry during the outage, that a half-open probe closes the
+circuit once the upstream recovers, and that the per-client rate limit
+refuses a burst over RATE_LIMIT_BURST with 429.
+
+    python benchmarks/bench_resilience.py --rate 20 --seconds 5 --timeout 0.5
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import aiohttp
+import uvicorn
+from fastapi import FastAPI
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings
+from benchmarks.stub_upstream import StubUpstream
+from services.weather import WeatherService
+from web import api
+from web.rate_limit import RateLimiter, RateLimitMiddleware
+
+
+async def outage(stub, args, protected):
+    """Latencies of lookups sent at a steady rate while the stub hangs, plus upstream calls made"""
+    if not protected:
+        settings.CIRCUIT_FAILURE_THRESHOLD = 10 ** 9
+        settings.UPSTREAM_MIN_CONCURRENCY = settings.HTTP_POOL_SIZE
+        settings.UPSTREAM_QUEUE_TIMEOUT = 3600
+    service = WeatherService()
+    stub.latency = 0.01
+    await service.get_weather_async("London")
+    await asyncio.sleep(settings.CACHE_TTLS["weather"] + 0.1)  # London is now expired but kept as a fallback
+
+    stub.latency, stub.hits = args.timeout * 20, 0
+    latencies, replies = [], []
+
+    async def one(city):
+        start = time.perf_counter()
+        replies.append(await service.get_weather_async(city))
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    for i in range(int(args.rate * args.seconds)):
+        tasks.append(asyncio.create_task(one(f"City{i}")))
+        await asyncio.sleep(1 / args.rate)
+    london = await service.get_weather_async("London")
+    await asyncio.gather(*tasks)
+
+    stub.latency = 0.01
+    await asyncio.sleep(settings.CIRCUIT_OPEN_SECONDS)
+    recovered = await service.get_weather_async("Recovered")
+    upstream = service.http.upstream_stats()
+    await service.http.close_async()
+    for name in ("CIRCUIT_FAILURE_THRESHOLD", "UPSTREAM_MIN_CONCURRENCY", "UPSTREAM_QUEUE_TIMEOUT"):
+        setattr(settings, name, getattr(type(settings), name))
+    return latencies, stub.hits, london, recovered, upstream
+
+
+async def rate_limited(port, burst):
+    """Status codes for a burst of requests from one client"""
+    async with aiohttp.ClientSession() as session:
+        async def one():
+            async with session.get(f"http://127.0.0.1:{port}/api/traces") as response:
+                return response.status
+        return await asyncio.gather(*(one() for _ in range(burst)))
+
+
+async def main(args):
+    settings.HTTP_TIMEOUTS = {**settings.HTTP_TIMEOUTS, "weather": args.timeout}
+    settings.CACHE_TTLS = {**settings.CACHE_TTLS, "weather": 0.2}
+    settings.CACHE_STALE_TTL = 0
+    settings.CIRCUIT_OPEN_SECONDS = 1
+    stub = await StubUpstream().start()
+    stub.point_settings(settings)
+    try:
+        baseline = await outage(stub, args, protected=False)
+        guarded = await outage(stub, args, protected=True)
+    finally:
+        await stub.stop()
+
+    print(f"{int(args.rate * args.seconds)} lookups at {args.rate}/s, upstream hanging, timeout {args.timeout}s")
+    for label, (latencies, hits, london, recovered, upstream) in (("unprotected", baseline), ("protected", guarded)):
+        print(f"{label:>11}: p50 {statistics.median(latencies) * 1000:7.0f} ms  "
+              f"max {max(latencies) * 1000:7.0f} ms  upstream calls {hits}")
+    latencies, hits, london, recovered, upstream = guarded
+    circuit = next(iter(upstream.values()))
+    fallback_ok = london.startswith("The weather in London")
+    recovered_ok = recovered.startswith("The weather in Recovered") and circuit["circuit"]["state"] == "closed"
+    print(f"expired London entry served during outage: {fallback_ok}")
+    print(f"circuit closed again after recovery: {recovered_ok}  ({circuit})")
+
+    limiter = RateLimiter(rate=args.client_rps, burst=args.client_burst)
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    app.include_router(api.router, prefix="/api")
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        statuses = await rate_limited(args.port, args.client_burst * 2)
+    finally:
+        server.should_exit = True
+        thread.join()
+    refused = statuses.count(429)
+    print(f"burst of {len(statuses)} from one client: {len(statuses) - refused} served, {refused} refused with 429")
+
+    speedup = statistics.median(baseline[0]) / statistics.median(latencies)
+    return 0 if fallback_ok and recovered_ok and speedup > 2 and refused else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=20)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    parser.add_argument("--client-rps", type=float, default=5)
+    parser.add_argument("--client-burst", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8021)
+    logging.disable(logging.ERROR)  # every failed lookup logs; the summary is enough
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,63 @@
+"""Check request coalescing and hit rate of the service response caches.
+
+Fires --requests concurrent weather lookups for one city on both the async
+and the threaded sync path; each burst must reach the stub upstream once.
+
+    python benchmarks/bench_response_cache.py --requests 100
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings
+from brain.ai_handler import AIHandler
+from benchmarks.stub_upstream import StubUpstream
+
+
+async def main(args):
+    stub = await StubUpstream(latency=args.latency).start()
+    stub.point_settings(settings)
+    handler = AIHandler()
+    weather = handler.weather_service
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(weather.get_weather_async("London") for _ in range(args.requests)))
+        async_elapsed = time.perf_counter() - start
+        async_hits = stub.hits
+
+        def run_sync():
+            with ThreadPoolExecutor(args.requests) as pool:
+                list(pool.map(lambda _: weather.get_weather("Paris"), range(args.requests)))
+
+        start = time.perf_counter()
+        await asyncio.to_thread(run_sync)
+        sync_elapsed = time.perf_counter() - start
+        sync_hits = stub.hits - async_hits
+
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            weather.get_weather("London")
+        warm_elapsed = time.perf_counter() - start
+
+        print(f"async burst : {args.requests} lookups, {async_hits} upstream fetch(es), {async_elapsed:.3f}s")
+        print(f"sync burst  : {args.requests} lookups, {sync_hits} upstream fetch(es), {sync_elapsed:.3f}s")
+        print(f"warm hits   : {args.requests} lookups in {warm_elapsed * 1000:.2f}ms")
+        print(json.dumps(handler.cache_stats()["weather"], indent=2))
+        return 0 if async_hits == 1 and sync_hits == 1 else 1
+    finally:
+        await handler.close()
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
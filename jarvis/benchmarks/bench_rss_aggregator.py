@@ -0,0 +1,54 @@
+"""Measure RSS polling (parallel fetch, 304s on repeat) and news read latency.
+
+    python benchmarks/bench_rss_aggregator.py --latency 0.3 --reads 10000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings
+from services.news import NewsService
+from benchmarks.stub_upstream import StubUpstream
+
+
+async def main(args):
+    stub = await StubUpstream(latency=args.latency).start()
+    stub.point_settings(settings)
+    news = NewsService()
+    aggregator = news.aggregator
+
+    try:
+        start = time.perf_counter()
+        added = await asyncio.to_thread(aggregator.refresh)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.to_thread(aggregator.refresh)
+        warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.reads):
+            answer = news.get_latest_news()
+        read = (time.perf_counter() - start) / args.reads
+
+        feeds = len(settings.NEWS_RSS_FEEDS)
+        print(f"cold refresh : {feeds} feeds in {cold:.3f}s ({added} headlines, serial bound {feeds * args.latency:.3f}s)")
+        print(f"warm refresh : {warm:.3f}s")
+        print(f"news read    : {read * 1e6:.1f}us per get_latest_news")
+        print(f"answer       : {answer}")
+        print(json.dumps(aggregator.stats(), indent=2))
+        return 0 if aggregator.stats()["not_modified"] == feeds else 1
+    finally:
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--reads", type=int, default=10000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,95 @@
+"""Insert, cancel and dispatch throughput of the task scheduler with a large backlog.
+
+Tasks are persisted to a temporary SQLite database.
+
+    python benchmarks/bench_scheduler.py --tasks 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from automation.scheduler import Task, TaskScheduler
+
+
+def main(args):
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "bench.db")
+        fired = []
+        done = threading.Event()
+
+        def count(message):
+            fired.append(message)
+            if len(fired) == expected:
+                done.set()
+
+        scheduler = TaskScheduler(database_path=database)
+        scheduler.register_action("count", count)
+        far = time.time() + 3600
+
+        # One transaction per task, as add_reminder does
+        start = time.perf_counter()
+        for i in range(args.single):
+            scheduler.add_task(f"single-{i}", "x", far + random.random() * 3600, action="count")
+        single_rate = args.single / (time.perf_counter() - start)
+
+        # Bulk insert the backlog
+        tasks = [Task(f"task-{i}", "x", "count", far + random.random() * 3600) for i in range(args.tasks)]
+        start = time.perf_counter()
+        for i in range(0, len(tasks), args.batch):
+            scheduler.add_tasks(tasks[i:i + args.batch])
+        bulk_rate = args.tasks / (time.perf_counter() - start)
+
+        # Idle cost: the worker should sleep until the first task is due
+        scheduler.start()
+        cpu_start = time.process_time()
+        time.sleep(args.idle)
+        idle_cpu = time.process_time() - cpu_start
+
+        cancel = random.sample(range(args.tasks), args.cancel)
+        start = time.perf_counter()
+        for i in cancel:
+            scheduler.remove_task(f"task-{i}")
+        cancel_rate = args.cancel / (time.perf_counter() - start)
+
+        # Dispatch: tasks due now, added while the backlog is pending
+        expected = args.due
+        start = time.perf_counter()
+        now = time.time()
+        scheduler.add_tasks([Task(f"due-{i}", str(i), "count", now) for i in range(args.due)])
+        done.wait(60)
+        dispatch_rate = len(fired) / (time.perf_counter() - start)
+
+        stats = scheduler.stats()
+        scheduler.stop()
+
+        reloaded = TaskScheduler(database_path=database)
+        pending_after_restart = len(reloaded.scheduled_tasks)
+        reloaded.stop()
+
+    print(f"insert (one per transaction): {single_rate:10.0f} tasks/s")
+    print(f"insert (batches of {args.batch}):   {bulk_rate:10.0f} tasks/s")
+    print(f"cancel:                       {cancel_rate:10.0f} tasks/s")
+    print(f"dispatch:                     {dispatch_rate:10.0f} tasks/s ({len(fired)} fired)")
+    print(f"idle CPU with {stats['pending']} pending: {idle_cpu * 1000:.1f} ms over {args.idle}s")
+    print(f"heap size {stats['heap_size']}, compactions {stats['compactions']}, "
+          f"{pending_after_restart} tasks reloaded after restart")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--single", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--cancel", type=int, default=20000)
+    parser.add_argument("--due", type=int, default=20000)
+    parser.add_argument("--idle", type=float, default=2.0)
+    sys.exit(main(parser.parse_args()))
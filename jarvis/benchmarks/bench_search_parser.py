@@ -0,0 +1,103 @@
+"""Parsing speed of search result extraction on saved DuckDuckGo result pages.
+
+Pass saved pages with --pages; otherwise pages with the same markup as
+html.duckduckgo.com (head, inline styles, 30 results with nested links,
+footer) are generated. The legacy row is BeautifulSoup's html.parser with a
+find_all over the whole tree, as the service used to do. The "streamed"
+rows feed each page in CHUNK_SIZE pieces through the parser's feeder, as
+streaming searches do.
+
+    python benchmarks/bench_search_parser.py --iterations 200
+"""
+import argparse
+import gc
+import glob
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.search_parser import FEEDERS, PARSERS, available_parsers, parse_chunked
+
+HEAD = ("<!DOCTYPE html><html><head><meta charset='utf-8'><title>{query} at DuckDuckGo</title>"
+        "<style>" + "".join(f".c{i}{{margin:{i}px;padding:0}}" for i in range(300)) + "</style>"
+        "<script>var DDG = {};" + "x=1;" * 500 + "</script></head><body class='body--html'>"
+        "<div id='header'><form action='/html/' method='post'><input name='q' value='{query}'>"
+        "<input type='submit' value='S'></form></div><div id='links' class='results'>")
+
+RESULT = (
+    '<div class="result results_links results_links_deep web-result "><div class="links_main links_deep result__body">'
+    '<h2 class="result__title"><a rel="nofollow" class="result__a" href="https://example{i}.com/{query}">'
+    '{query} guide part {i} &mdash; <b>{query}</b> explained</a></h2>'
+    '<div class="result__extras"><div class="result__extras__url"><span class="result__icon">'
+    '<a rel="nofollow" href="https://example{i}.com/"><img class="result__icon__img" width="16" height="16" '
+    'alt="" src="//external-content.duckduckgo.com/ip3/example{i}.com.ico" name="i15" /></a></span>'
+    '<a class="result__url" href="https://example{i}.com/{query}">example{i}.com/{query}</a></div></div>'
+    '<a class="result__snippet" href="https://example{i}.com/{query}">Learn about <b>{query}</b> with '
+    'examples &amp; tips. Result {i} covers the basics, advanced topics and common pitfalls.</a>'
+    '<div class="clear"></div></div></div>'
+)
+
+FOOT = ("<div class='nav-link'><form action='/html/' method='post'><input type='submit' value='Next'>"
+        "<input type='hidden' name='s' value='30'></form></div></div><div id='footer'>"
+        + "<a href='#'>link</a>" * 50 + "</div></body></html>")
+
+
+def generated_page(query, results=30):
+    return (HEAD.replace("{query}", query) + "".join(RESULT.format(i=i, query=query) for i in range(results))
+            + FOOT).encode("utf-8")
+
+
+def parse_legacy(content, num_results):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "html.parser")
+    results = []
+    for element in soup.find_all("div", class_="result")[:num_results]:
+        title = element.find("a", class_="result__a")
+        snippet = element.find(class_="result__snippet")
+        if title and snippet:
+            results.append(f"{title.get_text().strip()}: {snippet.get_text().strip()}")
+    return results
+
+
+def streamed(feeder):
+    """parse(content, num_results) through a feeder, fed CHUNK_SIZE bytes at a time"""
+    return lambda content, num_results: parse_chunked(feeder(num_results), content)
+
+
+def main(args):
+    if args.pages:
+        pages = [Path(path).read_bytes() for path in sorted(glob.glob(args.pages))]
+    else:
+        pages = [generated_page(query) for query in ("python", "weather london", "jarvis assistant")]
+    print(f"{len(pages)} pages, {sum(map(len, pages)) // len(pages) // 1024} KiB average, "
+          f"{args.num_results} results per search")
+
+    parsers = [("legacy bs4", parse_legacy)] + [(name, PARSERS[name]) for name in available_parsers()]
+    parsers += [(f"{name} streamed", streamed(FEEDERS[name])) for name in available_parsers(streaming=True)]
+    expected = [parse_legacy(page, args.num_results) for page in pages]
+    baseline = None
+    for name, parse in parsers:
+        for page in pages:
+            parse(page, args.num_results)  # warm up
+        gc.collect()  # don't bill this parser for collecting the previous one's garbage
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            for page in pages:
+                parse(page, args.num_results)
+        per_page = (time.perf_counter() - start) / (args.iterations * len(pages))
+        baseline = baseline or per_page
+        same = all(parse(page, args.num_results) == want for page, want in zip(pages, expected))
+        print(f"{name:19s}: {per_page * 1000:7.3f} ms/page  {baseline / per_page:6.1f}x  "
+              f"{'same results' if same else 'DIFFERENT results'}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", help="glob of saved result pages, e.g. 'pages/*.html'")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--num-results", type=int, default=3)
+    sys.exit(main(parser.parse_args()))
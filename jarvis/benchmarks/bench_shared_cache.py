@@ -0,0 +1,74 @@
+"""Show that worker processes sharing the SQLite lookup cache don't multiply upstream calls.
+
+Starts --workers processes that each build their own WeatherService and ask
+for the same --cities cities at the same moment, against a stub upstream
+with --latency seconds per call. Counts the upstream calls with each process
+caching on its own and with the shared store.
+
+    python benchmarks/bench_shared_cache.py --workers 4 --cities 20 --latency 0.2
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings
+from benchmarks.stub_upstream import StubUpstream, upstream_settings
+
+
+def worker(stub_url, shared, path, cities, start_at):
+    """One API worker: its own service and cache, the same lookups as every other worker"""
+    settings.SHARED_CACHE = shared
+    settings.SHARED_CACHE_PATH = path
+    for name, value in upstream_settings(stub_url).items():
+        setattr(settings, name, value)
+    from services.weather import WeatherService
+
+    async def run():
+        service = WeatherService()
+        await asyncio.sleep(max(start_at - time.time(), 0))
+        await asyncio.gather(*(service.get_weather_async(f"City{i}") for i in range(cities)))
+        await service.http.close_async()
+        return service.cache.stats()
+
+    return asyncio.run(run())
+
+
+async def run_workers(stub, args, shared, path):
+    stub.hits = 0
+    context = multiprocessing.get_context("spawn")
+    start_at = time.time() + 3  # every worker has imported and built its service by then
+    with context.Pool(args.workers) as pool:
+        result = pool.starmap_async(worker, [(stub.url, shared, path, args.cities, start_at)] * args.workers)
+        stats = await asyncio.to_thread(result.get)
+    return stub.hits, stats
+
+
+async def main(args):
+    stub = await StubUpstream(latency=args.latency).start()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            separate, _ = await run_workers(stub, args, False, os.path.join(directory, "unused.db"))
+            shared, stats = await run_workers(stub, args, True, os.path.join(directory, "cache.db"))
+    finally:
+        await stub.stop()
+
+    print(f"{args.workers} workers x {args.cities} cities, upstream latency {args.latency:.2f}s")
+    print(f"upstream calls, per-process caches : {separate}")
+    print(f"upstream calls, shared SQLite cache: {shared}  (ideal {args.cities})")
+    print(f"per worker: fetched {[s['fetches'] for s in stats]}, from other workers {[s['shared_hits'] for s in stats]}")
+    return 0 if shared <= args.cities else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--cities", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,88 @@
+"""Cold start of the API: time until /health answers and until every component is ready.
+
+Starts `uvicorn main:app` in a fresh headless process, polls /health, and
+prints the per-component import/init report plus the slowest imports of
+main.py itself (python -X importtime).
+
+    python benchmarks/bench_startup.py --port 8011
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def poll_health(port, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                return json.loads(response.read())
+        except Exception:
+            time.sleep(0.01)
+    return None
+
+
+def slowest_imports(count):
+    """(cumulative seconds, module) of the slowest modules imported directly by main.py"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT,
+                            env={**os.environ, "JARVIS_HEADLESS": "1"}, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, module = line[len("import time:"):].split("|")
+            if module.startswith("   ") and module[3] != " ":  # nested one level under main
+                imports.append((int(cumulative) / 1e6, module.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def timing(value):
+    """A component timing, or "-" for a step it never reached"""
+    return "-" if value is None else f"{value}s"
+
+
+def main(args):
+    env = {**os.environ, "JARVIS_HEADLESS": "1"}
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+                               "--log-level", "warning"], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = start + args.timeout
+        health = poll_health(args.port, deadline)
+        if health is None:
+            print("server did not answer /health")
+            return 1
+        first_health = time.perf_counter() - start
+        while not health["ready"] and time.perf_counter() < deadline:
+            if any(c["state"] in ("failed", "skipped") for c in health["components"].values()):
+                break
+            time.sleep(0.05)
+            health = poll_health(args.port, deadline)
+        all_ready = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"process start -> first /health: {first_health:.2f}s (imports of main.py {health['import_seconds']:.2f}s)")
+    print(f"process start -> all components ready: {all_ready:.2f}s (ready={health['ready']})")
+    for name, component in health["components"].items():
+        print(f"  {name:10s} {component['state']:9s} import {timing(component['import_seconds'])}, "
+              f"init {timing(component['init_seconds'])}, ready after {timing(component['ready_after'])}")
+    print("slowest imports of main.py:")
+    for seconds, module in slowest_imports(args.imports):
+        print(f"  {seconds:6.3f}s {module}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--imports", type=int, default=8)
+    sys.exit(main(parser.parse_args()))
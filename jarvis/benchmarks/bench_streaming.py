@@ -0,0 +1,135 @@
+"""Compare time to first byte and first audio for /api/command and its streaming variants.
+
+Serves the API router against a stub upstream whose search page arrives one
+result every --chunk-delay seconds and whose instant answer API has nothing,
+with a silent speaker that records when each utterance starts. Each search
+is sent through POST /api/command, POST /api/command/stream (SSE) and the
+/api/command/ws WebSocket. With --tiny-model, chat commands are also
+answered by a tiny local model that streams its tokens.
+
+    python benchmarks/bench_streaming.py --requests 10 --latency 0.2 --chunk-delay 0.05
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp
+
+from config.settings import settings
+from brain.ai_handler import AIHandler
+from voice.speaker import VoiceSpeaker
+from voice.tts_backends import NullBackend
+from web import api
+from benchmarks.bench_async_command import start_api
+from benchmarks.stub_upstream import StubUpstream
+
+QUERIES = itertools.count()
+
+
+class TimedBackend(NullBackend):
+    """Silent backend that records when each utterance starts playing"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = []
+
+    def say(self, text):
+        self.started.append(time.perf_counter())
+        super().say(text)
+
+
+async def plain(session, base, command):
+    async with session.post(f"{base}/api/command", json={"command": command}) as response:
+        body = await response.json()
+    return time.perf_counter(), body["response"]
+
+
+async def sse(session, base, command):
+    first, text = None, None
+    async with session.post(f"{base}/api/command/stream", json={"command": command}) as response:
+        async for line in response.content:
+            if line.startswith(b"data:"):
+                first = first or time.perf_counter()
+                text = json.loads(line[5:]).get("response", text)
+    return first, text
+
+
+async def websocket(session, base, command):
+    first = None
+    async with session.ws_connect(f"{base.replace('http', 'ws')}/api/command/ws") as socket:
+        await socket.send_json({"command": command})
+        while True:
+            message = await socket.receive_json()
+            first = first or time.perf_counter()
+            if message["type"] == "done":
+                return first, message["response"]
+
+
+async def measure(session, base, backend, send, command):
+    """(seconds to first byte, seconds to first audio, response)"""
+    backend.started.clear()
+    start = time.perf_counter()
+    first, text = await send(session, base, command)
+    while not backend.started:
+        await asyncio.sleep(0.001)
+    return first - start, backend.started[0] - start, text
+
+
+async def main(args):
+    stub = await StubUpstream(latency=args.latency, chunk_delay=args.chunk_delay, quick_answers=False).start()
+    stub.point_settings(settings)
+    settings.TTS_CACHE_ENABLED = False
+
+    backend = TimedBackend()
+    api.voice_speaker = VoiceSpeaker(backend=backend)
+    api.ai_handler = AIHandler()
+    commands = {"search": lambda: f"search for topic {next(QUERIES)}"}
+    if args.tiny_model:
+        from brain.local_model import LocalChatModel, tiny_random_loader
+
+        api.ai_handler.local_model = LocalChatModel(loader=tiny_random_loader, max_new_tokens=args.tokens)
+        api.ai_handler.local_model.start()
+        api.ai_handler.local_model.ready.wait()
+        commands["chat"] = lambda: "tell me a joke about python music today"
+    server, thread = await asyncio.to_thread(start_api, args.port)
+    base = f"http://127.0.0.1:{args.port}"
+
+    failed = False
+    try:
+        async with aiohttp.ClientSession() as session:
+            for kind, command in commands.items():
+                print(f"{kind}:")
+                results = {}
+                for name, send in (("command", plain), ("stream (SSE)", sse), ("websocket", websocket)):
+                    await measure(session, base, backend, send, command())  # warm up
+                    runs = [await measure(session, base, backend, send, command()) for _ in range(args.requests)]
+                    results[name] = runs
+                    print(f"  {name:<13}: first byte {statistics.median(r[0] for r in runs) * 1000:7.1f} ms"
+                          f"   first audio {statistics.median(r[1] for r in runs) * 1000:7.1f} ms")
+                failed |= (statistics.median(r[0] for r in results["stream (SSE)"])
+                           >= statistics.median(r[0] for r in results["command"]))
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(thread.join)
+        await stub.stop()
+        api.voice_speaker.stop()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--chunk-delay", type=float, default=0.05,
+                        help="seconds between search results arriving from the stub")
+    parser.add_argument("--tiny-model", action="store_true", help="also stream chat replies from a tiny local model")
+    parser.add_argument("--tokens", type=int, default=40, help="tokens generated per chat reply")
+    parser.add_argument("--port", type=int, default=8767)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,61 @@
+"""Time to first audio for fixed phrases, synthesized vs replayed from the audio cache.
+
+The headless backend pretends synthesis takes --synth-ms before audio starts.
+
+    python benchmarks/bench_tts_cache.py --synth-ms 150 --repeats 20
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from voice.audio_cache import AudioCache
+from voice.listener import PHRASES
+from voice.speaker import VoiceSpeaker
+from voice.tts_backends import NullBackend
+
+
+def time_phrases(speaker, repeats):
+    """Average seconds from speak() to done, per phrase"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for phrase in PHRASES:
+            speaker.speak(phrase)
+    return (time.perf_counter() - start) / (repeats * len(PHRASES))
+
+
+def main(args):
+    # Zero speaking time, so the timings are the synthesis (or cache lookup) overhead
+    backend = NullBackend(synth_seconds=args.synth_ms / 1000)
+    with tempfile.TemporaryDirectory() as directory:
+        cold = VoiceSpeaker(backend=backend, audio_cache=AudioCache(directory, max_bytes=10 * 1024 * 1024))
+        cold.voice = None  # caching off
+        uncached = time_phrases(cold, args.repeats)
+        cold.stop()
+
+        warm = VoiceSpeaker(backend=backend, audio_cache=AudioCache(directory, max_bytes=10 * 1024 * 1024))
+        start = time.perf_counter()
+        warm.prewarm(PHRASES)
+        while warm.stats()["pending_renders"] or warm.stats()["audio_cache"]["rendered"] < len(PHRASES):
+            time.sleep(0.01)
+        prewarm_time = time.perf_counter() - start
+        cached = time_phrases(warm, args.repeats)
+        stats = warm.stats()
+        warm.stop()
+
+    print(f"synthesized: {uncached * 1000:8.2f} ms per phrase")
+    print(f"cached:      {cached * 1000:8.2f} ms per phrase (prewarm took {prewarm_time:.2f}s)")
+    print(f"speed-up: {uncached / cached:.1f}x")
+    print(json.dumps(stats["audio_cache"], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synth-ms", type=float, default=150)
+    parser.add_argument("--repeats", type=int, default=20)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,55 @@
+"""Burst the speech queue with a headless backend and report drops and latency.
+
+Speaking time is simulated at --ms-per-char per character.
+
+    python benchmarks/bench_tts_queue.py --burst 200 --ms-per-char 2
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings
+from voice.speaker import VoiceSpeaker, PRIORITY_REMINDER
+from voice.tts_backends import NullBackend
+
+
+def main(args):
+    settings.TTS_MAX_QUEUE_AGE = args.max_age
+    settings.TTS_CACHE_ENABLED = False  # measure the queue, not the audio cache
+    backend = NullBackend(seconds_per_char=args.ms_per_char / 1000)
+    speaker = VoiceSpeaker(backend=backend)
+
+    start = time.perf_counter()
+    for i in range(args.burst):
+        speaker.speak_async(f"Chit-chat message number {i} with a little filler text")
+        if i % 5 == 0:
+            speaker.speak_async(f"Status now at step {i}", key="status")  # superseded while queued
+    enqueue_time = time.perf_counter() - start
+
+    time.sleep(0.05)  # let a chit-chat utterance start playing
+    reminder_start = time.perf_counter()
+    speaker.speak("Reminder: stand-up in five minutes", priority=PRIORITY_REMINDER)
+    reminder_latency = time.perf_counter() - reminder_start
+
+    while speaker.stats()["queue_depth"] or speaker.stats()["speaking"]:
+        time.sleep(0.01)
+    drain_time = time.perf_counter() - start
+    speaker.stop()
+
+    print(f"enqueue {args.burst} messages : {enqueue_time * 1000:.2f}ms (no threads spawned)")
+    print(f"reminder spoken after      : {reminder_latency:.3f}s")
+    print(f"queue drained after        : {drain_time:.3f}s")
+    print(f"utterances spoken          : {len(backend.spoken)}")
+    print(json.dumps(speaker.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--ms-per-char", type=float, default=2.0)
+    parser.add_argument("--max-age", type=float, default=2.0)
+    main(parser.parse_args())
@@ -0,0 +1,155 @@
+"""Wake word pipeline on recorded audio: recognition calls, accuracy and speed.
+
+Without --wav a synthetic recording is generated: background noise with
+utterances every few seconds, some of them a synthetic "wake word" (a
+gliding two-syllable tone pattern, with its own enrolled templates). The
+transcriber is a stub that counts calls, so no network is used.
+
+    python benchmarks/bench_wake_pipeline.py --seconds 120
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings
+from voice.audio_frontend import WavSource
+from voice.listener import VoiceListener
+from voice.wake_word import SpeechSegmentDetector, TemplateWakeWordDetector
+
+RATE = 16000
+LEGACY_CLIP_SECONDS = 4  # 1 s listen timeout + 3 s phrase limit per recognize_google call
+
+
+def syllable(rng, start_hz, end_hz, seconds, speed=1.0, pitch=1.0):
+    n = int(seconds / speed * RATE)
+    freq = np.linspace(start_hz, end_hz, n) * pitch
+    phase = 2 * np.pi * np.cumsum(freq) / RATE
+    envelope = np.hanning(n)
+    voiced = np.sin(phase) + 0.5 * np.sin(2 * phase) + 0.25 * np.sin(3 * phase)
+    return envelope * voiced * 6000 * rng.uniform(0.7, 1.2)
+
+
+def wake_word(rng):
+    speed, pitch = rng.uniform(0.85, 1.15), rng.uniform(0.93, 1.07)
+    gap = np.zeros(int(0.05 * RATE))
+    return np.concatenate([syllable(rng, 250, 700, 0.3, speed, pitch), gap,
+                           syllable(rng, 900, 400, 0.35, speed, pitch)])
+
+
+def other_speech(rng):
+    parts = []
+    for _ in range(rng.integers(2, 6)):
+        a, b = rng.uniform(150, 1000, size=2)
+        parts += [syllable(rng, a, b, rng.uniform(0.15, 0.4)), np.zeros(int(rng.uniform(0.03, 0.1) * RATE))]
+    return np.concatenate(parts)
+
+
+def write_wav(path, samples):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(np.clip(samples, -32768, 32767).astype(np.int16).tobytes())
+
+
+def synthesize(path, seconds, rng):
+    """Write the recording; returns [(start, end, is_wake_word)] of each utterance"""
+    audio = rng.normal(0, 60, int(seconds * RATE))
+    events, t = [], 1.0
+    while True:
+        is_wake = rng.random() < 0.3
+        clip = wake_word(rng) if is_wake else other_speech(rng)
+        if is_wake and rng.random() < 0.5:
+            clip = np.concatenate([clip, np.zeros(int(0.15 * RATE)), other_speech(rng)])  # "jarvis, <command>"
+        start = int(t * RATE)
+        if start + len(clip) >= len(audio):
+            break
+        audio[start:start + len(clip)] += clip
+        events.append((t, t + len(clip) / RATE, is_wake))
+        t += len(clip) / RATE + rng.uniform(1.5, 5.0)
+    write_wav(path, audio)
+    return events
+
+
+class StubSpeaker:
+    def speak(self, text):
+        pass
+
+
+class StubHandler:
+    def process_command(self, command):
+        return "ok"
+
+
+def run(path, detector, events):
+    """Run the listener over the recording with a ground-truth transcriber"""
+    detections = []
+
+    def transcribe(segment):
+        for start, end, is_wake in events:
+            if start < segment.end and end > segment.start:
+                if is_wake:
+                    detections.append(segment.end - start)
+                    return f"{settings.WAKE_WORD} what time is it"
+                return "some other words"
+        return None
+
+    listener = VoiceListener(StubSpeaker(), StubHandler(), source=WavSource(path), detector=detector,
+                             transcribe=transcribe)
+    started = time.perf_counter()
+    listener.start_listening()
+    return listener.stats(), detections, time.perf_counter() - started
+
+
+def main(args):
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        events = []
+        path = args.wav
+        if not path:
+            path = os.path.join(directory, "recording.wav")
+            events = synthesize(path, args.seconds, rng)
+            templates = os.path.join(directory, "templates")
+            os.makedirs(templates)
+            for i in range(args.templates):
+                write_wav(os.path.join(templates, f"wake_{i}.wav"), wake_word(rng))
+        else:
+            templates = args.templates_dir
+
+        with wave.open(path, "rb") as wav:
+            duration = wav.getnframes() / wav.getframerate()
+        wake_events = sum(is_wake for _, _, is_wake in events)
+        print(f"recording: {duration:.0f}s, {len(events)} utterances, {wake_events} with the wake word")
+        print(f"legacy loop: ~{duration / LEGACY_CLIP_SECONDS:.0f} recognize_google calls "
+              f"(one per clip of up to {LEGACY_CLIP_SECONDS}s, speech or not)")
+
+        for label, detector in (("vad only", SpeechSegmentDetector()),
+                                ("vad + templates", TemplateWakeWordDetector(templates, threshold=args.threshold))):
+            stats, detections, elapsed = run(path, detector, events)
+            frontend = stats.pop("frontend")
+            print(f"{label:15s}: {stats['transcriptions']:4d} recognition calls, "
+                  f"{stats['wake_words']}/{wake_events} wake words, "
+                  f"avg {np.mean(detections) if detections else 0:.2f}s from onset to transcription, "
+                  f"{duration / elapsed:.0f}x realtime")
+        print(json.dumps(frontend, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--wav", help="recording to run instead of synthetic audio (ground truth unknown)")
+    parser.add_argument("--templates-dir", default=settings.WAKE_WORD_TEMPLATES_DIR)
+    parser.add_argument("--templates", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=settings.WAKE_WORD_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,282 @@
+"""Load test the Jarvis API against a local stub upstream and compare with a saved baseline.
+
+Starts the stub upstream and `main:app` (headless, upstream URLs pointed at
+the stub) in their own processes, then drives /api/command,
+/api/weather/{city}, /api/news and /api/search/{query} with a weighted mix
+of requests from closed-loop clients at each concurrency level. Cities and
+search topics are drawn from a pool of --keys names, and --cache-ttl
+shortens how long answers stay cached, which together set the mix of cache
+hits and upstream calls.
+
+Reports throughput, errors and p50/p95/p99 latency per endpoint. With
+--save-baseline the results are written as JSON; with --baseline they are
+compared against a saved run, and the exit code is 1 when p95 latency grew
+or throughput fell by more than --threshold.
+
+    python benchmarks/loadtest.py --concurrency 1,8,32 --duration 10 --save-baseline
+    python benchmarks/loadtest.py --concurrency 1,8,32 --duration 10 --baseline benchmarks/baselines/default.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.stub_upstream import upstream_settings
+
+BASELINE_DIR = ROOT / "benchmarks" / "baselines"
+ENDPOINTS = ("command", "weather", "news", "search")
+CITIES = ["London", "Paris", "Tokyo", "Berlin", "Madrid", "Rome", "Delhi", "Sydney", "Toronto", "Lagos",
+          "Cairo", "Lima", "Oslo", "Dublin", "Vienna", "Prague", "Seoul", "Manila", "Nairobi", "Austin"]
+TOPICS = ["python asyncio", "fastapi streaming", "rss feeds", "weather radar", "text to speech",
+          "wake word detection", "sqlite wal", "connection pooling", "prometheus histograms", "lru cache"]
+COMMANDS = [
+    lambda rng, cities, topics: f"What's the weather in {rng.choice(cities)}?",
+    lambda rng, cities, topics: f"Search for {rng.choice(topics)}",
+    lambda rng, cities, topics: "Give me the latest news",
+    lambda rng, cities, topics: "What time is it?",
+    lambda rng, cities, topics: "Hello Jarvis",
+    lambda rng, cities, topics: f"Calculate {rng.randint(1, 99)} plus {rng.randint(1, 99)}",
+]
+
+
+def key_pool(names, size):
+    """size distinct names, numbering repeats once the list runs out"""
+    return [names[i % len(names)] + (str(i // len(names)) if i >= len(names) else "") for i in range(size)]
+
+
+def parse_mix(text):
+    """'command=4,weather=2' -> {"command": 4.0, "weather": 2.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}, expected one of {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def build_request(endpoint, rng, cities, topics):
+    """(method, path, JSON body) for one request to endpoint"""
+    if endpoint == "command":
+        return "POST", "/api/command", {"command": rng.choice(COMMANDS)(rng, cities, topics)}
+    if endpoint == "weather":
+        return "GET", f"/api/weather/{rng.choice(cities)}", None
+    if endpoint == "news":
+        return "GET", "/api/news", None
+    return "GET", f"/api/search/{rng.choice(topics)}", None
+
+
+def failed(status, body):
+    """Non-2xx responses and the error bodies the API returns with a 200"""
+    return status >= 400 or "error" in body or body.get("success") is False
+
+
+async def run_level(base, mix, concurrency, duration, warmup, seed, keys):
+    """Closed-loop clients for warmup + duration seconds; returns per-endpoint results"""
+    names, weights = list(mix), list(mix.values())
+    cities, topics = key_pool(CITIES, keys), key_pool(TOPICS, keys)
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as session:
+        async def client(worker):
+            rng = random.Random(seed * 1000 + worker)
+            while time.perf_counter() < stop_at:
+                endpoint = rng.choices(names, weights)[0]
+                method, path, body = build_request(endpoint, rng, cities, topics)
+                sent = time.perf_counter()
+                try:
+                    async with session.request(method, base + path, json=body) as response:
+                        bad = failed(response.status, await response.json(content_type=None))
+                except Exception:
+                    bad = True
+                done = time.perf_counter()
+                if sent >= measure_from and done <= stop_at:
+                    samples[endpoint].append(done - sent)
+                    errors[endpoint] += bad
+
+        await asyncio.gather(*(client(worker) for worker in range(concurrency)))
+
+    results = {}
+    for name in names:
+        latencies = sorted(samples[name])
+        results[name] = {
+            "requests": len(latencies),
+            "errors": errors[name],
+            "rps": round(len(latencies) / duration, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        }
+    total = sum(result["requests"] for result in results.values())
+    results["all"] = {"requests": total, "errors": sum(errors.values()), "rps": round(total / duration, 2)}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Lines describing regressions beyond threshold against the baseline results"""
+    regressions = []
+    for level, endpoints in results.items():
+        for name, current in endpoints.items():
+            before = baseline.get(level, {}).get(name)
+            if not before or not before.get("requests"):
+                continue
+            if "p95_ms" in before and current["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(f"c={level} {name}: p95 {before['p95_ms']} -> {current['p95_ms']} ms")
+            if current["rps"] < before["rps"] * (1 - threshold):
+                regressions.append(f"c={level} {name}: throughput {before['rps']} -> {current['rps']} req/s")
+    return regressions
+
+
+def print_level(concurrency, results, baseline):
+    print(f"concurrency {concurrency}:")
+    print(f"  {'endpoint':<9} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  vs baseline p95")
+    for name, result in results.items():
+        if name == "all":
+            continue
+        before = baseline.get(name, {}).get("p95_ms")
+        change = f"{(result['p95_ms'] / before - 1) * 100:+.0f}%" if before else ""
+        print(f"  {name:<9} {result['rps']:8.1f} {result['errors']:7d} {result['p50_ms']:9.1f} "
+              f"{result['p95_ms']:9.1f} {result['p99_ms']:9.1f}  {change}")
+    print(f"  {'all':<9} {results['all']['rps']:8.1f} {results['all']['errors']:7d}")
+
+
+def wait_for(url, process, timeout, check=lambda body: True):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"process exited with code {process.returncode} while waiting for {url}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if check(json.loads(response.read())):
+                    return
+        except Exception:
+            pass
+        time.sleep(0.05)
+    raise SystemExit(f"timed out waiting for {url}")
+
+
+def start_processes(args, workdir):
+    """Start the stub upstream and the headless app; returns (processes, app base URL)"""
+    stub = subprocess.Popen([sys.executable, str(ROOT / "benchmarks" / "stub_upstream.py"),
+                             "--port", str(args.stub_port), "--latency", str(args.latency),
+                             "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+                             "--seed", str(args.seed)], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    stub_url = stub.stdout.readline().strip()
+
+    overrides = upstream_settings(stub_url)
+    overrides.update({
+        "USE_LOCAL_AI": args.local_model,
+        "TTS_CACHE_ENABLED": False,
+        "DATABASE_PATH": os.path.join(workdir, "jarvis.db"),
+        "LOG_LEVEL": "WARNING",
+        "TRACE_SLOW_MS": 60000,
+        "RATE_LIMIT_RPS": 0,  # every load test client shares 127.0.0.1
+    })
+    if args.cache_ttl is not None:
+        overrides["CACHE_TTLS"] = {"weather": args.cache_ttl, "search": args.cache_ttl, "quick_answer": args.cache_ttl}
+        overrides["CACHE_STALE_TTL"] = 0
+    app = subprocess.Popen([sys.executable, str(ROOT / "benchmarks" / "serve_app.py"), "--port", str(args.port),
+                            "--settings", json.dumps(overrides)], cwd=workdir,
+                           stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{args.port}"
+    wait_for(f"{base}/health", app, args.startup_timeout,
+             check=lambda health: health["components"]["ai"]["state"] == "ready")
+    return [app, stub], base
+
+
+def main(args):
+    scenario = {
+        "mix": args.mix, "duration": args.duration, "latency": args.latency, "jitter": args.jitter,
+        "error_rate": args.error_rate, "keys": args.keys, "cache_ttl": args.cache_ttl,
+        "local_model": args.local_model
+    }
+    baseline_path = Path(args.baseline) if args.baseline else None
+    baseline = {}
+    if baseline_path and baseline_path.exists():
+        saved = json.loads(baseline_path.read_text())
+        baseline = saved["results"]
+        if saved["scenario"] != scenario:
+            print(f"warning: baseline was recorded with a different scenario: {saved['scenario']}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        processes, base = start_processes(args, workdir)
+        try:
+            results = {}
+            for concurrency in args.concurrency:
+                results[str(concurrency)] = asyncio.run(
+                    run_level(base, args.mix, concurrency, args.duration, args.warmup, args.seed, args.keys))
+                print_level(concurrency, results[str(concurrency)], baseline.get(str(concurrency), {}))
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+
+    status = 0
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            status = 1
+        else:
+            print(f"no regressions beyond {args.threshold:.0%} against {baseline_path}")
+
+    if args.save_baseline:
+        path = Path(args.save_baseline)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"scenario": scenario, "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                    "results": results}, indent=2) + "\n")
+        print(f"baseline saved to {path}")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("command=4,weather=2,news=1,search=2"),
+                        help="endpoint weights, e.g. command=4,weather=2,news=1,search=2")
+    parser.add_argument("--concurrency", type=lambda text: [int(level) for level in text.split(",")],
+                        default=[1, 8, 32], help="comma-separated client counts, run one after another")
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=2, help="unmeasured seconds before each level")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub upstream latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random stub latency, up to this")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub responses that are 503")
+    parser.add_argument("--keys", type=int, default=50, help="distinct cities and search topics requested")
+    parser.add_argument("--cache-ttl", type=float, help="seconds answers stay cached (default: the app's own TTLs)")
+    parser.add_argument("--local-model", action="store_true", help="let unmatched commands load the local model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", nargs="?", const=str(BASELINE_DIR / "default.json"),
+                        help=f"write results as a baseline (default {BASELINE_DIR.relative_to(ROOT)}/default.json)")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed p95 growth / throughput drop before failing, as a fraction")
+    parser.add_argument("--port", type=int, default=8020)
+    parser.add_argument("--stub-port", type=int, default=0)
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--verbose", action="store_true", help="show the app's log output")
+    sys.exit(main(parser.parse_args()))
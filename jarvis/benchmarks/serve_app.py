@@ -0,0 +1,34 @@
+"""Serve main:app headless with some settings overridden, for the load test.
+
+    python benchmarks/serve_app.py --port 8020 --settings '{"WEATHER_BASE_URL": "http://127.0.0.1:8900/weather"}'
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["JARVIS_HEADLESS"] = "1"  # read when settings is imported
+
+from config.settings import settings
+
+
+def main(args):
+    # Applied before main is imported, so every component is built with them
+    for name, value in json.loads(args.settings).items():
+        if not hasattr(settings, name):
+            raise SystemExit(f"unknown setting: {name}")
+        setattr(settings, name, value)
+
+    import uvicorn
+    from main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8020)
+    parser.add_argument("--settings", default="{}", help="JSON object of Settings attributes to override")
+    main(parser.parse_args())
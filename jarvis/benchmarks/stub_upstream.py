@@ -0,0 +1,159 @@
+"""Local stand-in for wttr.in, the RSS news feeds and DuckDuckGo used by the benchmarks.
+
+Also runs on its own, so a load test does not share a process with it:
+
+    python benchmarks/stub_upstream.py --port 8900 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+from aiohttp import web
+
+WEATHER_PAYLOAD = {
+    "current_condition": [{
+        "temp_C": "18",
+        "FeelsLikeC": "17",
+        "humidity": "60",
+        "weatherDesc": [{"value": "Partly cloudy"}]
+    }]
+}
+
+NEWS_FEEDS = ("bbc", "cnn", "reuters")
+
+
+def rss_feed(name, items=20):
+    """An RSS document whose first story is shared by every feed"""
+    entries = ['<item><title>Shared top story</title><guid>shared</guid>'
+               '<pubDate>Mon, 01 Jan 2024 12:00:00 GMT</pubDate></item>']
+    entries += [
+        f'<item><title>{name} story {i}</title><guid>{name}-{i}</guid>'
+        f'<link>http://stub/{name}/{i}</link>'
+        f'<pubDate>Mon, 01 Jan 2024 {11 - i % 12:02d}:{i % 60:02d}:00 GMT</pubDate></item>'
+        for i in range(1, items)
+    ]
+    return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>{name.upper()} Stub</title>'
+            + "".join(entries) + "</channel></rss>")
+
+
+SEARCH_HTML = "<html><body>" + "".join(
+    f'<div class="result"><a class="result__a" href="#">Result {i}</a>'
+    f'<div class="result__snippet">Snippet text for result {i}</div></div>'
+    for i in range(1, 11)
+) + "</body></html>"
+
+
+def upstream_settings(url):
+    """Settings values that point every upstream at a stub serving on url"""
+    return {
+        "WEATHER_BASE_URL": f"{url}/weather",
+        "NEWS_RSS_FEEDS": [f"{url}/news/{name}.rss" for name in NEWS_FEEDS],
+        "SEARCH_HTML_URL": f"{url}/search/html/",
+        "SEARCH_API_URL": f"{url}/search/api/"
+    }
+
+
+class StubUpstream:
+    def __init__(self, latency=0.5, chunk_delay=0.0, quick_answers=True, error_rate=0.0, jitter=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter  # up to this many extra seconds, uniformly
+        self.error_rate = error_rate  # fraction of requests answered with 503
+        self.random = random.Random(seed)
+        self.errors = 0
+        self.chunk_delay = chunk_delay  # seconds between result blocks of the search page
+        self.quick_answers = quick_answers  # False: the instant answer API never has one
+        self.hits = 0
+        self.runner = None
+        self.url = None
+
+    async def start(self, port=0):
+        """Start serving on localhost, on a free port unless one is given"""
+        app = web.Application()
+        app.router.add_get("/weather/{city}", self._weather)
+        app.router.add_get("/news/{feed}.rss", self._news)
+        app.router.add_get("/search/html/", self._search_html)
+        app.router.add_get("/search/api/", self._search_api)
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def stop(self):
+        """Shut the stub server down"""
+        if self.runner:
+            await self.runner.cleanup()
+
+    def point_settings(self, settings):
+        """Redirect every upstream URL in settings at this stub"""
+        for name, value in upstream_settings(self.url).items():
+            setattr(settings, name, value)
+
+    async def _respond(self):
+        self.hits += 1
+        await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            raise web.HTTPServiceUnavailable()
+
+    async def _weather(self, request):
+        await self._respond()
+        return web.json_response(WEATHER_PAYLOAD)
+
+    async def _news(self, request):
+        await self._respond()
+        name = request.match_info["feed"]
+        etag = f'"{name}-v1"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=rss_feed(name), content_type="application/rss+xml", headers={"ETag": etag})
+
+    async def _search_html(self, request):
+        await self._respond()
+        if not self.chunk_delay:
+            return web.Response(text=SEARCH_HTML, content_type="text/html")
+
+        # Send the page a result at a time, like a slow upstream still rendering it
+        response = web.StreamResponse(headers={"Content-Type": "text/html"})
+        await response.prepare(request)
+        head, *results = SEARCH_HTML.split('<div class="result">')
+        try:
+            for block in [head] + ['<div class="result">' + result for result in results]:
+                await response.write(block.encode())
+                await asyncio.sleep(self.chunk_delay)
+            await response.write_eof()
+        except ConnectionResetError:
+            pass  # streaming parsers hang up once they have enough results
+        return response
+
+    async def _search_api(self, request):
+        await self._respond()
+        if not self.quick_answers:
+            return web.json_response({})
+        return web.json_response({"AbstractText": f"Stub answer for {request.query.get('q')}"})
+
+
+async def serve(args):
+    stub = await StubUpstream(latency=args.latency, chunk_delay=args.chunk_delay, error_rate=args.error_rate,
+                              jitter=args.jitter, seed=args.seed).start(args.port)
+    print(stub.url, flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port; the URL is printed")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -1,16 +1,54 @@
+import logging
+from contextlib import aclosing
 from datetime import datetime
+import asyncio
 import re
 import random
 from config.settings import settings
+from brain.intent_router import IntentRouter
+from brain.local_model import LocalChatModel
+from monitoring.metrics import INTENT_LATENCY
+from monitoring.tracing import span
+from services.http_client import HttpClient
 from services.weather import WeatherService
 from services.news import NewsService
 from services.web_search import WebSearchService
 
+logger = logging.getLogger(__name__)
+
+# Intents in priority order: (name, keywords, handler, async handler).
+# Keywords match whole words, case-insensitively.
+INTENTS = [
+    ("time", ["time", "what time"], "_handle_time", None),
+    ("weather", ["weather", "temperature", "forecast"], "_handle_weather", "_handle_weather_async"),
+    ("news", ["news", "headlines", "latest news"], "_handle_news", None),
+    ("search", ["search", "look up", "find"], "_handle_search", "_handle_search_async"),
+    ("greeting", ["hello", "hi", "hey", "good morning", "good evening"], "_handle_greeting", None),
+    ("thanks", ["thank", "thanks", "thank you", "appreciate", "appreciated"], "_handle_thanks", None),
+    ("goodbye", ["bye", "goodbye", "see you", "later"], "_handle_goodbye", None),
+    ("identity", ["who are you", "what are you", "your name"], "_handle_identity", None),
+    ("math", ["calculate", "plus", "minus", "times", "divided"], "_handle_math", None),
+]
+CHAT_INTENTS = {"greeting", "thanks", "goodbye", "identity", "math"}
+
+# Intents whose answer depends only on one extracted argument, so a batch
+# needs a single upstream lookup per distinct argument
+LOOKUP_ARGUMENTS = {"weather": "extract_city_from_command", "search": "extract_search_query"}
+
+# Intents that can send their answer in pieces; the rest arrive as one piece
+STREAM_HANDLERS = {"search": "_stream_search_async"}
+
+CITY_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (r'\bin (\w+)', r'\bfor (\w+)', r'\bweather (\w+)')]
+SEARCH_FILLER = re.compile(r'\b(search|look up|find|for|about)\b', re.IGNORECASE)
+NUMBER = re.compile(r'\d+')
+
 class AIHandler:
     def __init__(self):
-        self.weather_service = WeatherService()
-        self.news_service = NewsService()
-        self.web_search = WebSearchService()
+        # One pooled client so all services reuse keep-alive connections
+        self.http_client = HttpClient()
+        self.weather_service = WeatherService(self.http_client)
+        self.news_service = NewsService(self.http_client)
+        self.web_search = WebSearchService(self.http_client)
         
         # Simple response patterns for free AI
         self.responses = {
@@ -19,32 +57,121 @@ class AIHandler:
             'goodbye': ["Goodbye! Have a great day!", "See you later!", "Take care!"],
             'unknown': ["I'm not sure about that. Could you try rephrasing?", "That's interesting. Can you tell me more?", "I don't have information on that right now."]
         }
+        
+        # Conversational fallback for commands no intent handles
+        self.local_model = LocalChatModel() if settings.USE_LOCAL_AI else None
+        
+        # Routing table compiled once
+        self.router = IntentRouter([(name, keywords) for name, keywords, _, _ in INTENTS])
+        self.handlers = {name: getattr(self, handler) for name, _, handler, _ in INTENTS}
+        self.async_handlers = {name: getattr(self, handler) for name, _, _, handler in INTENTS if handler}
+        self.stream_handlers = {name: getattr(self, handler) for name, handler in STREAM_HANDLERS.items()}
     
-    def process_command(self, command):
+    def process_command(self, command, session_id=None):
         """Process user command and return appropriate response"""
-        command_lower = command.lower()
+        with span("route"):
+            intent = self.router.route(command)
+        with INTENT_LATENCY.labels(intent or "unknown").time():
+            if intent is None:
+                return self._handle_unknown(command, session_id)
+            return self.handlers[intent](command)
+    
+    async def process_command_async(self, command, session_id=None):
+        """Process user command without blocking the event loop on network calls"""
+        with span("route"):
+            intent = self.router.route(command)
+        with INTENT_LATENCY.labels(intent or "unknown").time():
+            if intent is None:
+                return await self._handle_unknown_async(command, session_id)
+            if intent in self.async_handlers:
+                return await self.async_handlers[intent](command)
+            return self.handlers[intent](command)
+    
+    async def stream_command(self, command, session_id=None):
+        """Yield the response in pieces as they become available: search results
+        as they are parsed and local model text as it is generated"""
+        with span("route"):
+            intent = self.router.route(command)
+        with INTENT_LATENCY.labels(intent or "unknown").time():
+            if intent is None:
+                pieces = self._stream_unknown_async(command, session_id)
+            elif intent in self.stream_handlers:
+                pieces = self.stream_handlers[intent](command)
+            else:
+                if intent in self.async_handlers:
+                    yield await self.async_handlers[intent](command)
+                else:
+                    yield self.handlers[intent](command)
+                return
+            async with aclosing(pieces):
+                async for piece in pieces:
+                    yield piece
+    
+    async def process_commands_async(self, commands, concurrency=None):
+        """Process a batch of commands, returning (response, error) pairs in input order.
+        
+        Commands that need the same lookup (same intent and city/query) share
+        one call, and distinct lookups run concurrently, at most `concurrency`
+        at a time.
+        """
+        results = [None] * len(commands)
+        groups = {}  # (intent, argument) -> indices of the commands that need it
+        chats = []  # indices answered by the local model, which batches them itself
         
-        # Time queries
-        if any(word in command_lower for word in ['time', 'what time']):
-            return self.get_current_time()
+        for i, command in enumerate(commands):
+            try:
+                intent = self.router.route(command)
+                if intent in LOOKUP_ARGUMENTS:
+                    argument = getattr(self, LOOKUP_ARGUMENTS[intent])(command)
+                    groups.setdefault((intent, argument.lower()), []).append(i)
+                elif intent is None:
+                    chats.append(i)
+                else:
+                    results[i] = (self.handlers[intent](command), None)
+            except Exception as e:
+                results[i] = (None, e)
         
-        # Weather queries
-        elif any(word in command_lower for word in ['weather', 'temperature', 'forecast']):
-            city = self.extract_city_from_command(command)
-            return self.weather_service.get_weather(city)
+        semaphore = asyncio.Semaphore(concurrency or settings.BATCH_CONCURRENCY)
         
-        # News queries
-        elif any(word in command_lower for word in ['news', 'headlines', 'latest news']):
-            return self.news_service.get_latest_news()
+        async def run_lookup(intent, indices):
+            async with semaphore:
+                try:
+                    result = (await self.async_handlers[intent](commands[indices[0]]), None)
+                except Exception as e:
+                    result = (None, e)
+            for i in indices:
+                results[i] = result
         
-        # Web search
-        elif any(word in command_lower for word in ['search', 'look up', 'find']):
-            query = self.extract_search_query(command)
-            return self.web_search.search(query)
+        async def run_chat(i):
+            try:
+                results[i] = (await self._handle_unknown_async(commands[i]), None)
+            except Exception as e:
+                results[i] = (None, e)
         
-        # Simple conversation
-        else:
-            return self.get_simple_response(command)
+        await asyncio.gather(
+            *(run_lookup(intent, indices) for (intent, _), indices in groups.items()),
+            *(run_chat(i) for i in chats)
+        )
+        return results
+    
+    def cache_stats(self):
+        """Hit-rate counters for every service cache"""
+        caches = [
+            self.weather_service.cache,
+            self.web_search.cache,
+            self.web_search.answer_cache
+        ]
+        return {cache.name: cache.stats() for cache in caches}
+    
+    def start_local_model(self):
+        """Begin loading the local model in the background"""
+        if self.local_model:
+            self.local_model.start()
+    
+    async def close(self):
+        """Stop background polling and release the shared HTTP connection pools"""
+        self.news_service.stop()
+        await self.http_client.close_async()
     
     def get_current_time(self):
         """Get current time"""
@@ -56,10 +183,8 @@ class AIHandler:
     def extract_city_from_command(self, command):
         """Extract city name from weather command"""
         # Simple extraction - look for "in [city]" or "for [city]"
-        patterns = [r'in (\w+)', r'for (\w+)', r'weather (\w+)']
-        
-        for pattern in patterns:
-            match = re.search(pattern, command.lower())
+        for pattern in CITY_PATTERNS:
+            match = pattern.search(command)
             if match:
                 return match.group(1).title()
         
@@ -68,36 +193,106 @@ class AIHandler:
     def extract_search_query(self, command):
         """Extract search query from command"""
         # Remove common command words
-        query = re.sub(r'\b(search|look up|find|for|about)\b', '', command.lower())
-        return query.strip()
+        query = SEARCH_FILLER.sub('', command.lower())
+        return ' '.join(query.split())
     
-    def get_simple_response(self, message):
-        """Get simple rule-based response"""
-        message_lower = message.lower()
-        
-        # Greetings
-        if any(word in message_lower for word in ['hello', 'hi', 'hey', 'good morning', 'good evening']):
-            return random.choice(self.responses['greeting'])
-        
-        # Thanks
-        elif any(word in message_lower for word in ['thank', 'thanks', 'appreciate']):
-            return random.choice(self.responses['thanks'])
-        
-        # Goodbye
-        elif any(word in message_lower for word in ['bye', 'goodbye', 'see you', 'later']):
-            return random.choice(self.responses['goodbye'])
-        
-        # Questions about self
-        elif any(word in message_lower for word in ['who are you', 'what are you', 'your name']):
-            return "I'm Jarvis, your personal AI assistant. I can help with weather, news, searches, and basic conversations."
-        
-        # Math calculations
-        elif any(word in message_lower for word in ['calculate', 'plus', 'minus', 'times', 'divided']):
-            return self.simple_math(message)
-        
-        # Default response
-        else:
-            return random.choice(self.responses['unknown'])
+    def get_simple_response(self, message, session_id=None):
+        """Get simple rule-based response, falling back to the local model"""
+        intent = self.router.route(message, CHAT_INTENTS)
+        if intent is None:
+            return self._handle_unknown(message, session_id)
+        return self.handlers[intent](message)
+    
+    # Intent handlers
+    
+    def _handle_time(self, command):
+        return self.get_current_time()
+    
+    def _handle_weather(self, command):
+        return self.weather_service.get_weather(self.extract_city_from_command(command))
+    
+    async def _handle_weather_async(self, command):
+        return await self.weather_service.get_weather_async(self.extract_city_from_command(command))
+    
+    def _handle_news(self, command):
+        return self.news_service.get_latest_news()
+    
+    def _handle_search(self, command):
+        return self.web_search.search(self.extract_search_query(command))
+    
+    async def _handle_search_async(self, command):
+        return await self.web_search.search_async(self.extract_search_query(command))
+    
+    def _stream_search_async(self, command):
+        return self.web_search.stream_async(self.extract_search_query(command))
+    
+    def _handle_greeting(self, message):
+        return random.choice(self.responses['greeting'])
+    
+    def _handle_thanks(self, message):
+        return random.choice(self.responses['thanks'])
+    
+    def _handle_goodbye(self, message):
+        return random.choice(self.responses['goodbye'])
+    
+    def _handle_identity(self, message):
+        return "I'm Jarvis, your personal AI assistant. I can help with weather, news, searches, and basic conversations."
+    
+    def _handle_math(self, message):
+        return self.simple_math(message)
+    
+    def _handle_unknown(self, message, session_id=None):
+        if self.local_model:
+            # Loading is lazy; until the model is ready we keep the canned replies
+            self.local_model.start()
+            reply = self.local_model.generate(message, session_id)
+            if reply:
+                return reply
+        return random.choice(self.responses['unknown'])
+    
+    async def _handle_unknown_async(self, message, session_id=None):
+        if self.local_model:
+            self.local_model.start()
+            future = self.local_model.submit(message, session_id)
+            if future is not None:
+                try:
+                    reply = await asyncio.wrap_future(future)
+                    if reply:
+                        return reply
+                except Exception as e:
+                    logger.error(f"❌ Local model error: {e}")
+        return random.choice(self.responses['unknown'])
+    
+    async def _stream_unknown_async(self, message, session_id=None):
+        if self.local_model:
+            self.local_model.start()
+            loop = asyncio.get_running_loop()
+            pieces = asyncio.Queue()
+            future = self.local_model.submit(
+                message, session_id, on_text=lambda text: loop.call_soon_threadsafe(pieces.put_nowait, text)
+            )
+            if future is not None:
+                # Pieces are queued from the worker thread before the future completes
+                finished = asyncio.wrap_future(future)
+                finished.add_done_callback(lambda _: pieces.put_nowait(None))
+                streamed = False
+                while True:
+                    piece = await pieces.get()
+                    if piece is None:
+                        break
+                    streamed = True
+                    yield piece
+                try:
+                    reply = finished.result()
+                except Exception as e:
+                    logger.error(f"❌ Local model error: {e}")
+                    reply = None
+                if streamed:
+                    return
+                if reply:
+                    yield reply
+                    return
+        yield random.choice(self.responses['unknown'])
     
     def simple_math(self, expression):
         """Handle simple math calculations"""
@@ -108,8 +303,7 @@ class AIHandler:
             expr = expr.replace('times', '*').replace('divided by', '/')
             
             # Extract numbers and operators
-            import re
-            numbers = re.findall(r'\d+', expr)
+            numbers = NUMBER.findall(expr)
             if len(numbers) >= 2:
                 if '+' in expr:
                     result = int(numbers[0]) + int(numbers[1])
@@ -0,0 +1,47 @@
+import re
+
+WORD = re.compile(r"[a-z0-9']+")
+
+
+class IntentRouter:
+    """Whole-word keyword router built once from an intent table.
+
+    `intents` is an ordered list of (name, keywords) pairs; earlier entries
+    win when a command mentions keywords from several intents. Keywords are
+    compiled into a dict keyed on their first word, so routing is one regex
+    tokenisation plus a dict lookup per word, and "find" no longer fires on
+    "anytime" nor "time" on "sometimes".
+    """
+
+    def __init__(self, intents):
+        self.priority = {}
+        self.phrases = {}  # first word -> [(remaining words, intent)]
+        for position, (name, keywords) in enumerate(intents):
+            self.priority[name] = position
+            for keyword in keywords:
+                first, *rest = keyword.lower().split()
+                self.phrases.setdefault(first, []).append((tuple(rest), name))
+
+        self.top_intent = intents[0][0] if intents else None
+
+    def route(self, text, allowed=None):
+        """Name of the highest-priority intent mentioned in text, or None"""
+        words = WORD.findall(text.lower())
+        phrases = self.phrases
+        best = None
+        best_priority = len(self.priority)
+
+        for i, word in enumerate(words):
+            candidates = phrases.get(word)
+            if candidates is None:
+                continue
+            for rest, name in candidates:
+                if rest and tuple(words[i + 1:i + 1 + len(rest)]) != rest:
+                    continue
+                if allowed is not None and name not in allowed:
+                    continue
+                if self.priority[name] < best_priority:
+                    best, best_priority = name, self.priority[name]
+                    if name == self.top_intent:
+                        return best
+        return best
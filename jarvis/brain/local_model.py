@@ -0,0 +1,285 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _settle(future, result=None, exception=None):
+    """Complete future, ignoring one that is already done so a single caller can't stop the worker"""
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class LocalChatModel:
+    """CPU conversational model used for commands no intent handles.
+
+    The model loads on a background thread, so startup is not delayed.
+    Until it is ready, generate() returns None and callers keep their canned
+    replies. Requests that arrive within `batch_wait_ms` of each other are
+    run as one padded generate() call. Each session keeps its recent token
+    history so that replies follow the conversation. Requests submitted with
+    on_text receive the reply's text piece by piece while it is generated.
+    """
+
+    def __init__(self, model_name=None, loader=None, max_new_tokens=None, batch_wait_ms=None,
+                 max_batch=None, quantize=None, context_tokens=None, max_sessions=None):
+        self.model_name = model_name or settings.AI_MODEL_NAME
+        self.loader = loader or self._load_pretrained
+        self.max_new_tokens = max_new_tokens or settings.AI_MAX_NEW_TOKENS
+        self.batch_wait = (batch_wait_ms if batch_wait_ms is not None else settings.AI_BATCH_WAIT_MS) / 1000
+        self.max_batch = max_batch or settings.AI_MAX_BATCH
+        self.quantize = settings.AI_QUANTIZE if quantize is None else quantize
+        self.context_tokens = context_tokens or settings.AI_CONTEXT_TOKENS
+        self.max_sessions = max_sessions or settings.AI_MAX_SESSIONS
+
+        self.model = None
+        self.tokenizer = None
+        self.ready = threading.Event()
+        self.error = None
+        self.requests = queue.Queue()
+        self.sessions = OrderedDict()  # session id -> token ids of the conversation so far
+        self.sessions_lock = threading.Lock()
+        self.counters = {"requests": 0, "batches": 0, "cancelled": 0}
+        self.load_thread = None
+        self.worker_thread = None
+
+    def start(self):
+        """Load the model in the background and start the batching worker"""
+        if self.load_thread is None:
+            self.load_thread = threading.Thread(target=self._load, daemon=True)
+            self.load_thread.start()
+
+    def generate(self, prompt, session_id=None, timeout=30):
+        """Reply to prompt, or None if the model is not available yet"""
+        future = self.submit(prompt, session_id)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            logger.error(f"❌ Local model error: {e}")
+            return None
+
+    def submit(self, prompt, session_id=None, on_text=None):
+        """Queue prompt for the next batch; returns a Future, or None if not ready.
+
+        on_text(text) is called from the worker thread with each newly
+        generated piece of the reply, before the Future completes.
+        """
+        if not self.ready.is_set():
+            return None
+        future = Future()
+        self.requests.put((prompt, session_id, on_text, future))
+        return future
+
+    def stats(self):
+        """Load state and batching counters"""
+        stats = dict(self.counters)
+        stats["ready"] = self.ready.is_set()
+        stats["error"] = self.error
+        stats["sessions"] = len(self.sessions)
+        stats["avg_batch_size"] = round(stats["requests"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def _load(self):
+        try:
+            import torch
+
+            start = time.perf_counter()
+            model, tokenizer = self.loader()
+            model.eval()
+            if self.quantize:
+                # Only nn.Linear layers are quantized; GPT-2 style Conv1D stays fp32
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            if tokenizer.pad_token_id is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            tokenizer.padding_side = "left"
+
+            self.model, self.tokenizer = model, tokenizer
+            self.worker_thread = threading.Thread(target=self._serve, daemon=True)
+            self.worker_thread.start()
+            self.ready.set()
+            logger.info(f"🧠 Local model ready ({self.model_name}) in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"❌ Local model unavailable: {e}")
+
+    def _load_pretrained(self):
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModelForCausalLM.from_pretrained(self.model_name)
+        return model, tokenizer
+
+    def _serve(self):
+        """Collect requests for up to batch_wait seconds, then run them together"""
+        while True:
+            try:
+                batch = self._collect()
+                if batch:
+                    self._run(batch)
+            except Exception as e:
+                # The worker is the only thread serving the model; it must outlive any one batch
+                logger.error(f"❌ Local model worker error: {e}")
+
+    def _collect(self):
+        """The next batch, leaving out requests whose callers already gave up"""
+        batch = []
+        item = self.requests.get()
+        deadline = time.monotonic() + self.batch_wait
+        while True:
+            # Marks the Future running, so it can no longer be cancelled under us
+            if item[3].set_running_or_notify_cancel():
+                batch.append(item)
+            else:
+                self.counters["cancelled"] += 1
+            if len(batch) >= self.max_batch:
+                return batch
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                return batch
+
+    def _run(self, batch):
+        try:
+            callbacks = [on_text for _, _, on_text, _ in batch]
+            replies = self._generate_batch([(prompt, session_id) for prompt, session_id, _, _ in batch],
+                                           callbacks if any(callbacks) else None)
+        except Exception as e:
+            for _, _, _, future in batch:
+                _settle(future, exception=e)
+            return
+        for (_, _, _, future), reply in zip(batch, replies):
+            _settle(future, reply)
+
+    def _generate_batch(self, items, callbacks=None):
+        import torch
+
+        eos = self.tokenizer.eos_token_id
+        inputs = []
+        for prompt, session_id in items:
+            ids = self._history(session_id) + self.tokenizer.encode(prompt) + [eos]
+            inputs.append(ids[-self.context_tokens:])
+
+        width = max(len(ids) for ids in inputs)
+        pad = self.tokenizer.pad_token_id
+        input_ids = torch.tensor([[pad] * (width - len(ids)) + ids for ids in inputs])
+        attention_mask = torch.tensor([[0] * (width - len(ids)) + [1] * len(ids) for ids in inputs])
+
+        with torch.inference_mode():
+            output = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                max_new_tokens=self.max_new_tokens,
+                do_sample=False,
+                pad_token_id=pad,
+                eos_token_id=eos,
+                streamer=BatchTextStreamer(self.tokenizer, callbacks, eos) if callbacks else None
+            )
+
+        replies = []
+        for (prompt, session_id), ids, row in zip(items, inputs, output[:, width:].tolist()):
+            if eos in row:
+                row = row[:row.index(eos)]
+            self._remember(session_id, ids + row + [eos])
+            replies.append(self.tokenizer.decode(row, skip_special_tokens=True).strip() or None)
+
+        self.counters["requests"] += len(items)
+        self.counters["batches"] += 1
+        return replies
+
+    def _history(self, session_id):
+        if session_id is None:
+            return []
+        with self.sessions_lock:
+            history = self.sessions.get(session_id, [])
+            if session_id in self.sessions:
+                self.sessions.move_to_end(session_id)
+            return list(history)
+
+    def _remember(self, session_id, ids):
+        if session_id is None:
+            return
+        with self.sessions_lock:
+            self.sessions[session_id] = ids[-self.context_tokens:]
+            self.sessions.move_to_end(session_id)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+
+class BatchTextStreamer:
+    """generate() streamer that passes each row's newly decoded text to that row's callback.
+
+    transformers' own streamers only handle a batch of one; this one keeps the
+    batching and decodes every row separately.
+    """
+
+    def __init__(self, tokenizer, callbacks, eos):
+        self.tokenizer = tokenizer
+        self.callbacks = callbacks
+        self.eos = eos
+        self.tokens = [[] for _ in callbacks]
+        self.decoded = [""] * len(callbacks)
+        self.finished = [callback is None for callback in callbacks]
+        self.prompt_seen = False
+
+    def put(self, value):
+        if not self.prompt_seen:
+            self.prompt_seen = True  # generate() passes the prompt ids first
+            return
+        for row, token in enumerate(value.reshape(-1).tolist()):
+            if self.finished[row]:
+                continue
+            if token == self.eos:
+                self.finished[row] = True
+                continue
+            self.tokens[row].append(token)
+            text = self.tokenizer.decode(self.tokens[row], skip_special_tokens=True)
+            if text.endswith("\ufffd"):
+                continue  # wait for the rest of a multi-byte character
+            piece = text[len(self.decoded[row]):]
+            if not self.decoded[row].strip():
+                piece = piece.lstrip()  # replies are stripped, so is their first piece
+            self.decoded[row] = text
+            if piece:
+                try:
+                    self.callbacks[row](piece)
+                except Exception as e:
+                    logger.error(f"❌ Streaming callback error: {e}")
+
+    def end(self):
+        pass
+
+
+def tiny_random_loader(seed=0):
+    """A two-layer, randomly initialised GPT-2 with a word-level tokenizer.
+
+    Needs no downloads, so the batching path can be exercised offline.
+    """
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+    words = ("hello hi how are you what is the weather news time jarvis tell me a joke about "
+             "python music today tomorrow good bad yes no i think so maybe sure thanks").split()
+    vocab = {token: i for i, token in enumerate(["<unk>", "<eos>"] + words)}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="<unk>",
+                                        eos_token="<eos>", pad_token="<eos>")
+
+    torch.manual_seed(seed)
+    config = GPT2Config(vocab_size=len(vocab), n_positions=512, n_embd=64, n_layer=2, n_head=2,
+                        bos_token_id=1, eos_token_id=1, tie_word_embeddings=False)
+    return GPT2LMHeadModel(config), tokenizer
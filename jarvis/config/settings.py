@@ -8,24 +8,113 @@ class Settings:
     WAKE_WORD = "jarvis"
     VOICE_RATE = 200
     VOICE_VOLUME = 0.9
+    TTS_BACKEND = "pyttsx3"  # pyttsx3, null (silent) or file (transcript)
+    TTS_TRANSCRIPT_PATH = "speech_transcript.log"
+    TTS_QUEUE_SIZE = 20  # Utterances waiting to be spoken
+    TTS_MAX_QUEUE_AGE = 30  # Seconds before a queued utterance is dropped
+    TTS_CACHE_ENABLED = True  # Replay rendered audio for repeated phrases
+    TTS_CACHE_DIR = "tts_cache"
+    TTS_CACHE_MAX_MB = 50
+    TTS_CACHE_AFTER_REPEATS = 2  # Cache free-form text once it has been spoken this often
+    
+    # Audio front end (voice activity detection and wake word spotting)
+    AUDIO_SAMPLE_RATE = 16000
+    AUDIO_FRAME_MS = 30
+    VAD_MIN_RMS = 300  # int16 RMS below which a frame is never speech
+    VAD_NOISE_RATIO = 3.0  # Speech must be this many times louder than the noise floor
+    VAD_HANGOVER_MS = 400  # Silence that ends a segment
+    VAD_PREROLL_MS = 300  # Audio kept from before speech starts
+    VAD_MIN_SPEECH_MS = 150  # Shorter bursts are discarded as clicks
+    VAD_MAX_SEGMENT_S = 10
+    WAKE_WORD_TEMPLATES_DIR = "wake_templates"  # WAV recordings of the wake word
+    WAKE_WORD_THRESHOLD = 0.42  # DTW cost below which a segment contains the wake word
+    WAKE_WORD_SEARCH_S = 2.0  # Seconds at the start of a segment searched for the wake word
+    COMMAND_TIMEOUT = 5  # Seconds to wait for a command after the wake word
     
     # Server Settings
     HOST = "127.0.0.1"
     PORT = 8000
+    HEADLESS = os.getenv("JARVIS_HEADLESS", "").lower() in ("1", "true", "yes")  # No microphone or speakers
+    
+    # Multi-process mode (python main.py --workers N): API workers plus one process owning the audio devices
+    ROLE = os.getenv("JARVIS_ROLE", "all")  # all (one process), api (worker) or audio (audio owner)
+    AUDIO_IPC_ADDRESS = os.getenv("JARVIS_AUDIO_IPC", r"\\.\pipe\jarvis_audio" if os.name == "nt" else "jarvis_audio.sock")
+    AUDIO_IPC_KEY = os.getenv("JARVIS_AUDIO_IPC_KEY", "")  # Shared secret; generated per run by --workers
+    SHARED_CACHE = os.getenv("JARVIS_SHARED_CACHE", "").lower() in ("1", "true", "yes")  # Lookups shared by workers
+    SHARED_CACHE_PATH = "jarvis_cache.db"
+    SHARED_CACHE_LEASE = 15  # Seconds a worker may take to fetch a key before another one tries
+    
+    # Logging and tracing
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # text or json (one object per line)
+    TRACE_SLOW_MS = 1000  # Requests slower than this are logged with their span breakdown
+    TRACE_HISTORY = 50  # Slow traces kept for GET /api/traces
     
     # Database
     DATABASE_PATH = "jarvis.db"
     
     # Free Services URLs
     WEATHER_BASE_URL = "https://wttr.in"  # Free weather service
+    SEARCH_HTML_URL = "https://duckduckgo.com/html/"
+    SEARCH_API_URL = "https://api.duckduckgo.com/"
+    SEARCH_PARSER = "auto"  # auto (fastest installed; see available_parsers), lxml, selectolax or stdlib
     NEWS_RSS_FEEDS = [
         "https://feeds.bbci.co.uk/news/rss.xml",
         "https://rss.cnn.com/rss/edition.rss",
         "https://feeds.reuters.com/reuters/topNews"
     ]
+    RSS_REFRESH_INTERVAL = 300  # Seconds between feed polls
+    RSS_MAX_ITEMS = 200  # Headlines kept in the merged index
+    
+    # Shared HTTP client (connection pools, retries, per-service timeouts)
+    HTTP_POOL_HOSTS = 10  # Hosts kept in the pool
+    HTTP_POOL_SIZE = 20  # Keep-alive connections per host
+    HTTP_KEEPALIVE = 30  # Seconds an idle connection stays open
+    HTTP_RETRIES = 2
+    HTTP_BACKOFF = 0.3  # Seconds, doubled after each retry
+    HTTP_TIMEOUTS = {
+        "default": 5,
+        "weather": 5,
+        "news": 5,
+        "search": 10,
+        "quick_answer": 5
+    }
+    
+    # Upstream protection (per service and host)
+    CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures that open an upstream's circuit
+    CIRCUIT_OPEN_SECONDS = 30  # Fail fast this long before letting a probe through
+    CIRCUIT_HALF_OPEN_PROBES = 1  # Calls allowed through while testing recovery
+    UPSTREAM_MIN_CONCURRENCY = 1  # Adaptive limit floor; the ceiling is HTTP_POOL_SIZE
+    UPSTREAM_SLOW_FRACTION = 0.5  # Calls slower than this fraction of the timeout lower the limit
+    UPSTREAM_QUEUE_TIMEOUT = 2  # Seconds a call waits for a slot before failing fast
+    
+    # Per-client rate limiting of /api (token bucket per client address)
+    RATE_LIMIT_RPS = 20  # Sustained requests per second; 0 disables
+    RATE_LIMIT_BURST = 40
+    RATE_LIMIT_MAX_CLIENTS = 10000  # Buckets kept, least recently seen dropped first
+    
+    # Batch command endpoint
+    BATCH_MAX_COMMANDS = 500
+    BATCH_CONCURRENCY = 8  # Distinct lookups in flight per batch
+    
+    # Response cache (seconds each lookup stays fresh)
+    CACHE_TTLS = {
+        "weather": 600,
+        "search": 3600,
+        "quick_answer": 3600
+    }
+    CACHE_MAX_ENTRIES = 256  # Per service, least recently used evicted first
+    CACHE_STALE_TTL = 300  # Serve expired entries this long while refreshing
+    CACHE_FALLBACK_TTL = 86400  # Serve expired entries this long when the upstream is failing
     
     # AI Model Settings
     AI_MODEL_NAME = "microsoft/DialoGPT-medium"  # Free local model
     USE_LOCAL_AI = True
+    AI_MAX_NEW_TOKENS = 40  # Upper bound on reply length
+    AI_BATCH_WAIT_MS = 10  # How long to gather requests into one batch
+    AI_MAX_BATCH = 8
+    AI_QUANTIZE = True  # int8 dynamic quantization of Linear layers
+    AI_CONTEXT_TOKENS = 256  # Conversation history kept per session
+    AI_MAX_SESSIONS = 100
 
 settings = Settings()
\ No newline at end of file
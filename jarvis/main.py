@@ -1,17 +1,43 @@
+import argparse
 import asyncio
+import logging
+import os
+import secrets
+import signal
+import subprocess
+import sys
 import threading
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import uvicorn
 
 from config.settings import settings
-from voice.listener import VoiceListener
-from voice.speaker import VoiceSpeaker
-from brain.ai_handler import AIHandler
+from monitoring.collectors import component_collector
+from monitoring.log import setup_logging
+from monitoring.metrics import REGISTRY, MetricsMiddleware
+from registry import ComponentRegistry
+from web import api
 from web.api import router
+from web.rate_limit import RateLimiter, RateLimitMiddleware
+
+IMPORT_SECONDS = round(time.perf_counter() - IMPORT_STARTED, 3)
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Jarvis AI Assistant", version="1.0.0")
 
+GREETING = "Jarvis is now online and ready to assist you."
+
+# Per-client rate limit, inside CORS so refused requests still carry its headers
+api.rate_limiter = RateLimiter()
+app.add_middleware(RateLimitMiddleware, limiter=api.rate_limiter)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -20,30 +46,87 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Include API routes
 app.include_router(router, prefix="/api")
 
-# Global components
-voice_listener = None
-voice_speaker = None
-ai_handler = None
+# Components are imported and built in the background; see registry.py
+registry = ComponentRegistry()
+startup_seconds = None
 
-@app.on_event("startup")
-async def startup_event():
-    global voice_listener, voice_speaker, ai_handler
-    
-    # Initialize components
-    voice_speaker = VoiceSpeaker()
-    ai_handler = AIHandler()
-    voice_listener = VoiceListener(voice_speaker, ai_handler)
+def build_speaker(module):
+    speaker = module.VoiceSpeaker()
+    speaker.speak_async(GREETING, priority=module.PRIORITY_RESPONSE)
+    return speaker
+
+def build_remote_speaker(module):
+    speaker = module.RemoteSpeaker()
+    speaker.wait_until_available()
+    return speaker
+
+def build_ai(module):
+    ai_handler = module.AIHandler()
+    ai_handler.news_service.start()
+    ai_handler.start_local_model()
+    return ai_handler
+
+def build_scheduler(module, speaker):
+    scheduler = module.TaskScheduler(speaker)
+    scheduler.start()
+    return scheduler
+
+def build_listener(module, speaker, ai_handler):
+    listener = module.VoiceListener(speaker, ai_handler)
+    threading.Thread(target=listener.start_listening, daemon=True).start()
     
-    # Start voice listening in background thread
-    voice_thread = threading.Thread(target=voice_listener.start_listening, daemon=True)
-    voice_thread.start()
+    # Render fixed phrases ahead of time so they play without synthesis delay
+    canned = [reply for replies in ai_handler.responses.values() for reply in replies]
+    speaker.prewarm([GREETING] + module.PHRASES + canned)
+    return listener
+
+# With --workers, API workers forward speech to the one process that owns the audio devices
+if settings.ROLE == "api":
+    registry.register("speaker", "voice.ipc", build_remote_speaker, close=lambda speaker: speaker.stop(),
+                      on_ready=lambda speaker: setattr(api, "voice_speaker", speaker))
+else:
+    registry.register("speaker", "voice.speaker", build_speaker, close=lambda speaker: speaker.stop(),
+                      on_ready=lambda speaker: setattr(api, "voice_speaker", speaker))
+registry.register("ai", "brain.ai_handler", build_ai, close=lambda ai_handler: ai_handler.close(),
+                  on_ready=lambda ai_handler: setattr(api, "ai_handler", ai_handler),
+                  enabled=settings.ROLE != "audio" or not settings.HEADLESS)
+registry.register("scheduler", "automation.scheduler", build_scheduler, depends=["speaker"],
+                  close=lambda scheduler: scheduler.stop(), enabled=settings.ROLE != "api")
+registry.register("listener", "voice.listener", build_listener, depends=["speaker", "ai"],
+                  close=lambda listener: listener.stop_listening(),
+                  enabled=not settings.HEADLESS and settings.ROLE != "api")
+api.registry = registry
+REGISTRY.add_collector(component_collector(registry))
+
+def report_startup():
+    registry.wait()
+    logger.info(f"⏱️ main imports: {IMPORT_SECONDS:.2f}s, API accepting requests after {startup_seconds:.2f}s")
+    registry.report()
+    if registry.ready():
+        logger.info("🤖 Jarvis is now online!")
+    else:
+        logger.warning("⚠️ Jarvis is online with some components unavailable")
+
+def start_components():
+    global startup_seconds
     
-    print("🤖 Jarvis is now online!")
-    voice_speaker.speak("Jarvis is now online and ready to assist you.")
+    # Returns immediately; components become ready in the background
+    registry.start()
+    startup_seconds = round(time.perf_counter() - IMPORT_STARTED, 3)
+    threading.Thread(target=report_startup, daemon=True).start()
+
+@app.on_event("startup")
+async def startup_event():
+    start_components()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await registry.stop()
 
 @app.get("/")
 async def root():
@@ -51,16 +134,67 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "components": {
-        "voice": voice_listener is not None,
-        "ai": ai_handler is not None,
-        "speaker": voice_speaker is not None
-    }}
+    return {
+        "status": "healthy",
+        "ready": registry.ready(),
+        "role": settings.ROLE,
+        "pid": os.getpid(),
+        "headless": settings.HEADLESS,
+        "import_seconds": IMPORT_SECONDS,
+        "startup_seconds": startup_seconds,
+        "components": registry.status()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics, rendered off the event loop (collectors may call the audio owner)"""
+    return PlainTextResponse(await asyncio.to_thread(REGISTRY.render), media_type="text/plain; version=0.0.4")
+
+def run_audio_owner():
+    """Own the microphone and speakers: build the voice components and serve speech to the API workers"""
+    from voice.ipc import SpeechServer
+    
+    start_components()
+    server = SpeechServer(registry)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        asyncio.run(registry.stop())
+
+def run_workers(count):
+    """Serve the API from count worker processes plus one process that owns the audio devices"""
+    os.environ["JARVIS_SHARED_CACHE"] = "1"
+    os.environ.setdefault("JARVIS_AUDIO_IPC_KEY", secrets.token_hex(16))
+    audio_owner = subprocess.Popen([sys.executable, os.path.abspath(__file__)],
+                                   env={**os.environ, "JARVIS_ROLE": "audio"})
+    os.environ["JARVIS_ROLE"] = "api"  # read by each worker when it imports this module
+    try:
+        uvicorn.run("main:app", host=settings.HOST, port=settings.PORT, workers=count)
+    finally:
+        audio_owner.terminate()
+        audio_owner.wait()
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=True
-    )
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Jarvis AI Assistant")
+    parser.add_argument("--headless", action="store_true", help="run without microphone and speakers")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="API worker processes; with more than one, audio runs in a process of its own")
+    args = parser.parse_args()
+    if args.headless:
+        os.environ["JARVIS_HEADLESS"] = "1"  # also seen by the reloader's and workers' processes
+    
+    if settings.ROLE == "audio":
+        run_audio_owner()
+    elif args.workers > 1:
+        run_workers(args.workers)
+    else:
+        uvicorn.run(
+            "main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=True
+        )
\ No newline at end of file
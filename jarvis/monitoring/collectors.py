@@ -0,0 +1,70 @@
+def component_collector(registry):
+    """Scrape-time metrics read from the stats() of whichever components are ready.
+
+    Nothing is counted twice on the hot path: caches, pools and queues already
+    keep these counters, and they are only read when /metrics is scraped.
+    """
+
+    def collect():
+        families = []
+        ai_handler = registry.get("ai")
+        if ai_handler:
+            caches = ai_handler.cache_stats()
+            for field, kind in (("hits", "counter"), ("stale_hits", "counter"), ("misses", "counter"),
+                                ("coalesced", "counter"), ("size", "gauge")):
+                families.append((f"jarvis_cache_{field}" + ("_total" if kind == "counter" else ""), kind,
+                                 f"Response cache {field.replace('_', ' ')} by cache",
+                                 [({"cache": name}, stats.get(field, 0)) for name, stats in caches.items()]))
+
+            pools = ai_handler.http_client.stats()
+            families.append(("jarvis_http_pool_requests_total", "counter", "Upstream requests by host",
+                             [({"host": host}, stats["requests"]) for host, stats in pools.items()]))
+            families.append(("jarvis_http_pool_connections_opened_total", "counter",
+                             "Upstream connections opened by host",
+                             [({"host": host}, stats["connections_opened"]) for host, stats in pools.items()]))
+
+            upstreams = ai_handler.http_client.upstream_stats()
+            families.append(("jarvis_upstream_circuit_open", "gauge",
+                             "1 while an upstream's circuit is open or half open",
+                             [({"upstream": name}, int(stats["circuit"]["state"] != "closed"))
+                              for name, stats in upstreams.items()]))
+            families.append(("jarvis_upstream_concurrency_limit", "gauge",
+                             "Adaptive limit on calls in flight to an upstream",
+                             [({"upstream": name}, stats["concurrency"]["limit"]) for name, stats in upstreams.items()]))
+
+            feeds = ai_handler.news_service.aggregator.stats()
+            families.append(("jarvis_news_indexed", "gauge", "Headlines in the merged news index",
+                             [({}, feeds["indexed"])]))
+
+            if ai_handler.local_model:
+                model = ai_handler.local_model
+                families.append(("jarvis_local_model_queue_depth", "gauge", "Prompts waiting for the local model",
+                                 [({}, model.requests.qsize())]))
+                families.append(("jarvis_local_model_requests_total", "counter", "Local model replies generated",
+                                 [({}, model.counters["requests"])]))
+
+        speaker = registry.get("speaker")
+        speech = speaker.stats() if speaker else {}
+        if "queue_depth" in speech:  # missing when the audio owner process is unreachable
+            families.append(("jarvis_tts_queue_depth", "gauge", "Utterances waiting to be spoken",
+                             [({}, speech["queue_depth"])]))
+            families.append(("jarvis_tts_dropped_total", "counter", "Utterances dropped by reason",
+                             [({"reason": reason}, speech[f"dropped_{reason}"]) for reason in ("full", "stale")]))
+            if "audio_cache" in speech:
+                families.append(("jarvis_tts_audio_cache_hits_total", "counter", "Utterances replayed from disk",
+                                 [({}, speech["audio_cache"]["hits"])]))
+
+        scheduler = registry.get("scheduler")
+        if scheduler:
+            tasks = scheduler.stats()
+            families.append(("jarvis_scheduler_pending_tasks", "gauge", "Scheduled tasks waiting to run",
+                             [({}, tasks["pending"])]))
+            families.append(("jarvis_scheduler_dispatched_total", "counter", "Scheduled tasks run",
+                             [({}, tasks["dispatched"])]))
+
+        families.append(("jarvis_component_ready", "gauge", "1 when the component is ready",
+                         [({"component": name}, int(status["state"] == "ready"))
+                          for name, status in registry.status().items()]))
+        return families
+
+    return collect
@@ -0,0 +1,38 @@
+import json
+import logging
+import sys
+from config.settings import settings
+
+# Attributes every LogRecord has; anything else was passed with extra={...}
+_STANDARD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with time, level, logger, message and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def setup_logging(level=None, fmt=None):
+    """Configure the root logger from LOG_LEVEL and LOG_FORMAT (text or json)"""
+    handler = logging.StreamHandler(sys.stdout)
+    if (fmt or settings.LOG_FORMAT) == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S"))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel((level or settings.LOG_LEVEL).upper())
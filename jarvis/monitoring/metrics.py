@@ -0,0 +1,241 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans cache hits (sub-millisecond) to slow upstreams
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    """Metrics and scrape-time collectors, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+
+    def add_collector(self, collect):
+        """collect() returns [(name, type, help, [(labels dict, value), ...]), ...] at scrape time"""
+        with self.lock:
+            self.collectors.append(collect)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            metrics, collectors = list(self.metrics), list(self.collectors)
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collect in collectors:
+            try:
+                families = collect()
+            except Exception:
+                continue  # a component that is shutting down must not break the scrape
+            for name, kind, help_text, samples in families:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                lines += [f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, help_text, labels=(), registry=None):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.children = {}
+        self.lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values, **named):
+        """The child metric for one combination of label values"""
+        key = tuple(str(value) for value in values) or tuple(str(named[label]) for label in self.label_names)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self._child())
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for key, child in list(self.children.items()):
+            lines.extend(child.render(self.name, dict(zip(self.label_names, key))))
+        return lines
+
+    def _child(self):
+        raise NotImplementedError
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self.lock:
+            self.value += amount
+
+    def render(self, name, labels):
+        return [f"{name}{_labels(labels)} {_number(self.value)}"]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _child(self):
+        return CounterChild()
+
+    def inc(self, amount=1.0):
+        self.labels().inc(amount)
+
+
+class GaugeChild(CounterChild):
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1.0):
+        self.inc(-amount)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def _child(self):
+        return GaugeChild()
+
+    def set(self, value):
+        self.labels().set(value)
+
+
+class HistogramChild:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # per bucket, the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def render(self, name, labels):
+        with self.lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines, cumulative = [], 0
+        for bound, bucket in zip(self.bounds + (float("inf"),), counts):
+            cumulative += bucket
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+        return lines
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, help_text, labels, registry)
+
+    def _child(self):
+        return HistogramChild(self.bounds)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if not isinstance(value, bool) else str(int(value))
+
+
+# Request pipeline
+REQUEST_LATENCY = Histogram("jarvis_http_request_duration_seconds", "API request latency by route",
+                            ["route", "method", "status"])
+INTENT_LATENCY = Histogram("jarvis_intent_duration_seconds", "Time to answer a command by intent", ["intent"])
+UPSTREAM_LATENCY = Histogram("jarvis_upstream_request_duration_seconds", "Upstream HTTP call latency by service",
+                             ["service"])
+UPSTREAM_ERRORS = Counter("jarvis_upstream_errors_total", "Failed upstream HTTP calls by service and error type",
+                          ["service", "kind"])
+
+# Voice
+TTS_LATENCY = Histogram("jarvis_tts_duration_seconds", "Time to speak an utterance, synthesized or from the audio cache",
+                        ["source"])
+STT_LATENCY = Histogram("jarvis_stt_duration_seconds", "Speech recognition latency per segment")
+
+
+def route_template(scope):
+    """Template of the route that served the request, including the prefix it was mounted under.
+
+    Routes of a router included with a prefix may carry only their own part
+    of the path (e.g. /command for /api/command), so the prefix is whatever
+    the request path has in front of the part the route's pattern matches.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    path, regex = scope["path"], getattr(route, "path_regex", None)
+    if regex is not None and not regex.match(path):
+        for index in range(1, len(path)):
+            if path[index] == "/" and regex.match(path[index:]):
+                return path[:index] + route.path
+    return route.path
+
+
+class MetricsMiddleware:
+    """ASGI middleware that times every request under its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Templates keep label cardinality bounded
+            REQUEST_LATENCY.labels(route_template(scope), scope["method"], status[0]).observe(time.perf_counter() - start)
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# The trace of the request being handled. Context variables follow asyncio
+# tasks and asyncio.to_thread calls, so spans recorded there land in it too.
+_current = ContextVar("jarvis_trace", default=None)
+_slow_traces = deque(maxlen=settings.TRACE_HISTORY)
+_slow_lock = threading.Lock()
+
+
+class Trace:
+    """Named, timed spans recorded while one request was handled"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.spans = []  # (name, offset from start, duration) in seconds
+
+    def breakdown(self):
+        """Total seconds per span name, in first-seen order"""
+        totals = {}
+        for name, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def server_timing(self):
+        """Value for a Server-Timing response header (milliseconds)"""
+        parts = [f"{name.replace(':', '-')};dur={seconds * 1000:.1f}" for name, seconds in self.breakdown().items()]
+        parts.append(f"total;dur={(self.duration or 0.0) * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round((self.duration or 0.0) * 1000, 2),
+            "breakdown_ms": {name: round(seconds * 1000, 2) for name, seconds in self.breakdown().items()},
+            "spans": [{"name": name, "offset_ms": round(offset * 1000, 2), "duration_ms": round(duration * 1000, 2)}
+                      for name, offset, duration in self.spans]
+        }
+
+
+@contextmanager
+def start_trace(name):
+    """Trace everything done inside the block; slow traces are logged and kept for /api/traces"""
+    trace = Trace(name)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.duration = time.perf_counter() - trace.start
+        _current.reset(token)
+        if trace.duration * 1000 >= settings.TRACE_SLOW_MS:
+            with _slow_lock:
+                _slow_traces.append(trace)
+            logger.warning("🐢 Slow %s: %.0f ms", name, trace.duration * 1000,
+                           extra={"trace": trace.to_dict()["breakdown_ms"]})
+
+
+@contextmanager
+def span(name):
+    """Time a step of the current trace; costs one context lookup when nothing is traced"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append((name, start - trace.start, time.perf_counter() - start))
+
+
+def current_trace():
+    return _current.get()
+
+
+def slow_traces():
+    """Recent traces slower than TRACE_SLOW_MS, newest first"""
+    with _slow_lock:
+        return [trace.to_dict() for trace in reversed(_slow_traces)]
@@ -0,0 +1,149 @@
+import logging
+import asyncio
+import importlib
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Component:
+    def __init__(self, name, module, build, depends, close, on_ready, enabled):
+        self.name = name
+        self.module = module
+        self.build = build
+        self.depends = depends
+        self.close = close
+        self.on_ready = on_ready
+        self.state = "pending" if enabled else "disabled"
+        self.error = None
+        self.instance = None
+        self.import_seconds = None
+        self.init_seconds = None
+        self.ready_at = None
+        self.done = threading.Event()
+        if not enabled:
+            self.done.set()
+
+
+class ComponentRegistry:
+    """Builds each subsystem on its own background thread.
+
+    A component's module is imported inside that thread, so heavy imports
+    (pyttsx3, speech_recognition, bs4, transformers) never delay the API.
+    A component starts once the components it depends on are ready; if one
+    of them fails or is disabled, it is skipped. status() reports the state
+    and import/init time of every component.
+    """
+
+    def __init__(self):
+        self.components = {}
+        self.started_at = None
+
+    def register(self, name, module, build, depends=(), close=None, on_ready=None, enabled=True):
+        """Add a component; build(module, *dependencies) returns its instance"""
+        self.components[name] = Component(name, module, build, tuple(depends), close, on_ready, enabled)
+
+    def start(self):
+        """Start building every enabled component in the background"""
+        self.started_at = time.perf_counter()
+        for component in self.components.values():
+            if component.state == "pending":
+                threading.Thread(target=self._start_component, args=(component,), daemon=True,
+                                 name=f"start-{component.name}").start()
+
+    def get(self, name):
+        """The component's instance, or None if it is not ready"""
+        component = self.components.get(name)
+        return component.instance if component and component.state == "ready" else None
+
+    def wait(self, timeout=None):
+        """Block until every component is ready, failed or skipped; True if all finished"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for component in self.components.values():
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not component.done.wait(remaining):
+                return False
+        return True
+
+    def ready(self):
+        return all(component.state in ("ready", "disabled") for component in self.components.values())
+
+    def status(self):
+        """State and timings of each component"""
+        return {
+            name: {
+                "state": component.state,
+                "import_seconds": component.import_seconds,
+                "init_seconds": component.init_seconds,
+                "ready_after": component.ready_at,
+                "error": component.error
+            }
+            for name, component in self.components.items()
+        }
+
+    def report(self):
+        """Print how long each component took to import and initialize"""
+        for name, component in self.components.items():
+            if component.state == "ready":
+                logger.info(f"⏱️ {name}: import {component.import_seconds:.2f}s, init {component.init_seconds:.2f}s, "
+                      f"ready after {component.ready_at:.2f}s")
+            else:
+                logger.info(f"⏱️ {name}: {component.state}{f' ({component.error})' if component.error else ''}")
+
+    async def stop(self):
+        """Close ready components, dependents before their dependencies"""
+        for component in reversed(self._start_order()):
+            if component.state != "ready" or not component.close:
+                continue
+            try:
+                result = component.close(component.instance)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"❌ Error stopping {component.name}: {e}")
+
+    def _start_order(self):
+        order, seen = [], set()
+
+        def visit(component):
+            if component.name not in seen:
+                seen.add(component.name)
+                for dependency in component.depends:
+                    visit(self.components[dependency])
+                order.append(component)
+
+        for component in self.components.values():
+            visit(component)
+        return order
+
+    def _start_component(self, component):
+        try:
+            dependencies = []
+            for name in component.depends:
+                dependency = self.components[name]
+                dependency.done.wait()
+                if dependency.state != "ready":
+                    component.state = "skipped"
+                    component.error = f"{name} is {dependency.state}"
+                    return
+                dependencies.append(dependency.instance)
+
+            component.state = "starting"
+            start = time.perf_counter()
+            module = importlib.import_module(component.module)
+            component.import_seconds = round(time.perf_counter() - start, 3)
+
+            start = time.perf_counter()
+            component.instance = component.build(module, *dependencies)
+            component.init_seconds = round(time.perf_counter() - start, 3)
+            if component.on_ready:
+                component.on_ready(component.instance)
+            component.ready_at = round(time.perf_counter() - self.started_at, 3)
+            component.state = "ready"
+        except Exception as e:
+            component.state = "failed"
+            component.error = str(e)
+            logger.error(f"❌ {component.name} failed to start: {e}")
+        finally:
+            component.done.set()
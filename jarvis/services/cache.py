@@ -0,0 +1,264 @@
+import logging
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from config.settings import settings
+from services.shared_cache import shared_store
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """TTL + LRU cache for upstream lookups.
+
+    Concurrent misses for the same key are coalesced into a single fetch, and
+    entries that expired less than `stale_ttl` seconds ago are served
+    immediately while one background refresh replaces them. When a fetch
+    fails, an entry up to `fallback_ttl` seconds past its TTL is served
+    instead, so an upstream outage degrades to old answers rather than errors.
+
+    With SHARED_CACHE on (multi-process mode), misses go through the
+    SharedCacheStore first, so a value fetched by one worker process serves
+    all of them.
+    """
+
+    def __init__(self, name, ttl=None, max_entries=None, stale_ttl=None, store=None):
+        self.name = name
+        self.ttl = ttl if ttl is not None else settings.CACHE_TTLS[name]
+        self.max_entries = max_entries or settings.CACHE_MAX_ENTRIES
+        self.stale_ttl = stale_ttl if stale_ttl is not None else settings.CACHE_STALE_TTL
+        self.fallback_ttl = max(settings.CACHE_FALLBACK_TTL, self.stale_ttl)
+        self.entries = OrderedDict()  # key -> (value, stored_at)
+        self.lock = threading.Lock()
+        self.inflight = {}  # key -> concurrent.futures.Future
+        self.inflight_async = {}  # key -> asyncio.Future
+        self.refreshing = set()
+        self.background_tasks = set()
+        self.store = store if store is not None else (shared_store() if settings.SHARED_CACHE else None)
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "fetches": 0, "errors": 0,
+                         "shared_hits": 0, "fallbacks": 0}
+
+    def get_or_fetch(self, key, fetch):
+        """Return the cached value for key, calling fetch() at most once per miss"""
+        with self.lock:
+            state, value = self._lookup(key)
+            if state == "fresh":
+                return value
+            if state == "stale":
+                self._start_refresh(key, fetch)
+                return value
+
+            future = self.inflight.get(key)
+            if future is not None:
+                self.counters["coalesced"] += 1
+                owner = False
+            else:
+                future = self.inflight[key] = Future()
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            try:
+                value = self._fetch(key, fetch)
+            except Exception:
+                found, value = self.fallback(key)
+                if not found:
+                    raise
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+
+    async def get_or_fetch_async(self, key, fetch):
+        """Async variant of get_or_fetch; fetch is a coroutine function"""
+        with self.lock:
+            state, value = self._lookup(key)
+            if state == "fresh":
+                return value
+            if state == "stale":
+                self._start_refresh_async(key, fetch)
+                return value
+
+            future = self.inflight_async.get(key)
+            if future is not None:
+                self.counters["coalesced"] += 1
+            else:
+                future = self.inflight_async[key] = asyncio.get_running_loop().create_future()
+                task = asyncio.create_task(self._fetch_async(key, fetch, future))
+                self.background_tasks.add(task)
+                task.add_done_callback(self.background_tasks.discard)
+
+        # shield so one cancelled caller doesn't cancel the fetch for everyone else
+        return await asyncio.shield(future)
+
+    def get(self, key):
+        """The cached value for key, fresh or stale, or None; never fetches"""
+        with self.lock:
+            state, value = self._lookup(key)
+        if state == "miss" and self.store is not None:
+            found, value = self.store.get(self.name, key, self.ttl)
+            if found:
+                self._count("shared_hits")
+                self._store(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store a value fetched outside get_or_fetch, e.g. one assembled while streaming"""
+        self._store(key, value)
+        if self.store is not None:
+            self.store.put(self.name, key, value)
+
+    def fallback(self, key):
+        """(True, value) for an expired entry still inside the fallback window, else (False, None)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl + self.fallback_ttl:
+                return False, None
+            self.counters["fallbacks"] += 1
+        logger.warning(f"⚠️ Serving expired {self.name} entry for {key!r} while the upstream is failing")
+        return True, entry[0]
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything"""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self):
+        """Counters plus hit rate for this cache"""
+        with self.lock:
+            stats = dict(self.counters)
+            stats["size"] = len(self.entries)
+        # Coalesced lookups are misses that piggybacked on another caller's fetch
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        served = stats["hits"] + stats["stale_hits"] + stats["coalesced"]
+        stats["hit_rate"] = round(served / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _lookup(self, key):
+        """Classify key as fresh, stale or miss; caller holds the lock"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.counters["misses"] += 1
+            return "miss", None
+
+        value, stored_at = entry
+        age = time.monotonic() - stored_at
+        if age <= self.ttl:
+            self.entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return "fresh", value
+        if age <= self.ttl + self.stale_ttl:
+            self.entries.move_to_end(key)
+            self.counters["stale_hits"] += 1
+            return "stale", value
+
+        if age > self.ttl + self.fallback_ttl:
+            del self.entries[key]  # otherwise kept as a fallback until it is replaced or evicted
+        self.counters["misses"] += 1
+        return "miss", None
+
+    def _count(self, field):
+        with self.lock:
+            self.counters[field] += 1
+
+    def _store(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def _load(self, key, fetch):
+        """fetch(), or the value another worker process fetched for key"""
+        if self.store is None:
+            self._count("fetches")
+            return fetch()
+        value, fetched = self.store.get_or_fetch(self.name, key, self.ttl, fetch)
+        self._count("fetches" if fetched else "shared_hits")
+        return value
+
+    async def _load_async(self, key, fetch):
+        if self.store is None:
+            self._count("fetches")
+            return await fetch()
+        value, fetched = await self.store.get_or_fetch_async(self.name, key, self.ttl, fetch)
+        self._count("fetches" if fetched else "shared_hits")
+        return value
+
+    def _fetch(self, key, fetch):
+        try:
+            value = self._load(key, fetch)
+        except Exception:
+            self._count("errors")
+            raise
+        self._store(key, value)
+        return value
+
+    async def _fetch_async(self, key, fetch, future):
+        try:
+            value = await self._load_async(key, fetch)
+            self._store(key, value)
+            future.set_result(value)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self._count("errors")
+            found, value = self.fallback(key)
+            if found:
+                future.set_result(value)
+                return
+            future.set_exception(e)
+            # Every waiter may have been cancelled; keep asyncio from warning about it
+            future.exception()
+        finally:
+            with self.lock:
+                self.inflight_async.pop(key, None)
+
+    def _start_refresh(self, key, fetch):
+        """Refresh a stale key on a worker thread; caller holds the lock"""
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch(key, fetch)
+            except Exception as e:
+                logger.error(f"❌ Cache refresh error ({self.name}): {e}")
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _start_refresh_async(self, key, fetch):
+        """Refresh a stale key in a background task; caller holds the lock"""
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+
+        async def refresh():
+            try:
+                self._store(key, await self._load_async(key, fetch))
+            except Exception as e:
+                self._count("errors")
+                logger.error(f"❌ Cache refresh error ({self.name}): {e}")
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
@@ -0,0 +1,302 @@
+import asyncio
+import threading
+import time
+import requests
+import aiohttp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit
+from contextlib import aclosing, asynccontextmanager, contextmanager
+from config.settings import settings
+from monitoring.metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from monitoring.tracing import span
+from services.resilience import AdaptiveLimiter, CircuitBreaker, UpstreamUnavailable
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpClient:
+    """Keep-alive HTTP client shared by the weather, news and search services.
+
+    Both the requests session (sync paths) and the aiohttp session (async
+    paths) keep bounded per-host connection pools, retry idempotent GETs with
+    exponential backoff and apply the per-service timeouts from settings.
+
+    Each upstream (a service at one host) gets a circuit breaker and an
+    adaptive concurrency limit; calls they refuse raise UpstreamUnavailable
+    without touching the network.
+    """
+
+    def __init__(self):
+        self.timeouts = dict(settings.HTTP_TIMEOUTS)
+        self.retries = settings.HTTP_RETRIES
+        self.backoff = settings.HTTP_BACKOFF
+
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=["GET", "HEAD"],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.HTTP_POOL_HOSTS,
+            pool_maxsize=settings.HTTP_POOL_SIZE,
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.async_session = None
+        self.async_stats = {}
+        self.upstreams = {}  # "service:host" -> (CircuitBreaker, AdaptiveLimiter)
+        self._stats_lock = threading.Lock()
+
+    def timeout_for(self, service):
+        """Timeout in seconds for a named service"""
+        return self.timeouts.get(service, self.timeouts["default"])
+
+    def get(self, url, service, **kwargs):
+        """Pooled, retried GET returning a requests.Response"""
+        kwargs.setdefault("timeout", self.timeout_for(service))
+        with self._guard(url, service) as outcome, self._instrument(service):
+            response = self.session.get(url, **kwargs)
+            outcome["failed"] = response.status_code in RETRY_STATUSES
+        if response.status_code >= 400:
+            UPSTREAM_ERRORS.labels(service, f"http_{response.status_code}").inc()
+        return response
+
+    async def get_async(self, url, service, params=None, headers=None, as_json=False):
+        """Pooled, retried GET returning the decoded JSON or raw body"""
+        async with self._guard_async(url, service):
+            with self._instrument(service):
+                return await self._get_async(url, service, params, headers, as_json)
+
+    async def stream_async(self, url, service, params=None, headers=None):
+        """Pooled GET yielding the body in chunks as they arrive; retried only before the first byte"""
+        async with self._guard_async(url, service), aclosing(self._stream(url, service, params, headers)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def _stream(self, url, service, params, headers):
+        with self._instrument(service):
+            session = await self._get_async_session()
+            timeout = aiohttp.ClientTimeout(total=self.timeout_for(service))
+
+            for attempt in range(self.retries + 1):
+                last_attempt = attempt == self.retries
+                try:
+                    response = await session.get(url, params=params, headers=headers, timeout=timeout)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if last_attempt:
+                        raise
+                    await asyncio.sleep(self.backoff * (2 ** attempt))
+                    continue
+                if response.status in RETRY_STATUSES and not last_attempt:
+                    response.release()
+                    await asyncio.sleep(self.backoff * (2 ** attempt))
+                    continue
+                break
+
+            async with response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_any():
+                    yield chunk
+
+    def upstream(self, url, service):
+        """The circuit breaker and concurrency limiter for service at url's host"""
+        name = f"{service}:{urlsplit(str(url)).hostname}"
+        with self._stats_lock:
+            if name not in self.upstreams:
+                slow_after = self.timeout_for(service) * settings.UPSTREAM_SLOW_FRACTION
+                self.upstreams[name] = (CircuitBreaker(name), AdaptiveLimiter(name, slow_after))
+            return self.upstreams[name]
+
+    @contextmanager
+    def _guard(self, url, service):
+        """Run one call past the upstream's breaker and limiter; set outcome["failed"] for a failed response"""
+        breaker, limiter = self.upstream(url, service)
+        self._allow(breaker, service)
+        try:
+            limiter.acquire()
+        except BaseException as e:
+            self._refused(breaker, service, e)
+            raise
+        outcome = {"failed": False}
+        start = time.perf_counter()
+        try:
+            yield outcome
+        except Exception as e:
+            self._settle(breaker, limiter, start, _is_upstream_failure(e))
+            raise
+        except BaseException:
+            breaker.abandon()
+            limiter.release()
+            raise
+        self._settle(breaker, limiter, start, outcome["failed"])
+
+    @asynccontextmanager
+    async def _guard_async(self, url, service):
+        """Async variant of _guard"""
+        breaker, limiter = self.upstream(url, service)
+        self._allow(breaker, service)
+        try:
+            await limiter.acquire_async()
+        except BaseException as e:
+            self._refused(breaker, service, e)
+            raise
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._settle(breaker, limiter, start, _is_upstream_failure(e))
+            raise
+        except BaseException:
+            # Cancelled, or a stream closed early: says nothing about the upstream's health
+            breaker.abandon()
+            limiter.release()
+            raise
+        self._settle(breaker, limiter, start, False)
+
+    def _allow(self, breaker, service):
+        try:
+            breaker.allow()
+        except UpstreamUnavailable:
+            UPSTREAM_ERRORS.labels(service, "circuit_open").inc()
+            raise
+
+    def _refused(self, breaker, service, error):
+        """The limiter refused or the caller gave up waiting for a slot"""
+        breaker.abandon()
+        if isinstance(error, UpstreamUnavailable):
+            UPSTREAM_ERRORS.labels(service, "concurrency_limit").inc()
+
+    def _settle(self, breaker, limiter, start, failed):
+        breaker.record(not failed)
+        limiter.release(time.perf_counter() - start, not failed)
+        if breaker.state == "open":
+            limiter.refuse_waiting(f"{breaker.name} circuit open")
+
+    @contextmanager
+    def _instrument(self, service):
+        """Latency histogram, error counter and a fetch span for one upstream call"""
+        start = time.perf_counter()
+        try:
+            with span(f"fetch:{service}"):
+                yield
+        except Exception as e:
+            kind = f"http_{e.status}" if isinstance(e, aiohttp.ClientResponseError) else type(e).__name__
+            UPSTREAM_ERRORS.labels(service, kind).inc()
+            raise
+        finally:
+            UPSTREAM_LATENCY.labels(service).observe(time.perf_counter() - start)
+
+    async def _get_async(self, url, service, params, headers, as_json):
+        session = await self._get_async_session()
+        timeout = aiohttp.ClientTimeout(total=self.timeout_for(service))
+
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                async with session.get(url, params=params, headers=headers, timeout=timeout) as response:
+                    if response.status in RETRY_STATUSES and not last_attempt:
+                        await asyncio.sleep(self.backoff * (2 ** attempt))
+                        continue
+                    response.raise_for_status()
+                    if as_json:
+                        return await response.json(content_type=None)
+                    return await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last_attempt:
+                    raise
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    def stats(self):
+        """Per-host connection pool usage: requests served vs connections opened"""
+        hosts = {}
+
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = self._host_stats(hosts, pool.host)
+                host["requests"] += pool.num_requests
+                host["connections_opened"] += pool.num_connections
+
+        with self._stats_lock:
+            for name, counts in self.async_stats.items():
+                host = self._host_stats(hosts, name)
+                host["requests"] += counts["requests"]
+                host["connections_opened"] += counts["connections_opened"]
+
+        for host in hosts.values():
+            host["pool_hits"] = max(host["requests"] - host["connections_opened"], 0)
+            host["pool_misses"] = host["connections_opened"]
+            host["hit_rate"] = round(host["pool_hits"] / host["requests"], 3) if host["requests"] else 0.0
+
+        return hosts
+
+    def upstream_stats(self):
+        """Circuit state and concurrency limit of every upstream called so far"""
+        with self._stats_lock:
+            upstreams = dict(self.upstreams)
+        return {name: {"circuit": breaker.stats(), "concurrency": limiter.stats()}
+                for name, (breaker, limiter) in sorted(upstreams.items())}
+
+    def _host_stats(self, hosts, host):
+        return hosts.setdefault(host, {"requests": 0, "connections_opened": 0})
+
+    def _count_async(self, url, field):
+        with self._stats_lock:
+            counts = self.async_stats.setdefault(
+                urlsplit(str(url)).hostname, {"requests": 0, "connections_opened": 0}
+            )
+            counts[field] += 1
+
+    async def _on_request_start(self, session, context, params):
+        self._count_async(params.url, "requests")
+
+    async def _on_connection_create(self, session, context, params):
+        context.new_connection = True
+
+    async def _on_request_end(self, session, context, params):
+        if getattr(context, "new_connection", False):
+            self._count_async(params.url, "connections_opened")
+
+    async def _get_async_session(self):
+        """Create the pooled aiohttp session on first use"""
+        if self.async_session is None or self.async_session.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_request_start.append(self._on_request_start)
+            trace.on_connection_create_end.append(self._on_connection_create)
+            trace.on_request_end.append(self._on_request_end)
+            trace.on_request_exception.append(self._on_request_end)
+
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_HOSTS * settings.HTTP_POOL_SIZE,
+                limit_per_host=settings.HTTP_POOL_SIZE,
+                keepalive_timeout=settings.HTTP_KEEPALIVE
+            )
+            self.async_session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+        return self.async_session
+
+    def close(self):
+        """Close the sync session"""
+        self.session.close()
+
+    async def close_async(self):
+        """Close both sessions"""
+        self.close()
+        if self.async_session and not self.async_session.closed:
+            await self.async_session.close()
+
+
+def _is_upstream_failure(error):
+    """Errors that say the upstream is unhealthy, as opposed to a bad request or payload"""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRY_STATUSES
+    return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError,
+                              requests.exceptions.ConnectionError, requests.exceptions.Timeout))
@@ -1,49 +1,32 @@
-import requests
-from config.settings import settings
+import logging
+from services.http_client import HttpClient
+from services.rss_aggregator import RSSAggregator
+
+logger = logging.getLogger(__name__)
 
 class NewsService:
-    def __init__(self):
-        self.api_key = settings.NEWS_API_KEY
-        self.base_url = settings.NEWS_BASE_URL
-    
-    def get_latest_news(self, country="us", category="general", limit=3):
-        """Get latest news headlines"""
+    def __init__(self, http_client=None):
+        self.http = http_client or HttpClient()
+        self.aggregator = RSSAggregator(self.http)
+
+    def start(self):
+        """Start polling the RSS feeds in the background"""
+        self.aggregator.start()
+
+    def stop(self):
+        """Stop polling the RSS feeds"""
+        self.aggregator.stop()
+
+    def get_latest_news(self, limit=3):
+        """Get latest news headlines from the in-memory RSS index (no network I/O)"""
         try:
-            if not self.api_key:
-                return "I need a News API key to provide news updates. Please add your NewsAPI key."
-            
-            url = f"{self.base_url}/top-headlines"
-            params = {
-                'country': country,
-                'category': category,
-                'apiKey': self.api_key,
-                'pageSize': limit
-            }
-            
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data['status'] != 'ok' or not data['articles']:
-                return "No news articles found at the moment."
-            
-            # Format news headlines
-            headlines = []
-            for i, article in enumerate(data['articles'][:limit], 1):
-                title = article['title']
-                source = article['source']['name']
-                headlines.append(f"{i}. {title} - {source}")
-            
-            news_text = "Here are the latest headlines: " + ". ".join(headlines)
-            return news_text
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ News API error: {e}")
-            return "Sorry, I couldn't get the latest news right now."
-        except KeyError as e:
-            print(f"❌ News data parsing error: {e}")
-            return "There was an error processing the news data."
+            headlines = self.aggregator.latest(limit)
+            if not headlines:
+                return "I'm still gathering the latest headlines. Please ask again in a moment."
+
+            lines = [f"{i}. {item['title']} - {item['source']}" for i, item in enumerate(headlines, 1)]
+            return "Here are the latest headlines: " + ". ".join(lines)
+
         except Exception as e:
-            print(f"❌ News service error: {e}")
-            return "There was an error getting the news."
\ No newline at end of file
+            logger.error(f"❌ News service error: {e}")
+            return "There was an error getting the news."
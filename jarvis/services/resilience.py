@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream whose circuit is open or whose concurrency limit is full"""
+
+
+class CircuitBreaker:
+    """Fails calls to one upstream fast once it keeps failing.
+
+    After `threshold` consecutive failures the circuit opens and every call
+    is refused for `open_seconds`. Then it is half open: up to `probes` calls
+    go through, and the first outcome closes the circuit again or reopens it.
+    """
+
+    def __init__(self, name, threshold=None, open_seconds=None, probes=None):
+        self.name = name
+        self.threshold = threshold or settings.CIRCUIT_FAILURE_THRESHOLD
+        self.open_seconds = open_seconds or settings.CIRCUIT_OPEN_SECONDS
+        self.probes = probes or settings.CIRCUIT_HALF_OPEN_PROBES
+        self.state = "closed"
+        self.failures = 0  # consecutive
+        self.opened_at = 0.0
+        self.probing = 0
+        self.lock = threading.Lock()
+        self.counters = {"opened": 0, "rejected": 0}
+
+    def allow(self):
+        """Reserve a call, raising UpstreamUnavailable while the circuit is open"""
+        with self.lock:
+            if self.state == "open":
+                remaining = self.opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    self.counters["rejected"] += 1
+                    raise UpstreamUnavailable(f"{self.name} circuit open, retrying in {remaining:.0f}s")
+                self.state = "half_open"
+                self.probing = 0
+            if self.state == "half_open":
+                if self.probing >= self.probes:
+                    self.counters["rejected"] += 1
+                    raise UpstreamUnavailable(f"{self.name} circuit half open, probe in flight")
+                self.probing += 1
+
+    def record(self, ok):
+        """Outcome of a call reserved with allow()"""
+        with self.lock:
+            if self.state == "half_open":
+                self.probing -= 1
+                if ok:
+                    self.state, self.failures = "closed", 0
+                    logger.info(f"✅ {self.name} recovered, circuit closed")
+                else:
+                    self._open()
+            elif ok:
+                self.failures = 0
+            else:
+                self.failures += 1
+                if self.state == "closed" and self.failures >= self.threshold:
+                    self._open()
+
+    def abandon(self):
+        """Give back a reservation whose call never reached the upstream or was cancelled"""
+        with self.lock:
+            if self.state == "half_open":
+                self.probing -= 1
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["state"] = self.state
+            stats["consecutive_failures"] = self.failures
+            if self.state == "open":
+                stats["retry_in"] = round(max(self.opened_at + self.open_seconds - time.monotonic(), 0), 1)
+        return stats
+
+    def _open(self):
+        """Caller holds the lock"""
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.counters["opened"] += 1
+        logger.warning(f"⚡ {self.name} circuit opened after {self.failures} failures; "
+                       f"failing fast for {self.open_seconds}s")
+
+
+class _Waiter:
+    def __init__(self, notify):
+        self.notify = notify
+        self.granted = False
+        self.refused = None  # reason, when woken without a slot
+
+
+class AdaptiveLimiter:
+    """AIMD limit on the calls in flight to one upstream.
+
+    Each fast success raises the limit by 1/limit, so it climbs by about one
+    per round of calls; a failure halves it and a call slower than
+    `slow_after` seconds shrinks it by a tenth. Calls over the limit queue for
+    up to `queue_timeout` seconds and are then refused, so a slow upstream
+    holds a few sockets and threads instead of all of them.
+    """
+
+    def __init__(self, name, slow_after, max_limit=None, min_limit=None, queue_timeout=None):
+        self.name = name
+        self.slow_after = slow_after
+        self.max_limit = max_limit or settings.HTTP_POOL_SIZE
+        self.min_limit = min_limit or settings.UPSTREAM_MIN_CONCURRENCY
+        self.queue_timeout = queue_timeout if queue_timeout is not None else settings.UPSTREAM_QUEUE_TIMEOUT
+        self.limit = float(self.max_limit)
+        self.inflight = 0
+        self.waiters = deque()
+        self.lock = threading.Lock()
+        self.counters = {"queued": 0, "shed": 0, "decreases": 0}
+
+    def acquire(self):
+        """Take a slot, waiting on this thread; raises UpstreamUnavailable after queue_timeout"""
+        event = threading.Event()
+        waiter = self._enter(event.set)
+        if waiter is None:
+            return
+        if not event.wait(self.queue_timeout):
+            self._give_up(waiter)
+        elif waiter.refused:
+            raise UpstreamUnavailable(waiter.refused)
+
+    async def acquire_async(self):
+        """Take a slot without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enter(wake)
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._give_up(waiter)
+        except asyncio.CancelledError:
+            with self.lock:
+                if waiter.granted:
+                    self.inflight -= 1
+                    self._wake()
+                elif waiter in self.waiters:
+                    self.waiters.remove(waiter)
+            raise
+        if waiter.refused:
+            raise UpstreamUnavailable(waiter.refused)
+
+    def release(self, latency=None, ok=True):
+        """Free a slot and adapt the limit; latency None means the call was cancelled"""
+        with self.lock:
+            self.inflight -= 1
+            if latency is not None:
+                if not ok:
+                    self._decrease(0.5)
+                elif latency > self.slow_after:
+                    self._decrease(0.9)
+                else:
+                    self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+            self._wake()
+
+    def refuse_waiting(self, reason):
+        """Fail every queued call at once, e.g. because the upstream's circuit just opened"""
+        with self.lock:
+            while self.waiters:
+                waiter = self.waiters.popleft()
+                waiter.refused = reason
+                self.counters["shed"] += 1
+                waiter.notify()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats.update(limit=round(self.limit, 1), inflight=self.inflight, waiting=len(self.waiters))
+        return stats
+
+    def _enter(self, notify):
+        """None if a slot was free, else the queued waiter"""
+        with self.lock:
+            if self.inflight < int(self.limit) and not self.waiters:
+                self.inflight += 1
+                return None
+            waiter = _Waiter(notify)
+            self.waiters.append(waiter)
+            self.counters["queued"] += 1
+            return waiter
+
+    def _give_up(self, waiter):
+        """Raise for a waiter that timed out, unless a slot was handed to it meanwhile"""
+        with self.lock:
+            if waiter.granted:
+                return
+            if waiter.refused:
+                raise UpstreamUnavailable(waiter.refused)
+            self.waiters.remove(waiter)
+            self.counters["shed"] += 1
+        raise UpstreamUnavailable(f"{self.name} is at its concurrency limit ({int(self.limit)} in flight)")
+
+    def _decrease(self, factor):
+        """Caller holds the lock"""
+        self.limit = max(self.limit * factor, self.min_limit)
+        self.counters["decreases"] += 1
+
+    def _wake(self):
+        """Hand free slots to queued callers in order; caller holds the lock"""
+        while self.waiters and self.inflight < int(self.limit):
+            waiter = self.waiters.popleft()
+            waiter.granted = True
+            self.inflight += 1
+            waiter.notify()
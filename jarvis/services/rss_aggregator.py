@@ -0,0 +1,196 @@
+import logging
+import bisect
+import calendar
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import feedparser
+from config.settings import settings
+from services.http_client import HttpClient
+from services.shared_cache import shared_store
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE = "rss"  # SharedCacheStore cache and key of the published index
+SHARED_KEY = "index"
+
+
+class RSSAggregator:
+    """Background RSS poller keeping a merged, newest-first headline index.
+
+    Every refresh fetches all feeds in parallel with conditional GETs, so an
+    unchanged feed costs a 304. Entries are indexed until the first one seen
+    on a previous poll of that feed, and headlines repeated across sources
+    are dropped. Readers only ever touch the in-memory index.
+
+    With SHARED_CACHE on (multi-process mode), the processes poll in turn
+    through the SharedCacheStore: whichever finds the shared index older
+    than the refresh interval takes the lease, polls and publishes its
+    index, and the others copy that index instead of fetching the feeds.
+    """
+
+    def __init__(self, http_client=None, feeds=None, store=None):
+        self.http = http_client or HttpClient()
+        self.feeds = list(feeds if feeds is not None else settings.NEWS_RSS_FEEDS)
+        self.interval = settings.RSS_REFRESH_INTERVAL
+        self.max_items = settings.RSS_MAX_ITEMS
+
+        self.validators = {}  # feed url -> {"etag": ..., "modified": ...}
+        self.feed_ids = {}  # feed url -> entry ids seen on earlier polls
+        self.seen = set()  # dedupe keys of indexed headlines
+        self.index = []  # (-published, seq, item), newest first
+        self.seq = 0
+        self.lock = threading.Lock()
+        self.store = store if store is not None else (shared_store() if settings.SHARED_CACHE else None)
+        self.counters = {"refreshes": 0, "fetched": 0, "not_modified": 0, "errors": 0, "items_added": 0,
+                         "shared_reads": 0}
+
+        self.running = False
+        self.stop_event = threading.Event()
+        self.refresh_thread = None
+
+    def start(self):
+        """Start polling the feeds in a background thread"""
+        if not self.running:
+            self.running = True
+            self.stop_event.clear()
+            self.refresh_thread = threading.Thread(target=self._run, daemon=True)
+            self.refresh_thread.start()
+            logger.info("📰 RSS aggregator started")
+
+    def stop(self):
+        """Stop the polling thread"""
+        self.running = False
+        self.stop_event.set()
+        if self.refresh_thread:
+            self.refresh_thread.join(timeout=1)
+
+    def refresh(self):
+        """Poll every feed once, in parallel; returns the number of new headlines"""
+        with ThreadPoolExecutor(max_workers=max(len(self.feeds), 1)) as pool:
+            added = sum(pool.map(self._refresh_feed, self.feeds))
+        with self.lock:
+            self.counters["refreshes"] += 1
+        return added
+
+    def latest(self, limit=3):
+        """Newest headlines as dicts with title, source, link and published"""
+        with self.lock:
+            return [item for _, _, item in self.index[:limit]]
+
+    def stats(self):
+        """Poll counters plus index size"""
+        with self.lock:
+            stats = dict(self.counters)
+            stats["indexed"] = len(self.index)
+        return stats
+
+    def _run(self):
+        while self.running:
+            wait = self.interval
+            try:
+                if self.store is None:
+                    self.refresh()
+                else:
+                    wait = self._sync_shared()
+            except Exception as e:
+                logger.error(f"❌ RSS refresh error: {e}")
+            self.stop_event.wait(wait)
+
+    def _sync_shared(self):
+        """Poll and publish, or copy the index another process published; returns seconds until it is due"""
+        shared, polled = self.store.get_or_fetch(SHARED_CACHE, SHARED_KEY, self.interval, self._refresh_shared)
+        if not polled:
+            self._adopt(shared["items"])
+        return max(1.0, shared["published"] + self.interval - time.time())
+
+    def _refresh_shared(self):
+        self.refresh()
+        with self.lock:
+            items = [item for _, _, item in self.index]
+        return {"published": time.time(), "items": items}
+
+    def _adopt(self, items):
+        """Replace the index with one published by the polling process"""
+        with self.lock:
+            self.index = []
+            for item in items:
+                self.seq += 1
+                self.index.append((-item["published"], self.seq, item))
+            self.seen = {self._dedupe_key(item["title"]) for item in items}
+            self.counters["shared_reads"] += 1
+
+    def _refresh_feed(self, url):
+        """Conditionally fetch one feed and index its new entries"""
+        validators = self.validators.get(url, {})
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("modified"):
+            headers["If-Modified-Since"] = validators["modified"]
+
+        try:
+            response = self.http.get(url, "news", headers=headers)
+            if response.status_code == 304:
+                self._count("not_modified")
+                return 0
+            response.raise_for_status()
+        except Exception as e:
+            self._count("errors")
+            logger.error(f"❌ RSS feed error ({url}): {e}")
+            return 0
+
+        self._count("fetched")
+        self.validators[url] = {
+            "etag": response.headers.get("ETag"),
+            "modified": response.headers.get("Last-Modified")
+        }
+
+        parsed = feedparser.parse(response.content)
+        source = parsed.feed.get("title", url)
+        return self._index_entries(url, source, parsed.entries)
+
+    def _index_entries(self, url, source, entries):
+        """Merge entries into the index, stopping at the first one already known"""
+        now = time.time()
+        added = 0
+        known_ids = self.feed_ids.get(url, set())
+        self.feed_ids[url] = {self._entry_id(entry) for entry in entries}
+
+        with self.lock:
+            for entry in entries:
+                if self._entry_id(entry) in known_ids:
+                    # Feeds list newest first; the rest were indexed on an earlier poll
+                    break
+                title = entry.get("title", "").strip()
+                key = self._dedupe_key(title)
+                if not title or key in self.seen:
+                    continue
+
+                published_struct = entry.get("published_parsed") or entry.get("updated_parsed")
+                published = calendar.timegm(published_struct) if published_struct else now
+                item = {"title": title, "source": source, "link": entry.get("link"), "published": published}
+
+                self.seen.add(key)
+                self.seq += 1
+                bisect.insort(self.index, (-published, self.seq, item))
+                added += 1
+
+            while len(self.index) > self.max_items:
+                _, _, dropped = self.index.pop()
+                self.seen.discard(self._dedupe_key(dropped["title"]))
+
+            self.counters["items_added"] += added
+        return added
+
+    def _entry_id(self, entry):
+        return entry.get("id") or entry.get("link") or entry.get("title")
+
+    def _dedupe_key(self, title):
+        """Normalise a headline so the same story from two sources collides"""
+        return re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
+
+    def _count(self, field):
+        with self.lock:
+            self.counters[field] += 1
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from config.settings import settings
+
+POLL_SECONDS = 0.02  # How often a worker waiting on another's fetch checks for the value
+PRUNE_EVERY = 200  # Writes between sweeps of expired entries
+
+
+class SharedCacheStore:
+    """Lookup cache shared by every worker process through one SQLite file.
+
+    Values are stored as JSON with the wall-clock time they were fetched. A
+    worker that misses takes a lease on the key before calling the upstream;
+    other workers that miss meanwhile wait for its value instead of calling
+    the upstream too. A lease that is not released within `lease` seconds
+    (its worker died) is taken over.
+    """
+
+    def __init__(self, path=None, lease=None, max_age=None):
+        self.path = path or settings.SHARED_CACHE_PATH
+        self.lease = lease or settings.SHARED_CACHE_LEASE
+        self.max_age = max_age or max(settings.CACHE_TTLS.values()) + settings.CACHE_STALE_TTL
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.counters = {"hits": 0, "waits": 0, "fetches": 0}
+        self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "cache TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, stored_at REAL NOT NULL, "
+            "PRIMARY KEY (cache, key))"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "cache TEXT NOT NULL, key TEXT NOT NULL, expires REAL NOT NULL, PRIMARY KEY (cache, key))"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "name TEXT NOT NULL, client TEXT NOT NULL, tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (name, client))"
+        )
+
+    def get(self, cache, key, ttl):
+        """(True, value) if another process stored key less than ttl seconds ago, else (False, None)"""
+        with self.lock:
+            row = self.connection.execute("SELECT value, stored_at FROM entries WHERE cache = ? AND key = ?",
+                                          (cache, _encode_key(key))).fetchone()
+        if row and time.time() - row[1] <= ttl:
+            return True, json.loads(row[0])
+        return False, None
+
+    def put(self, cache, key, value):
+        """Store a fetched value and release the lease on its key"""
+        encoded, now = _encode_key(key), time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                                        (cache, encoded, json.dumps(value), now))
+                self.connection.execute("DELETE FROM leases WHERE cache = ? AND key = ?", (cache, encoded))
+                self.writes += 1
+                if self.writes % PRUNE_EVERY == 0:
+                    self.connection.execute("DELETE FROM entries WHERE stored_at < ?", (now - self.max_age,))
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def claim(self, cache, key):
+        """Take the lease on key; False if another process holds an unexpired one"""
+        encoded, now = _encode_key(key), time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute("DELETE FROM leases WHERE cache = ? AND key = ? AND expires < ?",
+                                        (cache, encoded, now))
+                claimed = self.connection.execute("INSERT OR IGNORE INTO leases VALUES (?, ?, ?)",
+                                                  (cache, encoded, now + self.lease)).rowcount == 1
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+        return claimed
+
+    def release(self, cache, key):
+        with self.lock:
+            self.connection.execute("DELETE FROM leases WHERE cache = ? AND key = ?", (cache, _encode_key(key)))
+
+    def get_or_fetch(self, cache, key, ttl, fetch):
+        """(value, fetched) where fetched is False when another process supplied the value"""
+        waited = False
+        while True:
+            found, value = self.get(cache, key, ttl)
+            if found:
+                self._count("waits" if waited else "hits")
+                return value, False
+            if self.claim(cache, key):
+                break
+            waited = True
+            time.sleep(POLL_SECONDS)
+
+        self._count("fetches")
+        try:
+            value = fetch()
+        except BaseException:
+            self.release(cache, key)
+            raise
+        self.put(cache, key, value)
+        return value, True
+
+    async def get_or_fetch_async(self, cache, key, ttl, fetch):
+        """Async variant of get_or_fetch; fetch is a coroutine function and SQLite runs off the event loop"""
+        waited = False
+        while True:
+            found, value = await asyncio.to_thread(self.get, cache, key, ttl)
+            if found:
+                self._count("waits" if waited else "hits")
+                return value, False
+            if await asyncio.to_thread(self.claim, cache, key):
+                break
+            waited = True
+            await asyncio.sleep(POLL_SECONDS)
+
+        self._count("fetches")
+        try:
+            value = await fetch()
+        except BaseException:
+            await asyncio.to_thread(self.release, cache, key)
+            raise
+        await asyncio.to_thread(self.put, cache, key, value)
+        return value, True
+
+    def take_token(self, name, client, rate, burst):
+        """Take a token from client's bucket in the named token-bucket limiter shared by every process.
+
+        Returns 0 if one was available, else seconds until there is one.
+        """
+        now = time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute("SELECT tokens, updated_at FROM buckets WHERE name = ? AND client = ?",
+                                              (name, client)).fetchone()
+                tokens = burst if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+                wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+                self.connection.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+                                        (name, client, tokens - 1 if not wait else tokens, now))
+                self.writes += 1
+                if self.writes % PRUNE_EVERY == 0:
+                    # Buckets untouched for long enough to have refilled are the same as missing ones
+                    self.connection.execute("DELETE FROM buckets WHERE name = ? AND updated_at < ?",
+                                            (name, now - burst / rate))
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+        return wait
+
+    def bucket_count(self, name):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM buckets WHERE name = ?", (name,)).fetchone()[0]
+
+    def stats(self):
+        """Lookups this process answered from the store, waited on, or fetched itself"""
+        with self.lock:
+            stats = dict(self.counters)
+            stats["entries"] = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def _count(self, field):
+        with self.lock:
+            self.counters[field] += 1
+
+
+def _encode_key(key):
+    return json.dumps(key)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def shared_store():
+    """The process-wide store, opened on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SharedCacheStore()
+        return _store
@@ -1,43 +1,85 @@
+import logging
 import requests
+import aiohttp
+import urllib.parse
 from config.settings import settings
+from services.http_client import HttpClient
+from services.cache import ResponseCache
+from services.resilience import UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
 
 class WeatherService:
-    def __init__(self):
-        self.api_key = settings.WEATHER_API_KEY
+    def __init__(self, http_client=None):
         self.base_url = settings.WEATHER_BASE_URL
-    
+        self.http = http_client or HttpClient()
+        self.cache = ResponseCache("weather")
+
     def get_weather(self, city="London"):
         """Get current weather for a city"""
         try:
-            if not self.api_key:
-                return "I need a weather API key to provide weather updates. Please add your OpenWeatherMap API key."
-            
-            url = f"{self.base_url}/weather"
-            params = {
-                'q': city,
-                'appid': self.api_key,
-                'units': 'metric'
-            }
-            
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Extract weather info
-            temp = round(data['main']['temp'])
-            feels_like = round(data['main']['feels_like'])
-            description = data['weather'][0]['description']
-            humidity = data['main']['humidity']
-            
-            return f"The weather in {city} is {description} with a temperature of {temp}°C, feels like {feels_like}°C. Humidity is {humidity}%."
-            
+            current = self.cache.get_or_fetch(city.lower(), lambda: self._fetch_weather(city))
+            return self._format_weather(city, current)
+
+        except UpstreamUnavailable as e:
+            logger.warning(f"⚡ Weather lookup skipped: {e}")
+            return f"Sorry, the weather service isn't responding right now, so I can't check {city}."
         except requests.exceptions.RequestException as e:
-            print(f"❌ Weather API error: {e}")
+            logger.error(f"❌ Weather API error: {e}")
+            return f"Sorry, I couldn't get the weather information for {city} right now."
+        except (KeyError, IndexError) as e:
+            logger.error(f"❌ Weather data parsing error: {e}")
+            return f"Sorry, I couldn't find weather information for {city}. Please check the city name."
+        except Exception as e:
+            logger.error(f"❌ Weather service error: {e}")
+            return "There was an error getting the weather information."
+
+    async def get_weather_async(self, city="London"):
+        """Get current weather for a city without blocking the event loop"""
+        try:
+            current = await self.cache.get_or_fetch_async(city.lower(), lambda: self._fetch_weather_async(city))
+            return self._format_weather(city, current)
+
+        except UpstreamUnavailable as e:
+            logger.warning(f"⚡ Weather lookup skipped: {e}")
+            return f"Sorry, the weather service isn't responding right now, so I can't check {city}."
+        except (aiohttp.ClientError, TimeoutError) as e:
+            logger.error(f"❌ Weather API error: {e}")
             return f"Sorry, I couldn't get the weather information for {city} right now."
-        except KeyError as e:
-            print(f"❌ Weather data parsing error: {e}")
+        except (KeyError, IndexError) as e:
+            logger.error(f"❌ Weather data parsing error: {e}")
             return f"Sorry, I couldn't find weather information for {city}. Please check the city name."
         except Exception as e:
-            print(f"❌ Weather service error: {e}")
-            return "There was an error getting the weather information."
\ No newline at end of file
+            logger.error(f"❌ Weather service error: {e}")
+            return "There was an error getting the weather information."
+
+    def _fetch_weather(self, city):
+        """Fetch the current conditions for a city from wttr.in"""
+        response = self.http.get(self._weather_url(city), "weather", params={'format': 'j1'})
+        response.raise_for_status()
+        return self._current_condition(response.json())
+
+    async def _fetch_weather_async(self, city):
+        """Async variant of _fetch_weather"""
+        data = await self.http.get_async(self._weather_url(city), "weather",
+                                         params={'format': 'j1'}, as_json=True)
+        return self._current_condition(data)
+
+    def _weather_url(self, city):
+        """Build the wttr.in URL for a city"""
+        return f"{self.base_url}/{urllib.parse.quote(city)}"
+
+    def _current_condition(self, data):
+        """Pull the fields we speak out of a wttr.in j1 payload"""
+        current = data['current_condition'][0]
+        return {
+            'temp': current['temp_C'],
+            'feels_like': current['FeelsLikeC'],
+            'description': current['weatherDesc'][0]['value'].lower(),
+            'humidity': current['humidity']
+        }
+
+    def _format_weather(self, city, current):
+        """Turn the current conditions into a spoken sentence"""
+        return (f"The weather in {city} is {current['description']} with a temperature of {current['temp']}°C, "
+                f"feels like {current['feels_like']}°C. Humidity is {current['humidity']}%.")
@@ -1,74 +1,249 @@
+import logging
+import asyncio
+from contextlib import aclosing
 import requests
-from bs4 import BeautifulSoup
-import urllib.parse
+import aiohttp
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from config.settings import settings
+from services.http_client import HttpClient
+from services.cache import ResponseCache
+from services.resilience import UpstreamUnavailable
+from services.search_parser import get_feeder, get_parser
+from monitoring.tracing import span
+
+logger = logging.getLogger(__name__)
 
 class WebSearchService:
-    def __init__(self):
+    """DuckDuckGo search that races the instant answer API against the HTML
+    results page and answers with whichever useful reply arrives first"""
+
+    def __init__(self, http_client=None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-    
+        self.html_url = settings.SEARCH_HTML_URL
+        self.api_url = settings.SEARCH_API_URL
+        self.http = http_client or HttpClient()
+        self.cache = ResponseCache("search")
+        self.answer_cache = ResponseCache("quick_answer")
+        self.parse = get_parser()
+        self.feeder = get_feeder()
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="search")
+
     def search(self, query, num_results=3):
         """Perform web search and return summarized results"""
         try:
             if not query or len(query.strip()) < 2:
                 return "Please provide a search query."
-            
-            # Use DuckDuckGo for search (no API key required)
-            search_url = f"https://duckduckgo.com/html/?q={urllib.parse.quote(query)}"
-            
-            response = requests.get(search_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract search results
-            results = []
-            result_elements = soup.find_all('div', class_='result')
-            
-            for element in result_elements[:num_results]:
-                title_elem = element.find('a', class_='result__a')
-                snippet_elem = element.find('div', class_='result__snippet')
-                
-                if title_elem and snippet_elem:
-                    title = title_elem.get_text().strip()
-                    snippet = snippet_elem.get_text().strip()
-                    results.append(f"{title}: {snippet}")
-            
-            if results:
-                search_summary = f"Here's what I found about '{query}': " + " | ".join(results[:2])
-                return search_summary
-            else:
-                return f"I couldn't find specific information about '{query}' right now."
-                
+
+            results = self.executor.submit(self.cache.get_or_fetch, (query.lower(), num_results),
+                                           lambda: self._fetch_results(query, num_results))
+            answer = self.executor.submit(self.get_quick_answer, query)
+
+            pending, error = {results, answer}, None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        if future.result():
+                            return self._summarize(query, self._as_results(future is answer, future.result()))
+                    except Exception as e:
+                        error = e
+            if error:
+                raise error
+            return self._summarize(query, [])
+
+        except UpstreamUnavailable as e:
+            logger.warning(f"⚡ Web search skipped: {e}")
+            return self._unavailable(query)
         except requests.exceptions.RequestException as e:
-            print(f"❌ Web search error: {e}")
+            logger.error(f"❌ Web search error: {e}")
             return f"Sorry, I couldn't search for '{query}' right now due to network issues."
         except Exception as e:
-            print(f"❌ Web search service error: {e}")
+            logger.error(f"❌ Web search service error: {e}")
             return f"There was an error searching for '{query}'."
-    
+
+    async def search_async(self, query, num_results=3):
+        """Perform web search without blocking the event loop"""
+        try:
+            if not query or len(query.strip()) < 2:
+                return "Please provide a search query."
+
+            results = asyncio.ensure_future(self.cache.get_or_fetch_async(
+                (query.lower(), num_results), lambda: self._fetch_results_async(query, num_results)
+            ))
+            answer = asyncio.ensure_future(self.get_quick_answer_async(query))
+
+            pending, error = {results, answer}, None
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        try:
+                            if task.result():
+                                return self._summarize(query, self._as_results(task is answer, task.result()))
+                        except Exception as e:
+                            error = e
+            finally:
+                # The cache finishes the losing fetch in the background
+                for task in pending:
+                    task.cancel()
+            if error:
+                raise error
+            return self._summarize(query, [])
+
+        except UpstreamUnavailable as e:
+            logger.warning(f"⚡ Web search skipped: {e}")
+            return self._unavailable(query)
+        except (aiohttp.ClientError, TimeoutError) as e:
+            logger.error(f"❌ Web search error: {e}")
+            return f"Sorry, I couldn't search for '{query}' right now due to network issues."
+        except Exception as e:
+            logger.error(f"❌ Web search service error: {e}")
+            return f"There was an error searching for '{query}'."
+
+    async def stream_async(self, query, num_results=3):
+        """Yield the spoken summary in pieces: each result as soon as it is parsed
+        from the arriving page, or the instant answer if that comes first"""
+        try:
+            if not query or len(query.strip()) < 2:
+                yield "Please provide a search query."
+                return
+
+            cached = self.cache.get((query.lower(), num_results))
+            if cached is not None:
+                yield self._summarize(query, cached)
+                return
+
+            answer = asyncio.ensure_future(self.get_quick_answer_async(query))
+            try:
+                async with aclosing(self._stream_results_async(query, num_results)) as results:
+                    first = asyncio.ensure_future(anext(results, None))
+                    try:
+                        await asyncio.wait({first, answer}, return_when=asyncio.FIRST_COMPLETED)
+                        if not first.done() and answer.result():
+                            yield self._summarize(query, [answer.result()])
+                            return
+                        result = await first
+                    finally:
+                        first.cancel()
+
+                    if result is None:
+                        quick = await answer
+                        yield self._summarize(query, [quick] if quick else [])
+                        return
+
+                    # Spoken like _summarize: a lead-in, then the first two results
+                    yield self._summarize(query, [result])
+                    async for result in results:
+                        yield " | " + result
+                        break
+                    async for _ in results:
+                        pass  # keep parsing so the cache gets the full result list
+            finally:
+                answer.cancel()
+
+        except UpstreamUnavailable as e:
+            logger.warning(f"⚡ Web search skipped: {e}")
+            found, cached = self.cache.fallback((query.lower(), num_results))
+            yield self._summarize(query, cached) if found else self._unavailable(query)
+        except (aiohttp.ClientError, TimeoutError) as e:
+            logger.error(f"❌ Web search error: {e}")
+            yield f"Sorry, I couldn't search for '{query}' right now due to network issues."
+        except Exception as e:
+            logger.error(f"❌ Web search service error: {e}")
+            yield f"There was an error searching for '{query}'."
+
     def get_quick_answer(self, query):
         """Get a quick answer for simple queries"""
         try:
-            # Use DuckDuckGo instant answer API
-            api_url = f"https://api.duckduckgo.com/?q={urllib.parse.quote(query)}&format=json&no_html=1&skip_disambig=1"
-            
-            response = requests.get(api_url, timeout=5)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check for instant answer
-            if data.get('AbstractText'):
-                return data['AbstractText']
-            elif data.get('Answer'):
-                return data['Answer']
-            elif data.get('Definition'):
-                return data['Definition']
-            
+            return self.answer_cache.get_or_fetch(query.lower(), lambda: self._fetch_answer(query))
+
+        except Exception as e:
+            logger.error(f"❌ Quick answer error: {e}")
             return None
-            
+
+    async def get_quick_answer_async(self, query):
+        """Get a quick answer without blocking the event loop"""
+        try:
+            return await self.answer_cache.get_or_fetch_async(query.lower(),
+                                                              lambda: self._fetch_answer_async(query))
+
         except Exception as e:
-            print(f"❌ Quick answer error: {e}")
-            return None
\ No newline at end of file
+            logger.error(f"❌ Quick answer error: {e}")
+            return None
+
+    def _fetch_results(self, query, num_results):
+        """Fetch and parse a DuckDuckGo HTML results page (no API key required)"""
+        response = self.http.get(self.html_url, "search", params={'q': query}, headers=self.headers)
+        response.raise_for_status()
+        return self._parse_results(response.content, num_results)
+
+    async def _fetch_results_async(self, query, num_results):
+        """Async variant of _fetch_results"""
+        content = await self.http.get_async(self.html_url, "search", params={'q': query},
+                                            headers=self.headers)
+        return self._parse_results(content, num_results)
+
+    async def _stream_results_async(self, query, num_results):
+        """Yield results as the HTML page arrives and is parsed, then cache the full list"""
+        feeder = self.feeder(num_results)
+        async with aclosing(self.http.stream_async(self.html_url, "search", params={'q': query},
+                                                   headers=self.headers)) as chunks:
+            async for chunk in chunks:
+                with span("parse:search"):
+                    results = feeder.feed(chunk)
+                for result in results:
+                    yield result
+                if feeder.done:
+                    break
+            else:
+                for result in feeder.close():
+                    yield result
+        self.cache.put((query.lower(), num_results), feeder.results)
+
+    def _fetch_answer(self, query):
+        """Ask the DuckDuckGo instant answer API"""
+        response = self.http.get(self.api_url, "quick_answer", params=self._quick_answer_params(query))
+        response.raise_for_status()
+        return self._extract_answer(response.json())
+
+    async def _fetch_answer_async(self, query):
+        """Async variant of _fetch_answer"""
+        data = await self.http.get_async(self.api_url, "quick_answer",
+                                         params=self._quick_answer_params(query), as_json=True)
+        return self._extract_answer(data)
+
+    def _parse_results(self, content, num_results):
+        """Extract 'title: snippet' strings from a DuckDuckGo HTML page, stopping after num_results"""
+        with span("parse:search"):
+            return self.parse(content, num_results)
+
+    def _as_results(self, is_answer, value):
+        """A quick answer is summarized like a single search result"""
+        return [value] if is_answer else value
+
+    def _summarize(self, query, results):
+        """Build the spoken summary for a list of results"""
+        if results:
+            return f"Here's what I found about '{query}': " + " | ".join(results[:2])
+        return f"I couldn't find specific information about '{query}' right now."
+
+    def _unavailable(self, query):
+        """Reply for when the search upstream is failing fast and nothing is cached"""
+        return f"Sorry, search isn't responding right now, so I can't look up '{query}'."
+
+    def _quick_answer_params(self, query):
+        """Query parameters for the instant answer API"""
+        return {'q': query, 'format': 'json', 'no_html': 1, 'skip_disambig': 1}
+
+    def _extract_answer(self, data):
+        """Pick the first useful field from an instant answer payload"""
+        if data.get('AbstractText'):
+            return data['AbstractText']
+        elif data.get('Answer'):
+            return data['Answer']
+        elif data.get('Definition'):
+            return data['Definition']
+
+        return None
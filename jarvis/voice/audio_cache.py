@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+import wave
+from collections import OrderedDict
+from config.settings import settings
+
+
+class AudioCache:
+    """Content-addressed, size-bounded on-disk cache of rendered speech.
+
+    Files are named by a hash of the text and the voice, rate and volume
+    that rendered them, so changing any of those never replays stale audio.
+    The least recently played files are evicted once the cache exceeds
+    `max_bytes`. Only WAV files are kept: a render in any other format
+    (pyttsx3 writes AIFF on macOS) is rejected with ValueError.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or settings.TTS_CACHE_DIR
+        self.max_bytes = max_bytes or settings.TTS_CACHE_MAX_MB * 1024 * 1024
+        self.lock = threading.Lock()
+        self.files = OrderedDict()  # path -> size, least recently used first
+        self.total_bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "rendered": 0, "evicted": 0, "discarded": 0}
+
+        os.makedirs(self.directory, exist_ok=True)
+        existing = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".wav") and os.path.isfile(path):
+                stat = os.stat(path)
+                existing.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(existing):
+            self.files[path] = size
+            self.total_bytes += size
+
+    def path_for(self, text, voice):
+        """Cache path for text spoken with voice = (voice id, rate, volume)"""
+        digest = hashlib.sha256(repr((text, *voice)).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.wav")
+
+    def get(self, text, voice):
+        """Path of the cached audio, or None"""
+        path = self.path_for(text, voice)
+        with self.lock:
+            if path not in self.files:
+                self.counters["misses"] += 1
+                return None
+            self.files.move_to_end(path)
+            self.counters["hits"] += 1
+        try:
+            os.utime(path)  # keep LRU order across restarts
+        except OSError:
+            with self.lock:
+                self._forget(path)
+            return None
+        return path
+
+    def contains(self, text, voice):
+        with self.lock:
+            return self.path_for(text, voice) in self.files
+
+    def render(self, text, voice, render_to):
+        """Render text with render_to(text, path) and store it atomically"""
+        path = self.path_for(text, voice)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            render_to(text, tmp_path)
+            try:
+                with wave.open(tmp_path, "rb") as wav:
+                    wav.getnframes()
+            except (wave.Error, EOFError) as e:
+                raise ValueError(f"rendered audio is not a WAV file: {e}")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        size = os.path.getsize(path)
+        with self.lock:
+            self._forget(path)
+            self.files[path] = size
+            self.total_bytes += size
+            self.counters["rendered"] += 1
+            self._evict()
+        return path
+
+    def discard(self, text, voice):
+        """Delete cached audio that failed to play, so the text is synthesized again"""
+        path = self.path_for(text, voice)
+        with self.lock:
+            self._forget(path)
+            self.counters["discarded"] += 1
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["files"] = len(self.files)
+            stats["bytes"] = self.total_bytes
+        return stats
+
+    def _forget(self, path):
+        size = self.files.pop(path, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self.files) > 1:
+            path, size = self.files.popitem(last=False)
+            self.total_bytes -= size
+            self.counters["evicted"] += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,233 @@
+import queue
+import time
+import numpy as np
+from config.settings import settings
+from voice.tts_backends import read_wav
+
+
+class RingBuffer:
+    """Fixed number of the most recent audio frames, stored in one numpy array"""
+
+    def __init__(self, frames, frame_size):
+        self.data = np.zeros((frames, frame_size), dtype=np.int16)
+        self.start = 0
+        self.count = 0
+
+    def append(self, frame):
+        end = (self.start + self.count) % len(self.data)
+        self.data[end] = frame
+        if self.count < len(self.data):
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % len(self.data)
+
+    def drain(self):
+        """Frames in arrival order, oldest first; empties the buffer"""
+        frames = np.roll(self.data, -self.start, axis=0)[:self.count]
+        self.start = self.count = 0
+        return list(frames)
+
+
+class Segment:
+    """A stretch of speech, with its position in the audio stream in seconds"""
+
+    def __init__(self, samples, sample_rate, start, end):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.start = start
+        self.end = end
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+
+class MicrophoneSource:
+    """Blocks of int16 mono samples from the default input device"""
+
+    def __init__(self, sample_rate=None, block_size=None):
+        self.sample_rate = sample_rate or settings.AUDIO_SAMPLE_RATE
+        self.block_size = block_size or self.sample_rate * settings.AUDIO_FRAME_MS // 1000 * 4
+        self.blocks_queue = queue.Queue(maxsize=100)
+        self.stream = None
+
+    def blocks(self):
+        import sounddevice as sd
+
+        def callback(indata, frames, time_info, status):
+            try:
+                self.blocks_queue.put_nowait(indata[:, 0].copy())
+            except queue.Full:
+                pass  # consumer is behind; dropping audio beats unbounded lag
+
+        self.stream = sd.InputStream(samplerate=self.sample_rate, blocksize=self.block_size,
+                                     channels=1, dtype="int16", callback=callback)
+        with self.stream:
+            while self.stream.active:
+                yield self.blocks_queue.get()
+
+    def flush(self):
+        """Drop audio captured but not yet consumed"""
+        while not self.blocks_queue.empty():
+            self.blocks_queue.get_nowait()
+
+    def close(self):
+        if self.stream:
+            self.stream.close()
+
+
+class WavSource:
+    """Blocks of a WAV file, downmixed to mono and resampled to sample_rate.
+
+    With realtime=True blocks are released at the pace they would arrive from
+    a microphone; otherwise the file is streamed as fast as it is consumed.
+    """
+
+    def __init__(self, path, sample_rate=None, block_size=None, realtime=False):
+        self.path = path
+        self.sample_rate = sample_rate or settings.AUDIO_SAMPLE_RATE
+        self.block_size = block_size or self.sample_rate * settings.AUDIO_FRAME_MS // 1000 * 4
+        self.realtime = realtime
+
+    def blocks(self):
+        samples, rate = read_wav(self.path)
+        mono = samples.mean(axis=1)
+        if rate != self.sample_rate:
+            positions = np.arange(0, len(mono), rate / self.sample_rate)
+            mono = np.interp(positions, np.arange(len(mono)), mono)
+        mono = mono.astype(np.int16)
+
+        start = time.monotonic()
+        for offset in range(0, len(mono), self.block_size):
+            if self.realtime:
+                delay = start + offset / self.sample_rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            yield mono[offset:offset + self.block_size]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class AudioFrontEnd:
+    """Cuts a stream of audio blocks into speech segments using frame energy.
+
+    Each block is split into AUDIO_FRAME_MS frames and their RMS energy is
+    computed in one vectorized pass. A frame is speech when its energy is
+    above both VAD_MIN_RMS and VAD_NOISE_RATIO times the running noise floor,
+    which tracks the energy of non-speech frames. A segment starts at the first
+    speech frame, with VAD_PREROLL_MS of earlier audio from a ring buffer so
+    onsets are not clipped, and ends after VAD_HANGOVER_MS of silence or
+    VAD_MAX_SEGMENT_S of speech. Silence never leaves this class.
+    """
+
+    def __init__(self, source, frame_ms=None, min_rms=None, noise_ratio=None, hangover_ms=None,
+                 preroll_ms=None, max_segment_s=None, min_speech_ms=None):
+        self.source = source
+        self.sample_rate = source.sample_rate
+        self.frame_size = self.sample_rate * (frame_ms or settings.AUDIO_FRAME_MS) // 1000
+        frame_seconds = self.frame_size / self.sample_rate
+        self.min_rms = min_rms or settings.VAD_MIN_RMS
+        self.noise_ratio = noise_ratio or settings.VAD_NOISE_RATIO
+        self.hangover = max(int((hangover_ms or settings.VAD_HANGOVER_MS) / 1000 / frame_seconds), 1)
+        self.max_frames = int((max_segment_s or settings.VAD_MAX_SEGMENT_S) / frame_seconds)
+        self.min_speech = max(int((min_speech_ms or settings.VAD_MIN_SPEECH_MS) / 1000 / frame_seconds), 1)
+        preroll = max(int((preroll_ms or settings.VAD_PREROLL_MS) / 1000 / frame_seconds), 1)
+
+        self.preroll = RingBuffer(preroll, self.frame_size)
+        self.noise_floor = None
+        self.remainder = np.zeros(0, dtype=np.int16)
+        self.frames_seen = 0
+        self.segment = None  # frames of the segment in progress
+        self.segment_start = 0
+        self.speech_frames = 0
+        self.silent_run = 0
+        self.blocks_iter = None
+        self.pending = []  # segments completed by the last block but not yet returned
+        self.counters = {"frames": 0, "speech_frames": 0, "segments": 0, "discarded": 0}
+
+    def feed(self, block):
+        """Process one block of samples; returns the segments it completed"""
+        samples = np.concatenate([self.remainder, block]) if len(self.remainder) else block
+        usable = len(samples) // self.frame_size * self.frame_size
+        self.remainder = samples[usable:]
+        if not usable:
+            return []
+
+        frames = samples[:usable].reshape(-1, self.frame_size)
+        rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+        if self.noise_floor is None:
+            self.noise_floor = float(np.median(rms))
+
+        segments = []
+        for frame, energy in zip(frames, rms):
+            is_speech = energy > self.min_rms and energy > self.noise_floor * self.noise_ratio
+            if not is_speech:
+                self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(energy)
+            self.counters["frames"] += 1
+            self.counters["speech_frames"] += int(is_speech)
+            segment = self._step(frame, is_speech)
+            if segment is not None:
+                segments.append(segment)
+            self.frames_seen += 1
+        return segments
+
+    def next_segment(self, timeout=None):
+        """Next speech segment, or None if the stream ends or `timeout`
+        seconds of audio pass without speech starting"""
+        if self.blocks_iter is None:
+            self.blocks_iter = self.source.blocks()
+        deadline = self.frames_seen + timeout * self.sample_rate / self.frame_size if timeout else None
+        while not self.pending:
+            if deadline is not None and self.segment is None and self.frames_seen >= deadline:
+                return None
+            block = next(self.blocks_iter, None)
+            if block is None:
+                return None
+            self.pending = self.feed(block)
+        return self.pending.pop(0)
+
+    def reset(self):
+        """Forget buffered audio, e.g. after Jarvis has spoken and the microphone heard it"""
+        self.source.flush()
+        self.preroll.drain()
+        self.segment = None
+        self.pending = []
+        self.remainder = self.remainder[:0]
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["noise_floor"] = round(self.noise_floor or 0.0, 1)
+        return stats
+
+    def _step(self, frame, is_speech):
+        if self.segment is None:
+            if not is_speech:
+                self.preroll.append(frame)
+                return None
+            self.segment = self.preroll.drain()
+            self.segment_start = self.frames_seen - len(self.segment)
+            self.speech_frames = 0
+            self.silent_run = 0
+
+        self.segment.append(frame)
+        if is_speech:
+            self.speech_frames += 1
+            self.silent_run = 0
+        else:
+            self.silent_run += 1
+        if self.silent_run < self.hangover and len(self.segment) < self.max_frames:
+            return None
+
+        frames, speech_frames = self.segment, self.speech_frames
+        self.segment = None
+        if speech_frames < self.min_speech:
+            self.counters["discarded"] += 1  # clicks and bumps
+            return None
+        self.counters["segments"] += 1
+        frame_seconds = self.frame_size / self.sample_rate
+        return Segment(np.concatenate(frames), self.sample_rate,
+                       self.segment_start * frame_seconds, (self.frames_seen + 1) * frame_seconds)
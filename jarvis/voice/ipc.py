@@ -0,0 +1,212 @@
+import logging
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from config.settings import settings
+from voice.speaker import PRIORITY_CHAT, PRIORITY_RESPONSE, SpeechStream
+
+logger = logging.getLogger(__name__)
+
+IPC_TIMEOUT = 2  # Seconds to wait for the audio owner to answer a request
+
+
+def _authkey():
+    if not settings.AUDIO_IPC_KEY:
+        raise RuntimeError("JARVIS_AUDIO_IPC_KEY must be set to connect to the audio owner process")
+    return settings.AUDIO_IPC_KEY.encode()
+
+
+class SpeechServer:
+    """Serves the audio owner's speaker to API worker processes over a local socket.
+
+    Requests are (op, args) tuples answered with (ok, result); each worker
+    connection is served on its own thread. Connections must present the
+    shared AUDIO_IPC_KEY before anything is read from them.
+    """
+
+    def __init__(self, registry, address=None):
+        self.registry = registry
+        self.address = address or settings.AUDIO_IPC_ADDRESS
+        self.listener = None
+        self.running = False
+        self.handlers = {
+            "speak": lambda speaker, args: speaker.speak_async(*args),
+            "speak_wait": lambda speaker, args: speaker.speak(*args),
+            "cancel": lambda speaker, args: speaker.cancel(),
+            "stats": lambda speaker, args: {**speaker.stats(), "components": self.registry.status()},
+        }
+
+    def serve_forever(self):
+        """Accept worker connections until close() is called"""
+        if os.name != "nt" and os.path.exists(self.address):
+            os.unlink(self.address)  # socket file left behind by a previous run
+        self.listener = Listener(self.address, authkey=_authkey())
+        self.running = True
+        logger.info(f"🔌 Serving speech to API workers on {self.address}")
+        while self.running:
+            try:
+                connection = self.listener.accept()
+            except AuthenticationError as e:
+                logger.error(f"❌ Rejected speech client: {e}")
+                continue
+            except OSError:
+                if not self.running:
+                    break
+                raise
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def close(self):
+        self.running = False
+        if self.listener:
+            self.listener.close()
+
+    def _serve(self, connection):
+        with connection:
+            while True:
+                try:
+                    op, args = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    connection.send((True, self._handle(op, args)))
+                except (EOFError, OSError):
+                    return
+                except Exception as e:
+                    connection.send((False, str(e)))
+
+    def _handle(self, op, args):
+        if op == "status":
+            return self.registry.status()
+        speaker = self.registry.get("speaker")
+        if speaker is None:
+            raise RuntimeError("speaker is not ready")
+        if op not in self.handlers:
+            raise ValueError(f"unknown request {op!r}")
+        return self.handlers[op](speaker, args)
+
+
+class RemoteSpeaker:
+    """VoiceSpeaker stand-in for API workers that forwards speech to the audio owner process.
+
+    Queued speech is fire-and-forget like VoiceSpeaker.speak_async: the
+    text goes into a local outbox that a sender thread forwards in order,
+    so a slow audio owner never holds up the caller (often the event loop).
+    If the audio owner is down the text is logged and dropped rather than
+    failing the request that produced it.
+    """
+
+    def __init__(self, address=None):
+        self.address = address or settings.AUDIO_IPC_ADDRESS
+        self.authkey = _authkey()
+        self.lock = threading.Lock()
+        self.connection = None
+        self.counters = {"forwarded": 0, "unavailable": 0, "dropped_full": 0}
+        self.outbox = queue.Queue(maxsize=settings.TTS_QUEUE_SIZE)
+        self.sender = threading.Thread(target=self._send_queued, daemon=True)
+        self.sender.start()
+
+    def wait_until_available(self, timeout=30):
+        """Block until the audio owner answers, raising ConnectionError after timeout seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._call("status")
+            except ConnectionError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+
+    def speak(self, text, priority=PRIORITY_RESPONSE, key=None):
+        """Wait until the audio owner has spoken text, on a connection of its own"""
+        with Client(self.address, authkey=self.authkey) as connection:
+            connection.send(("speak_wait", (text, priority, key)))
+            connection.recv()
+
+    def speak_async(self, text, priority=PRIORITY_CHAT, key=None):
+        """Queue text for the audio owner and return immediately, without any IPC"""
+        if not text:
+            return
+        try:
+            self.outbox.put_nowait((text, priority, key))
+        except queue.Full:
+            self.counters["dropped_full"] += 1
+            logger.warning(f"⚠️ Speech outbox full, not spoken: {text}")
+
+    def stream(self, priority=PRIORITY_CHAT):
+        """A SpeechStream that forwards each complete sentence as it arrives"""
+        return SpeechStream(self, priority)
+
+    def cancel(self):
+        """Drop speech not yet forwarded, then cancel the audio owner's queue (blocking; may raise ConnectionError)"""
+        self._drain_outbox()
+        self._call("cancel")
+
+    def stats(self):
+        """The audio owner's speech stats plus this worker's forwarding counters"""
+        try:
+            stats = self._call("stats")
+        except (ConnectionError, RuntimeError) as e:
+            stats = {"error": str(e)}
+        stats["remote"] = {**self.counters, "outbox": self.outbox.qsize()}
+        return stats
+
+    def stop(self):
+        self._drain_outbox()
+        self.outbox.put(None)
+        self.sender.join(timeout=IPC_TIMEOUT)
+        with self.lock:
+            self._disconnect()
+
+    def _send_queued(self):
+        """Forward outbox entries to the audio owner, one at a time and in order"""
+        while True:
+            item = self.outbox.get()
+            if item is None:
+                return
+            text, priority, key = item
+            try:
+                self._call("speak", text, priority, key)
+                self.counters["forwarded"] += 1
+            except (ConnectionError, RuntimeError) as e:
+                self.counters["unavailable"] += 1
+                logger.error(f"❌ Not spoken ({e}): {text}")
+
+    def _drain_outbox(self):
+        while True:
+            try:
+                self.outbox.get_nowait()
+            except queue.Empty:
+                return
+
+    def _call(self, op, *args):
+        with self.lock:
+            for attempt in range(2):  # reconnect once, in case the audio owner restarted
+                try:
+                    if self.connection is None:
+                        self.connection = Client(self.address, authkey=self.authkey)
+                    self.connection.send((op, args))
+                    if not self.connection.poll(IPC_TIMEOUT):
+                        raise TimeoutError(f"no answer within {IPC_TIMEOUT}s")
+                    ok, result = self.connection.recv()
+                    break
+                except TimeoutError as e:
+                    # The request may still be carried out, so it is not sent again
+                    self._disconnect()
+                    raise ConnectionError(f"audio process not responding: {e}") from e
+                except (OSError, EOFError, AuthenticationError) as e:
+                    self._disconnect()
+                    if attempt:
+                        raise ConnectionError(f"audio process unavailable: {e}") from e
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    def _disconnect(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except OSError:
+                pass
+            self.connection = None
@@ -1,89 +1,142 @@
+import logging
 import speech_recognition as sr
-import threading
 import time
 from config.settings import settings
+from monitoring.metrics import STT_LATENCY
+from monitoring.tracing import span, start_trace
+from voice.audio_frontend import AudioFrontEnd, MicrophoneSource
+from voice.wake_word import create_wake_word_detector
+
+logger = logging.getLogger(__name__)
+
+# Fixed prompts, prewarmed into the speech audio cache at startup
+WAKE_REPLY = "Yes, how can I help you?"
+NOTHING_HEARD = "I didn't hear anything. Please try again."
+NOT_UNDERSTOOD = "Sorry, I didn't understand that. Could you repeat?"
+COMMAND_ERROR = "Sorry, there was an error processing your command."
+PHRASES = [WAKE_REPLY, NOTHING_HEARD, NOT_UNDERSTOOD, COMMAND_ERROR]
 
 class VoiceListener:
-    def __init__(self, speaker, ai_handler):
+    """Streams audio through the local front end and only transcribes speech
+    segments that the wake word detector accepts, plus the command after them.
+
+    `source` defaults to the microphone; a WavSource runs the same pipeline on
+    a recording. `transcribe(segment)` returns text or None and defaults to
+    Google speech recognition.
+    """
+
+    def __init__(self, speaker, ai_handler, source=None, detector=None, transcribe=None):
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.source = source or MicrophoneSource()
+        self.frontend = AudioFrontEnd(self.source)
+        self.detector = detector or create_wake_word_detector()
+        self.transcribe = transcribe or self.recognize_google
         self.speaker = speaker
         self.ai_handler = ai_handler
         self.listening = False
-        
-        # Adjust for ambient noise
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source)
-    
+        self.counters = {"wake_checks": 0, "wake_words": 0, "transcriptions": 0, "commands": 0}
+
     def start_listening(self):
         """Start continuous listening for wake word and commands"""
         self.listening = True
-        print(f"🎤 Listening for wake word: '{settings.WAKE_WORD}'")
-        
+        logger.info(f"🎤 Listening for wake word: '{settings.WAKE_WORD}'")
+
         while self.listening:
             try:
-                # Listen for wake word
-                if self.listen_for_wake_word():
-                    # Wake word detected, listen for command
-                    command = self.listen_for_command()
+                segment = self.frontend.next_segment()
+                if segment is None:
+                    break  # audio source ended
+
+                # Check the segment for the wake word; the command may follow it in the same breath
+                with start_trace("voice_command"):
+                    heard, command = self.listen_for_wake_word(segment)
+                    if heard and not command:
+                        command = self.listen_for_command()
                     if command:
                         # Process command with AI
+                        self.counters["commands"] += 1
                         response = self.ai_handler.process_command(command)
-                        self.speaker.speak(response)
-                        
+                        self.say(response)
+
             except Exception as e:
-                print(f"❌ Listening error: {e}")
+                logger.error(f"❌ Listening error: {e}")
                 time.sleep(1)
-    
-    def listen_for_wake_word(self):
-        """Listen for the wake word"""
+        self.listening = False
+
+    def listen_for_wake_word(self, segment):
+        """(wake word heard, command spoken after it or None) for a speech segment"""
         try:
-            with self.microphone as source:
-                # Listen with timeout
-                audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=3)
-            
-            # Recognize speech
-            text = self.recognizer.recognize_google(audio).lower()
-            
-            if settings.WAKE_WORD.lower() in text:
-                print(f"🔊 Wake word detected: {text}")
-                self.speaker.speak("Yes, how can I help you?")
-                return True
-                
-        except sr.WaitTimeoutError:
-            pass
-        except sr.UnknownValueError:
-            pass
+            self.counters["wake_checks"] += 1
+            if not self.detector.detect(segment):
+                return False, None
+
+            text = self._transcribe(segment)
+            wake_word = settings.WAKE_WORD.lower()
+            if text and wake_word in text.lower():
+                logger.info(f"🔊 Wake word detected: {text}")
+                self.counters["wake_words"] += 1
+                command = text[text.lower().index(wake_word) + len(wake_word):].strip(" ,.!?")
+                if command:
+                    return True, command
+                self.say(WAKE_REPLY)
+                return True, None
+
         except Exception as e:
-            print(f"❌ Wake word detection error: {e}")
-        
-        return False
-    
+            logger.error(f"❌ Wake word detection error: {e}")
+
+        return False, None
+
     def listen_for_command(self):
         """Listen for user command after wake word"""
         try:
-            print("🎤 Listening for command...")
-            
-            with self.microphone as source:
-                # Listen for command with longer timeout
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
-            
+            logger.info("🎤 Listening for command...")
+
+            segment = self.frontend.next_segment(timeout=settings.COMMAND_TIMEOUT)
+            if segment is None:
+                self.say(NOTHING_HEARD)
+                return None
+
             # Recognize command
-            command = self.recognizer.recognize_google(audio)
-            print(f"🗣️ Command received: {command}")
+            command = self._transcribe(segment)
+            if not command:
+                self.say(NOT_UNDERSTOOD)
+                return None
+            logger.info(f"🗣️ Command received: {command}")
             return command
-            
-        except sr.WaitTimeoutError:
-            self.speaker.speak("I didn't hear anything. Please try again.")
-        except sr.UnknownValueError:
-            self.speaker.speak("Sorry, I didn't understand that. Could you repeat?")
+
         except Exception as e:
-            print(f"❌ Command recognition error: {e}")
-            self.speaker.speak("Sorry, there was an error processing your command.")
-        
+            logger.error(f"❌ Command recognition error: {e}")
+            self.say(COMMAND_ERROR)
+
         return None
-    
+
+    def recognize_google(self, segment):
+        """Transcribe a speech segment with Google speech recognition"""
+        audio = sr.AudioData(segment.samples.tobytes(), segment.sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            return None
+
+    def say(self, text):
+        """Speak, then drop whatever the microphone picked up meanwhile"""
+        with span("speak"):
+            self.speaker.speak(text)
+        self.frontend.reset()
+
+    def stats(self):
+        """Front end and recognition counters"""
+        stats = dict(self.counters)
+        stats["frontend"] = self.frontend.stats()
+        return stats
+
     def stop_listening(self):
         """Stop the voice listener"""
         self.listening = False
-        print("🔇 Voice listening stopped")
\ No newline at end of file
+        self.source.close()
+        logger.info("🔇 Voice listening stopped")
+
+    def _transcribe(self, segment):
+        self.counters["transcriptions"] += 1
+        with span("stt"), STT_LATENCY.time():
+            return self.transcribe(segment)
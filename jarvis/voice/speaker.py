@@ -1,55 +1,299 @@
-import pyttsx3
+import logging
+import heapq
+import itertools
+import re
 import threading
+import time
+from collections import Counter
 from config.settings import settings
+from monitoring.metrics import TTS_LATENCY
+from voice.audio_cache import AudioCache
+from voice.tts_backends import create_backend
+
+logger = logging.getLogger(__name__)
+
+# Lower numbers are spoken first
+PRIORITY_REMINDER = 0
+PRIORITY_RESPONSE = 1
+PRIORITY_CHAT = 2
+PRIORITIES = {"reminder": PRIORITY_REMINDER, "response": PRIORITY_RESPONSE, "chat": PRIORITY_CHAT}
+
+# Where streamed text is cut into utterances: after a sentence, or between search results
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\s+\|\s+')
+
+
+class Utterance:
+    def __init__(self, text, priority, key=None):
+        self.text = text
+        self.priority = priority
+        self.key = key
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.cancelled = False
+
 
 class VoiceSpeaker:
-    def __init__(self):
-        self.engine = pyttsx3.init()
-        self.setup_voice()
-        self.speaking_lock = threading.Lock()
-    
-    def setup_voice(self):
-        """Configure voice settings"""
-        # Set speech rate
-        self.engine.setProperty('rate', settings.VOICE_RATE)
-        
-        # Set volume
-        self.engine.setProperty('volume', settings.VOICE_VOLUME)
-        
-        # Get available voices
-        voices = self.engine.getProperty('voices')
-        if voices:
-            # Try to use a female voice if available
-            for voice in voices:
-                if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                    self.engine.setProperty('voice', voice.id)
-                    break
-            else:
-                # Use first available voice
-                self.engine.setProperty('voice', voices[0].id)
-    
-    def speak(self, text):
-        """Convert text to speech"""
+    """Single speech worker fed by a bounded priority queue.
+
+    Reminders jump ahead of responses and chit-chat, and interrupt chit-chat
+    that is already playing. A queued utterance with the same key as a new
+    one is replaced rather than spoken twice, and anything that waited longer
+    than TTS_MAX_QUEUE_AGE seconds is dropped instead of played late.
+
+    Phrases passed to prewarm(), and any text spoken TTS_CACHE_AFTER_REPEATS
+    times, are rendered to the on-disk audio cache while the queue is idle and
+    replayed from there afterwards, skipping synthesis.
+    """
+
+    def __init__(self, backend=None, audio_cache=None):
+        self.backend = backend
+        self.audio_cache = audio_cache
+        if self.audio_cache is None and settings.TTS_CACHE_ENABLED:
+            self.audio_cache = AudioCache()
+        self.voice = None
+        self.pending_renders = []  # texts to render when idle
+        self.repeats = Counter()
+        self.max_queue = settings.TTS_QUEUE_SIZE
+        self.max_age = settings.TTS_MAX_QUEUE_AGE
+
+        self.queue = []  # heap of (priority, seq, Utterance)
+        self.seq = itertools.count()
+        self.condition = threading.Condition()
+        self.current = None
+        self.running = True
+        self.counters = {"spoken": 0, "superseded": 0, "dropped_full": 0, "dropped_stale": 0,
+                         "preempted": 0, "cancelled": 0, "errors": 0}
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+        # The pyttsx3 engine is created and driven only on this thread
+        self.ready = threading.Event()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+        self.ready.wait()
+
+    def speak(self, text, priority=PRIORITY_RESPONSE, key=None):
+        """Queue text and wait until it has been spoken (or dropped)"""
+        utterance = self._enqueue(text, priority, key)
+        if utterance:
+            utterance.done.wait()
+
+    def speak_async(self, text, priority=PRIORITY_CHAT, key=None):
+        """Queue text and return immediately"""
+        self._enqueue(text, priority, key)
+
+    def stream(self, priority=PRIORITY_CHAT):
+        """A SpeechStream that speaks text arriving in pieces one sentence at a time"""
+        return SpeechStream(self, priority)
+
+    def prewarm(self, phrases):
+        """Render fixed phrases into the audio cache in the background"""
+        with self.condition:
+            for phrase in phrases:
+                self._schedule_render(phrase)
+            self.condition.notify()
+
+    def cancel(self):
+        """Drop everything queued and stop the utterance in progress"""
+        with self.condition:
+            for _, _, utterance in self.queue:
+                utterance.cancelled = True
+                utterance.done.set()
+            self.counters["cancelled"] += len(self.queue)
+            self.queue.clear()
+            if self.current:
+                self.current.cancelled = True
+                self._stop_backend()
+
+    def stats(self):
+        """Queue depth, drop counters and queue latency"""
+        with self.condition:
+            stats = dict(self.counters)
+            stats["queue_depth"] = len(self.queue)
+            stats["speaking"] = self.current.text if self.current else None
+            stats["avg_queue_wait"] = round(self.total_wait / stats["spoken"], 4) if stats["spoken"] else 0.0
+            stats["max_queue_wait"] = round(self.max_wait, 4)
+            stats["pending_renders"] = len(self.pending_renders)
+        if self.audio_cache:
+            stats["audio_cache"] = self.audio_cache.stats()
+        return stats
+
+    def stop(self):
+        """Stop the speech worker"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.cancel()
+        self.worker.join(timeout=1)
+
+    def _enqueue(self, text, priority, key):
         if not text:
+            return None
+
+        utterance = Utterance(text, priority, key)
+        with self.condition:
+            if not self.running:
+                logger.info("🗣️ Jarvis (not spoken): %s", text)
+                return None
+            if key is not None:
+                for i, (_, _, queued) in enumerate(self.queue):
+                    if queued.key == key:
+                        queued.cancelled = True
+                        queued.done.set()
+                        self.queue.pop(i)
+                        heapq.heapify(self.queue)
+                        self.counters["superseded"] += 1
+                        break
+
+            if len(self.queue) >= self.max_queue:
+                # Full: evict the oldest of the least important entries, unless
+                # the new one is less important than all of them
+                lowest = max(entry[0] for entry in self.queue)
+                if priority > lowest:
+                    self.counters["dropped_full"] += 1
+                    return None
+                victim = min(entry for entry in self.queue if entry[0] == lowest)
+                self.queue.remove(victim)
+                heapq.heapify(self.queue)
+                victim[2].cancelled = True
+                victim[2].done.set()
+                self.counters["dropped_full"] += 1
+
+            heapq.heappush(self.queue, (priority, next(self.seq), utterance))
+
+            if self.current and priority == PRIORITY_REMINDER and self.current.priority == PRIORITY_CHAT:
+                self.counters["preempted"] += 1
+                self._stop_backend()
+
+            self.condition.notify()
+        return utterance
+
+    def _schedule_render(self, text):
+        """Queue text for rendering unless it is already cached; caller holds the lock"""
+        if self.voice is None or not text or text in self.pending_renders:
             return
-            
-        with self.speaking_lock:
-            try:
-                print(f"🗣️ Jarvis: {text}")
-                self.engine.say(text)
-                self.engine.runAndWait()
-            except Exception as e:
-                print(f"❌ Speech error: {e}")
-    
-    def speak_async(self, text):
-        """Speak text asynchronously"""
-        thread = threading.Thread(target=self.speak, args=(text,))
-        thread.daemon = True
-        thread.start()
-    
-    def stop(self):
-        """Stop the speech engine"""
+        if not self.audio_cache.contains(text, self.voice):
+            self.pending_renders.append(text)
+
+    def _render_pending(self, text):
+        try:
+            if not self.audio_cache.contains(text, self.voice):
+                self.audio_cache.render(text, self.voice, self.backend.render_to_file)
+        except ValueError as e:
+            # The backend can't render WAV here; every later render would fail the same way
+            logger.warning(f"⚠️ Audio cache disabled: {e}")
+            with self.condition:
+                self.voice = None
+                self.pending_renders.clear()
+        except Exception as e:
+            logger.error(f"❌ Audio cache render error: {e}")
+
+    def _say(self, text):
+        """Replay cached audio when there is some, otherwise synthesize"""
+        if self.voice is not None:
+            path = self.audio_cache.get(text, self.voice)
+            if path:
+                try:
+                    with TTS_LATENCY.labels("cache").time():
+                        self.backend.play_file(path, text)
+                    return
+                except Exception as e:
+                    logger.warning(f"⚠️ Cached audio failed to play, synthesizing instead: {e}")
+                    self.audio_cache.discard(text, self.voice)
+
+        with TTS_LATENCY.labels("synth").time():
+            self.backend.say(text)
+        if self.voice is not None:
+            with self.condition:
+                if len(self.repeats) > 1000:
+                    self.repeats.clear()
+                self.repeats[text] += 1
+                if self.repeats[text] >= settings.TTS_CACHE_AFTER_REPEATS:
+                    self._schedule_render(text)
+
+    def _stop_backend(self):
+        try:
+            self.backend.stop()
+        except Exception as e:
+            logger.error(f"❌ Error stopping speech engine: {e}")
+
+    def _run(self):
         try:
-            self.engine.stop()
+            if self.backend is None:
+                self.backend = create_backend()
+            if self.audio_cache and hasattr(self.backend, "render_to_file"):
+                self.voice = self.backend.voice()
         except Exception as e:
-            print(f"❌ Error stopping speech engine: {e}")
\ No newline at end of file
+            logger.error(f"❌ Speech engine unavailable: {e}")
+            self.running = False
+        finally:
+            self.ready.set()
+
+        while True:
+            with self.condition:
+                while self.running and not self.queue and not self.pending_renders:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                if not self.queue:
+                    # Idle: render one cacheable phrase, then check the queue again
+                    text = self.pending_renders.pop(0)
+                else:
+                    text = None
+                    _, _, utterance = heapq.heappop(self.queue)
+
+            if text is not None:
+                self._render_pending(text)
+                continue
+
+            with self.condition:
+                waited = time.monotonic() - utterance.enqueued_at
+                if waited > self.max_age:
+                    self.counters["dropped_stale"] += 1
+                    utterance.done.set()
+                    continue
+                self.current = utterance
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+            try:
+                logger.info("🗣️ Jarvis: %s", utterance.text)
+                self._say(utterance.text)
+            except Exception as e:
+                self.counters["errors"] += 1
+                logger.error(f"❌ Speech error: {e}")
+            finally:
+                with self.condition:
+                    self.current = None
+                    if not utterance.cancelled:
+                        self.counters["spoken"] += 1
+                utterance.done.set()
+
+
+class SpeechStream:
+    """Queues each complete sentence of a reply as soon as it has arrived, so
+    the first one plays while later ones are still being produced"""
+
+    def __init__(self, speaker, priority):
+        self.speaker = speaker
+        self.priority = priority
+        self.buffer = ""
+        self.sentences = 0
+
+    def feed(self, text):
+        """Add the next piece of the reply"""
+        self.buffer += text
+        *sentences, self.buffer = SENTENCE_BREAK.split(self.buffer)
+        for sentence in sentences:
+            self._speak(sentence)
+
+    def close(self):
+        """Speak whatever is left of the reply"""
+        text, self.buffer = self.buffer, ""
+        self._speak(text)
+
+    def _speak(self, sentence):
+        sentence = sentence.strip()
+        if sentence:
+            self.sentences += 1
+            self.speaker.speak_async(sentence, self.priority)
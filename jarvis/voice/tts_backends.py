@@ -0,0 +1,159 @@
+import threading
+import time
+import wave
+from datetime import datetime
+from config.settings import settings
+
+SILENCE_SAMPLE_RATE = 16000
+
+
+def read_wav(path):
+    """(int16 samples shaped frames x channels, sample rate) of a WAV file"""
+    import numpy as np
+
+    with wave.open(path, "rb") as wav:
+        frames = wav.readframes(wav.getnframes())
+        samples = np.frombuffer(frames, dtype=np.int16).reshape(-1, wav.getnchannels())
+        return samples, wav.getframerate()
+
+
+class Pyttsx3Backend:
+    """Speaks through the system voice via pyttsx3"""
+
+    def __init__(self):
+        import pyttsx3
+
+        self.engine = pyttsx3.init()
+        self.setup_voice()
+        self.playing = False
+
+    def setup_voice(self):
+        """Configure voice settings"""
+        # Set speech rate
+        self.engine.setProperty('rate', settings.VOICE_RATE)
+
+        # Set volume
+        self.engine.setProperty('volume', settings.VOICE_VOLUME)
+
+        # Get available voices
+        voices = self.engine.getProperty('voices')
+        if voices:
+            # Try to use a female voice if available
+            for voice in voices:
+                if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
+                    self.engine.setProperty('voice', voice.id)
+                    break
+            else:
+                # Use first available voice
+                self.engine.setProperty('voice', voices[0].id)
+
+    def say(self, text):
+        """Speak text, returning when done or stopped"""
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def voice(self):
+        """(voice id, rate, volume) identifying how text would sound"""
+        return (self.engine.getProperty('voice'), settings.VOICE_RATE, settings.VOICE_VOLUME)
+
+    def render_to_file(self, text, path):
+        """Synthesize text into a WAV file instead of the speakers"""
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+
+    def play_file(self, path, text):
+        """Play previously rendered audio"""
+        import sounddevice as sd
+
+        samples, rate = read_wav(path)
+        self.playing = True
+        try:
+            sd.play(samples, rate)
+            sd.wait()
+        finally:
+            self.playing = False
+
+    def stop(self):
+        """Cut off the utterance in progress"""
+        if self.playing:
+            import sounddevice as sd
+            sd.stop()
+        self.engine.stop()
+
+
+class NullBackend:
+    """Silent backend for headless runs.
+
+    It can pretend that synthesis takes `synth_seconds` before audio starts
+    and that speaking takes `seconds_per_char` per character. Rendered files
+    are real silent WAVs of that length.
+    """
+
+    def __init__(self, seconds_per_char=0.0, synth_seconds=0.0):
+        self.seconds_per_char = seconds_per_char
+        self.synth_seconds = synth_seconds
+        self.spoken = []
+        self.interrupt = threading.Event()
+
+    def voice(self):
+        return ("null", settings.VOICE_RATE, settings.VOICE_VOLUME)
+
+    def say(self, text):
+        self.interrupt.clear()
+        if not self.interrupt.wait(self.synth_seconds):
+            self.interrupt.wait(len(text) * self.seconds_per_char)
+        self.spoken.append(text)
+
+    def render_to_file(self, text, path):
+        time.sleep(self.synth_seconds)
+        frames = max(int(len(text) * self.seconds_per_char * SILENCE_SAMPLE_RATE), 1)
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SILENCE_SAMPLE_RATE)
+            wav.writeframes(b"\x00\x00" * frames)
+
+    def play_file(self, path, text):
+        with wave.open(path, "rb") as wav:
+            duration = wav.getnframes() / wav.getframerate()
+        self.interrupt.clear()
+        self.interrupt.wait(duration)
+        self.spoken.append(text)
+
+    def stop(self):
+        self.interrupt.set()
+
+
+class FileBackend(NullBackend):
+    """Appends each utterance with a timestamp to a transcript file"""
+
+    def __init__(self, path=None, seconds_per_char=0.0):
+        super().__init__(seconds_per_char)
+        self.path = path or settings.TTS_TRANSCRIPT_PATH
+        self.lock = threading.Lock()
+
+    def say(self, text):
+        super().say(text)
+        self._write(text)
+
+    def play_file(self, path, text):
+        super().play_file(path, text)
+        self._write(text)
+
+    def _write(self, text):
+        with self.lock, open(self.path, "a", encoding="utf-8") as transcript:
+            transcript.write(f"{datetime.now().isoformat()}\t{text}\n")
+
+
+def create_backend(name=None):
+    """Build the speech backend named in settings (pyttsx3, null or file)"""
+    name = name or settings.TTS_BACKEND
+    if name == "pyttsx3" and settings.HEADLESS:
+        name = "null"
+    if name == "pyttsx3":
+        return Pyttsx3Backend()
+    if name == "null":
+        return NullBackend()
+    if name == "file":
+        return FileBackend()
+    raise ValueError(f"Unknown TTS backend: {name}")
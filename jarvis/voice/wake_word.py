@@ -0,0 +1,114 @@
+import logging
+import os
+import numpy as np
+from config.settings import settings
+from voice.tts_backends import read_wav
+
+logger = logging.getLogger(__name__)
+
+MEL_BANDS = 24
+WINDOW_MS = 25
+HOP_MS = 10
+
+
+def log_mel_features(samples, sample_rate):
+    """Log mel energies, one row per 10 ms hop, each row centred and scaled to unit length.
+
+    Normalising every frame makes the match insensitive to loudness, so the
+    distance between two frames is their cosine distance (up to a factor).
+    """
+    window = sample_rate * WINDOW_MS // 1000
+    hop = sample_rate * HOP_MS // 1000
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < window:
+        samples = np.pad(samples, (0, window - len(samples)))
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, window)[::hop]
+    spectrum = np.abs(np.fft.rfft(frames * np.hamming(window), axis=1)) ** 2
+    energies = np.log(spectrum @ mel_filterbank(sample_rate, window).T + 1e-6)
+    energies -= energies.mean(axis=1, keepdims=True)
+    return energies / (np.linalg.norm(energies, axis=1, keepdims=True) + 1e-6)
+
+
+def mel_filterbank(sample_rate, window, bands=MEL_BANDS):
+    """Triangular filters spaced evenly on the mel scale, shaped (bands, window // 2 + 1)"""
+    mel = np.linspace(0, 2595 * np.log10(1 + sample_rate / 2 / 700), bands + 2)
+    edges = np.floor((window + 1) * 700 * (10 ** (mel / 2595) - 1) / sample_rate).astype(int)
+    filters = np.zeros((bands, window // 2 + 1), dtype=np.float32)
+    for band in range(bands):
+        left, center, right = edges[band], edges[band + 1], edges[band + 2]
+        filters[band, left:center] = (np.arange(left, center) - left) / max(center - left, 1)
+        filters[band, center:right] = (right - np.arange(center, right)) / max(right - center, 1)
+    return filters
+
+
+def match_cost(template, features):
+    """Lowest per-frame DTW cost of template matching any stretch of features.
+
+    The warping path may start and end anywhere in `features` and advances
+    one template frame per step while moving 0, 1 or 2 feature frames, so
+    each template row is computed in a single vectorized operation.
+    """
+    distances = np.sqrt(((template[:, None, :] - features[None, :, :]) ** 2).sum(axis=2))
+    cost = distances[0].copy()
+    for row in distances[1:]:
+        previous = cost.copy()
+        previous[1:] = np.minimum(previous[1:], cost[:-1])
+        previous[2:] = np.minimum(previous[2:], cost[:-2])
+        cost = row + previous
+    return float(cost.min() / len(template))
+
+
+class TemplateWakeWordDetector:
+    """Spots the wake word locally by matching recorded examples of it.
+
+    Each template is a short WAV of someone saying the wake word. A segment
+    matches when the DTW cost of its log mel features against any template is
+    below `threshold`. Only the first WAKE_WORD_SEARCH_S of a segment is
+    searched, since the wake word starts the utterance.
+    """
+
+    def __init__(self, templates_dir=None, threshold=None, search_seconds=None):
+        self.threshold = threshold or settings.WAKE_WORD_THRESHOLD
+        self.search_seconds = search_seconds or settings.WAKE_WORD_SEARCH_S
+        self.templates = []
+        self.last_cost = None
+
+        templates_dir = templates_dir or settings.WAKE_WORD_TEMPLATES_DIR
+        if os.path.isdir(templates_dir):
+            for name in sorted(os.listdir(templates_dir)):
+                if name.endswith(".wav"):
+                    samples, rate = read_wav(os.path.join(templates_dir, name))
+                    self.enroll(samples.mean(axis=1), rate)
+
+    def enroll(self, samples, sample_rate):
+        """Add a recording of the wake word as a template"""
+        self.templates.append(log_mel_features(samples, sample_rate))
+
+    def detect(self, segment):
+        if not self.templates:
+            return False
+        features = log_mel_features(segment.samples[:int(self.search_seconds * segment.sample_rate)],
+                                    segment.sample_rate)
+        self.last_cost = min(match_cost(template, features) for template in self.templates)
+        return self.last_cost < self.threshold
+
+
+class SpeechSegmentDetector:
+    """Treats every speech segment as a wake word candidate.
+
+    Used when no templates are enrolled: recognition still only runs on
+    speech, never on silence.
+    """
+
+    def detect(self, segment):
+        return True
+
+
+def create_wake_word_detector():
+    """Template detector when templates are enrolled, otherwise every segment is a candidate"""
+    detector = TemplateWakeWordDetector()
+    if detector.templates:
+        return detector
+    logger.info(f"🎤 No wake word templates in {settings.WAKE_WORD_TEMPLATES_DIR}; transcribing each speech segment")
+    return SpeechSegmentDetector()
@@ -1,35 +1,63 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional
 import asyncio
+import json
+import math
+from contextlib import aclosing
+from config.settings import settings
+from monitoring.tracing import slow_traces, start_trace
+from voice.speaker import PRIORITIES
+from web.rate_limit import client_address
 
 router = APIRouter()
 
 # Request/Response models
 class CommandRequest(BaseModel):
     command: str
+    session_id: Optional[str] = None
 
 class CommandResponse(BaseModel):
     response: str
     success: bool
 
+class BatchCommandRequest(BaseModel):
+    commands: List[str]
+    concurrency: Optional[int] = None
+
+class BatchCommandResponse(BaseModel):
+    results: List[CommandResponse]
+
 class StatusResponse(BaseModel):
     status: str
+    ready: bool
     components: dict
+    http_pools: Optional[dict] = None
+    caches: Optional[dict] = None
+    news_feeds: Optional[dict] = None
+    local_model: Optional[dict] = None
+    speech: Optional[dict] = None
+    upstreams: Optional[dict] = None
+    rate_limit: Optional[dict] = None
 
-# Global references (will be set from main.py)
+# Global references (will be set from main.py as components become ready)
 voice_speaker = None
 ai_handler = None
+registry = None
+rate_limiter = None
 
 @router.post("/command", response_model=CommandResponse)
-async def process_command(request: CommandRequest):
+async def process_command(request: CommandRequest, http_response: Response):
     """Process a text command through the AI handler"""
     try:
         if not ai_handler:
             raise HTTPException(status_code=503, detail="AI handler not initialized")
         
-        # Process command
-        response = ai_handler.process_command(request.command)
+        # Process command, timing each step for the Server-Timing header
+        with start_trace("command") as trace:
+            response = await ai_handler.process_command_async(request.command, request.session_id)
+        http_response.headers["Server-Timing"] = trace.server_timing()
         
         # Speak response if voice is available
         if voice_speaker:
@@ -40,6 +68,96 @@ async def process_command(request: CommandRequest):
     except Exception as e:
         return CommandResponse(response=f"Error processing command: {str(e)}", success=False)
 
+@router.post("/command/stream")
+async def stream_command(request: CommandRequest):
+    """Process a text command, sending the response as Server-Sent Events while it is produced.
+    
+    Each piece arrives as a `chunk` event ({"text": ...}); a final `done`
+    event carries the full response and success flag.
+    """
+    if not ai_handler:
+        raise HTTPException(status_code=503, detail="AI handler not initialized")
+    
+    async def events():
+        async for message in _stream_reply(request.command, request.session_id):
+            yield f"event: {message.pop('type')}\ndata: {json.dumps(message)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.websocket("/command/ws")
+async def command_socket(websocket: WebSocket):
+    """Process text commands sent as {"command": ..., "session_id": ...} over one WebSocket.
+    
+    Each command is answered with `chunk` messages as the response is
+    produced, then a `done` message with the full response. Every message
+    costs a rate limit token; once the client has none left the socket is
+    closed with 1013 (try again later).
+    """
+    await websocket.accept()
+    client = client_address(websocket.scope)
+    try:
+        while True:
+            text = await websocket.receive_text()
+            if rate_limiter and rate_limiter.enabled:
+                wait = await rate_limiter.acquire_async(client)
+                if wait:
+                    await websocket.close(code=1013, reason=f"rate limit exceeded, retry in {math.ceil(wait)}s")
+                    return
+            try:
+                request = CommandRequest(**json.loads(text))
+            except (ValidationError, TypeError, ValueError) as e:
+                await websocket.send_json({"type": "done", "response": f"Invalid command: {e}", "success": False})
+                continue
+            if not ai_handler:
+                await websocket.send_json({"type": "done", "response": "AI handler not initialized", "success": False})
+                continue
+            async for message in _stream_reply(request.command, request.session_id):
+                await websocket.send_json(message)
+    except WebSocketDisconnect:
+        pass
+
+async def _stream_reply(command, session_id):
+    """chunk messages as the response is produced, then a done message.
+    
+    Complete sentences are spoken while later ones are still on their way.
+    """
+    speech = voice_speaker.stream() if voice_speaker else None
+    pieces = []
+    try:
+        async with aclosing(ai_handler.stream_command(command, session_id)) as stream:
+            async for piece in stream:
+                pieces.append(piece)
+                if speech:
+                    speech.feed(piece)
+                yield {"type": "chunk", "text": piece}
+        yield {"type": "done", "response": "".join(pieces), "success": True}
+    except Exception as e:
+        yield {"type": "done", "response": f"Error processing command: {str(e)}", "success": False}
+    finally:
+        if speech:
+            speech.close()
+
+@router.post("/commands", response_model=BatchCommandResponse)
+async def process_commands(request: BatchCommandRequest):
+    """Process a batch of text commands, sharing and parallelising their lookups"""
+    if not ai_handler:
+        raise HTTPException(status_code=503, detail="AI handler not initialized")
+    if len(request.commands) > settings.BATCH_MAX_COMMANDS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_MAX_COMMANDS} commands per batch")
+    if request.concurrency is not None and request.concurrency < 1:
+        raise HTTPException(status_code=400, detail="concurrency must be at least 1")
+    
+    outcomes = await ai_handler.process_commands_async(request.commands, request.concurrency)
+    
+    results = []
+    for response, error in outcomes:
+        if error is None:
+            results.append(CommandResponse(response=response, success=True))
+        else:
+            results.append(CommandResponse(response=f"Error processing command: {str(error)}", success=False))
+    return BatchCommandResponse(results=results)
+
 @router.post("/speak")
 async def speak_text(request: dict):
     """Make Jarvis speak the provided text"""
@@ -51,22 +169,45 @@ async def speak_text(request: dict):
         if not voice_speaker:
             raise HTTPException(status_code=503, detail="Voice speaker not initialized")
         
-        voice_speaker.speak_async(text)
-        return {"success": True, "message": "Text spoken successfully"}
+        priority = request.get("priority", "chat")
+        if priority not in PRIORITIES:
+            raise HTTPException(status_code=400, detail=f"priority must be one of {list(PRIORITIES)}")
+        
+        # Messages sharing a key replace each other while still queued
+        voice_speaker.speak_async(text, priority=PRIORITIES[priority], key=request.get("key"))
+        return {"success": True, "message": "Text queued for speaking"}
         
     except Exception as e:
         return {"success": False, "message": f"Error speaking text: {str(e)}"}
 
+@router.post("/speak/cancel")
+async def cancel_speech():
+    """Stop the current utterance and drop everything queued"""
+    if not voice_speaker:
+        raise HTTPException(status_code=503, detail="Voice speaker not initialized")
+    
+    try:
+        # Remote speakers wait on the audio owner process; keep that off the event loop
+        await asyncio.to_thread(voice_speaker.cancel)
+    except (ConnectionError, RuntimeError) as e:
+        raise HTTPException(status_code=503, detail=f"Speech could not be cancelled: {e}")
+    return {"success": True, "message": "Speech cancelled"}
+
 @router.get("/status", response_model=StatusResponse)
 async def get_status():
     """Get system status"""
+    speech = await asyncio.to_thread(voice_speaker.stats) if voice_speaker else None
     return StatusResponse(
         status="online",
-        components={
-            "voice_speaker": voice_speaker is not None,
-            "ai_handler": ai_handler is not None,
-            "voice_listener": True  # Assume running if API is responding
-        }
+        ready=registry.ready() if registry else False,
+        components=registry.status() if registry else {},
+        http_pools=ai_handler.http_client.stats() if ai_handler else None,
+        caches=ai_handler.cache_stats() if ai_handler else None,
+        news_feeds=ai_handler.news_service.aggregator.stats() if ai_handler else None,
+        local_model=ai_handler.local_model.stats() if ai_handler and ai_handler.local_model else None,
+        speech=speech,
+        upstreams=ai_handler.http_client.upstream_stats() if ai_handler else None,
+        rate_limit=rate_limiter.stats() if rate_limiter else None
     )
 
 @router.get("/weather/{city}")
@@ -76,7 +217,7 @@ async def get_weather(city: str):
         if not ai_handler:
             raise HTTPException(status_code=503, detail="AI handler not initialized")
         
-        response = ai_handler.weather_service.get_weather(city)
+        response = await ai_handler.weather_service.get_weather_async(city)
         return {"weather": response, "city": city}
         
     except Exception as e:
@@ -102,8 +243,13 @@ async def web_search(query: str):
         if not ai_handler:
             raise HTTPException(status_code=503, detail="AI handler not initialized")
         
-        response = ai_handler.web_search.search(query)
+        response = await ai_handler.web_search.search_async(query)
         return {"results": response, "query": query}
         
     except Exception as e:
-        return {"error": f"Error performing search: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Error performing search: {str(e)}"}
+
+@router.get("/traces")
+async def get_traces():
+    """Recent command traces slower than TRACE_SLOW_MS, with their span breakdown"""
+    return {"threshold_ms": settings.TRACE_SLOW_MS, "traces": slow_traces()}
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from config.settings import settings
+from services.shared_cache import shared_store
+
+SHARED_NAME = "requests"  # Limiter name of the buckets in the SharedCacheStore
+
+
+def client_address(scope):
+    return scope["client"][0] if scope.get("client") else "unknown"
+
+
+class RateLimiter:
+    """Token bucket per client address.
+
+    Each client may burst `burst` requests and then `rate` per second.
+    Buckets are kept for the `max_clients` most recently seen addresses.
+
+    With SHARED_CACHE on (multi-process mode), the buckets live in the
+    SharedCacheStore instead, so the limit holds across all worker
+    processes rather than once per worker.
+    """
+
+    def __init__(self, rate=None, burst=None, max_clients=None, store=None):
+        self.rate = rate if rate is not None else settings.RATE_LIMIT_RPS
+        self.burst = burst or settings.RATE_LIMIT_BURST
+        self.max_clients = max_clients or settings.RATE_LIMIT_MAX_CLIENTS
+        self.buckets = OrderedDict()  # client -> (tokens, updated_at)
+        self.lock = threading.Lock()
+        self.store = store if store is not None else (shared_store() if settings.SHARED_CACHE else None)
+        self.counters = {"allowed": 0, "limited": 0}
+        self.limited_clients = {}  # client -> requests refused, for the status endpoint
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def acquire(self, client):
+        """0 if the request may go ahead, else seconds until the client has a token again"""
+        if self.store is not None:
+            wait = self.store.take_token(SHARED_NAME, client, self.rate, self.burst)
+        now = time.monotonic()
+        with self.lock:
+            if self.store is None:
+                tokens, updated_at = self.buckets.pop(client, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+                wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+                self.buckets[client] = (tokens - 1 if not wait else tokens, now)
+                while len(self.buckets) > self.max_clients:
+                    dropped, _ = self.buckets.popitem(last=False)
+                    self.limited_clients.pop(dropped, None)
+            if wait:
+                self.counters["limited"] += 1
+                self.limited_clients[client] = self.limited_clients.get(client, 0) + 1
+                while len(self.limited_clients) > self.max_clients:
+                    self.limited_clients.pop(next(iter(self.limited_clients)))
+            else:
+                self.counters["allowed"] += 1
+        return wait
+
+    async def acquire_async(self, client):
+        """acquire, with the shared store's SQLite write kept off the event loop"""
+        if self.store is None:
+            return self.acquire(client)
+        return await asyncio.to_thread(self.acquire, client)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats.update(rate=self.rate, burst=self.burst, clients=len(self.buckets), shared=self.store is not None)
+            stats["top_limited"] = dict(sorted(self.limited_clients.items(), key=lambda item: -item[1])[:10])
+        if self.store is not None:
+            stats["clients"] = self.store.bucket_count(SHARED_NAME)
+        return stats
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 with Retry-After once a client runs out of tokens.
+
+    Only paths under `prefix` are limited, so health checks and metrics
+    scrapes always get through. WebSocket connections cost one token when
+    they are opened; the endpoint charges each message it receives too.
+    """
+
+    def __init__(self, app, limiter, prefix="/api/"):
+        self.app = app
+        self.limiter = limiter
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] not in ("http", "websocket") or not self.limiter.enabled
+                or not scope["path"].startswith(self.prefix)):
+            await self.app(scope, receive, send)
+            return
+
+        client = client_address(scope)
+        wait = await self.limiter.acquire_async(client)
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": 1013, "reason": "rate limit exceeded"})
+            return
+        body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+        await send({"type": "http.response.start", "status": 429, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(math.ceil(wait)).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
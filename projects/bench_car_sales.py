@@ -0,0 +1,80 @@
+"""Compare rows per second and peak memory of the in-memory and out-of-core car-sales training.
+
+Builds a CSV of --copies copies of car_sales_data.csv (50k rows each) in a
+temporary directory, then trains on it once with the notebook's pandas +
+sklearn pipeline and once with car_sales.train, each in a fresh process so
+its peak RSS is its own.
+
+    python bench_car_sales.py --copies 20 --chunksize 100000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+sys.path.insert(0, str(HERE.parent / "unsupervise"))
+
+import car_sales
+from peak_rss import format_mb, lower_peak, peak_rss_mb
+
+
+def build_csv(path, copies):
+    """Repeat the sample dataset copies times without loading more than one copy"""
+    source = (HERE / "car_sales_data.csv").read_text()
+    header, body = source.split("\n", 1)
+    with open(path, "w") as f:
+        f.write(header + "\n")
+        for _ in range(copies):
+            f.write(body if body.endswith("\n") else body + "\n")
+
+
+def run(mode, path, chunksize):
+    """Train in this process and print timing, metrics and peak RSS as JSON"""
+    start = time.perf_counter()
+    if mode == "streaming":
+        _, _, metrics = car_sales.train(path, chunksize)
+    else:
+        _, metrics = car_sales.train_in_memory(path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_rss_mb(), **metrics}))
+
+
+def measure(mode, path, chunksize):
+    output = subprocess.run([sys.executable, __file__, "--run", mode, "--path", path, "--chunksize", str(chunksize)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cars.csv")
+        build_csv(path, args.copies)
+        rows = 50_000 * args.copies
+        size_mb = os.path.getsize(path) / 1e6
+        results = {mode: measure(mode, path, args.chunksize) for mode in ("in_memory", "streaming")}
+
+    print(f"{rows} rows ({size_mb:.0f} MB CSV), chunksize {args.chunksize}")
+    for mode, result in results.items():
+        print(f"{mode:>10}: {rows / result['seconds']:10.0f} rows/s  peak RSS {format_mb(result['peak_mb'], 7)}  "
+              f"test MAE {result['mae']:.1f}  R² {result['r2']:.4f}")
+    streaming, in_memory = results["streaming"], results["in_memory"]
+    return 0 if lower_peak(streaming["peak_mb"], in_memory["peak_mb"]) and abs(streaming["r2"] - in_memory["r2"]) < 0.02 else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--chunksize", type=int, default=car_sales.CHUNKSIZE)
+    parser.add_argument("--run", choices=["in_memory", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run(args.run, args.path, args.chunksize)
+    else:
+        sys.exit(main(args))
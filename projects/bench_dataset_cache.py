@@ -0,0 +1,73 @@
+"""Compare loading the car-sales data from CSV with loading it from the columnar cache.
+
+Builds a CSV of --copies copies of car_sales_data.csv, converts it once,
+then times (best of --repeats) reading it with pandas against the
+memory-mapped cache, for the whole table and for two columns.
+
+    python bench_dataset_cache.py --copies 20 --repeats 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from bench_car_sales import build_csv
+from dataset_cache import convert, load
+
+COLUMNS = ["Mileage", "Price"]
+
+
+def best_of(repeats, load_columns):
+    """Fastest of repeats runs; the columns are summed so mapped pages are actually read"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        columns = load_columns()
+        for values in columns:
+            values.sum()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cars.csv")
+        build_csv(path, args.copies)
+        rows = 50_000 * args.copies
+
+        start = time.perf_counter()
+        convert(path)
+        converted = time.perf_counter() - start
+
+        full_csv = pd.read_csv(path)
+        numeric = [name for name in full_csv.columns if full_csv[name].dtype.kind in "biuf"]
+        del full_csv
+        timings = {
+            "csv, all columns": best_of(args.repeats, lambda: [pd.read_csv(path)[name] for name in numeric]),
+            "cache, all columns": best_of(args.repeats, lambda: [load(path)[name] for name in numeric]),
+            "csv, 2 columns": best_of(args.repeats, lambda: [pd.read_csv(path, usecols=COLUMNS)[name]
+                                                            for name in COLUMNS]),
+            "cache, 2 columns": best_of(args.repeats, lambda: [load(path, columns=COLUMNS)[name] for name in COLUMNS]),
+            "cache to DataFrame": best_of(args.repeats, lambda: [load(path).to_pandas()[name] for name in numeric]),
+        }
+
+    print(f"{rows} rows, converted once in {converted:.2f}s")
+    for label, seconds in timings.items():
+        print(f"{label:>20}: {seconds * 1000:8.1f} ms")
+    speedup = timings["csv, 2 columns"] / timings["cache, 2 columns"]
+    print(f"two columns from the cache: {speedup:.0f}x faster than parsing them from CSV")
+    return 0 if speedup > 1 else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,245 @@
+"""Out-of-core training for the car-sales price regression from project1.ipynb.
+
+The CSV is read in chunks and never held in memory as a whole. A first,
+cheap pass reads only the categorical column to collect its values, so
+Fuel type gets the same sorted codes as the notebook's `cat.codes`. Then
+one pass merges per-chunk means and co-moment matrices of the features
+and price.
+That single pass gives both the StandardScaler statistics and the exact
+least-squares fit on the scaled features, the same model LinearRegression
+finds in the notebook. A second pass scores the held-out rows.
+
+    python car_sales.py car_sales_data.csv --chunksize 100000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+FEATURES = ["Engine size", "Mileage", "Year of manufacture", "Fuel type"]
+TARGET = "Price"
+CATEGORICAL = ["Fuel type"]  # The notebook's model leaves out Manufacturer and Model
+CHUNKSIZE = 100_000  # Rows parsed at a time
+
+
+class CategoryCodes:
+    """Integer codes for categorical columns, assigned in order of first appearance.
+
+    Unlike `astype('category').cat.codes`, codes don't depend on seeing every
+    value first, so chunks can be encoded as they stream in. Pass
+    `categories` to fix the codes instead, e.g. sorted like pandas does
+    (see scan_categories); values missing from them are appended. Missing
+    values get code -1, as they do from `cat.codes`.
+    """
+
+    def __init__(self, columns=CATEGORICAL, categories=None):
+        self.columns = list(columns)
+        self.vocab = {column: {} for column in self.columns}
+        for column, values in (categories or {}).items():
+            self.vocab[column] = {value: code for code, value in enumerate(values)}
+
+    def encode(self, chunk):
+        """Replace each categorical column of chunk with its int32 codes"""
+        for column in self.columns:
+            if column not in chunk:
+                continue
+            local_codes, uniques = pd.factorize(chunk[column])
+            vocab = self.vocab[column]
+            lookup = np.array([vocab.setdefault(value, len(vocab)) for value in uniques] + [-1], dtype=np.int32)
+            chunk[column] = lookup[local_codes]  # -1 (missing) indexes the trailing -1, as cat.codes has it
+        return chunk
+
+    def categories(self, column):
+        """Values of a column in code order"""
+        return list(self.vocab[column])
+
+
+class RunningMoments:
+    """Count, mean and centered co-moment matrix of row vectors, merged chunk by chunk.
+
+    Chunks are combined with Chan et al.'s pairwise update, which stays
+    accurate where summing raw squares would lose precision.
+    """
+
+    def __init__(self, width):
+        self.count = 0
+        self.mean = np.zeros(width)
+        self.comoment = np.zeros((width, width))
+
+    def update(self, block):
+        """Fold in a 2-D float64 array of rows"""
+        n = len(block)
+        if not n:
+            return
+        block_mean = block.mean(axis=0)
+        centered = block - block_mean
+        block_comoment = centered.T @ centered
+
+        total = self.count + n
+        delta = block_mean - self.mean
+        self.comoment += block_comoment + np.outer(delta, delta) * (self.count * n / total)
+        self.mean += delta * (n / total)
+        self.count = total
+
+    @property
+    def var(self):
+        """Population variance of each column, as StandardScaler uses"""
+        return np.diag(self.comoment) / self.count
+
+
+class StreamingLinearRegression:
+    """Least squares on standardized features, fitted from a stream of chunks.
+
+    After fit(), `mean_` and `scale_` match a StandardScaler fitted on the
+    training rows, and `coef_` and `intercept_` match LinearRegression
+    fitted on the scaled rows.
+    """
+
+    def __init__(self, features=FEATURES, target=TARGET):
+        self.features = list(features)
+        self.target = target
+        self.moments = RunningMoments(len(self.features) + 1)
+        self.mean_ = self.scale_ = self.coef_ = self.intercept_ = None
+
+    def partial_fit(self, chunk):
+        """Accumulate one encoded chunk"""
+        self.moments.update(chunk[self.features + [self.target]].to_numpy(dtype=np.float64))
+        return self
+
+    def finish(self):
+        """Solve for the coefficients from everything accumulated so far"""
+        moments, width = self.moments, len(self.features)
+        if moments.count < 2:
+            raise ValueError("need at least two training rows")
+        self.mean_ = moments.mean[:width]
+        scale = np.sqrt(moments.var[:width])
+        self.scale_ = np.where(scale == 0, 1.0, scale)  # constant columns are left unscaled, as StandardScaler does
+
+        # Normal equations of the centered, scaled features: (Z'Z) w = Z'y
+        xx = moments.comoment[:width, :width] / np.outer(self.scale_, self.scale_)
+        xy = moments.comoment[:width, width] / self.scale_
+        self.coef_ = np.linalg.lstsq(xx, xy, rcond=None)[0]
+        self.intercept_ = moments.mean[width]
+        return self
+
+    def fit(self, chunks):
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self.finish()
+
+    def transform(self, X):
+        """Standardize raw feature rows"""
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+    def predict(self, X):
+        """Predicted price for raw (unscaled) feature rows"""
+        return self.transform(X) @ self.coef_ + self.intercept_
+
+
+class RunningErrors:
+    """MAE and R² accumulated over chunks of predictions"""
+
+    def __init__(self):
+        self.count = 0
+        self.abs_error = 0.0
+        self.sq_error = 0.0
+        self.target = RunningMoments(1)
+
+    def update(self, y_true, y_pred):
+        y_true = np.asarray(y_true, dtype=np.float64)
+        error = y_true - y_pred
+        self.count += len(error)
+        self.abs_error += np.abs(error).sum()
+        self.sq_error += error @ error
+        self.target.update(y_true[:, None])
+
+    def result(self):
+        total = self.target.comoment[0, 0]
+        return {"rows": self.count, "mae": self.abs_error / self.count,
+                "r2": 1 - self.sq_error / total if total else 0.0}
+
+
+def scan_categories(path, columns=CATEGORICAL, chunksize=CHUNKSIZE):
+    """Sorted distinct values of each categorical column, as `astype('category')` orders them"""
+    values = {column: set() for column in columns}
+    for chunk in pd.read_csv(path, usecols=list(columns), chunksize=chunksize):
+        for column in columns:
+            values[column].update(chunk[column].dropna().unique())
+    return {column: sorted(found) for column, found in values.items()}
+
+
+def read_chunks(path, chunksize=CHUNKSIZE, columns=None, encoder=None):
+    """Encoded DataFrames of at most chunksize rows, parsed as they are needed"""
+    columns = columns or FEATURES + [TARGET]
+    encoder = encoder or CategoryCodes()
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        yield encoder.encode(chunk)
+
+
+def split_chunks(chunks, test_size=0.2, seed=42, want_test=False):
+    """The train (or test) rows of each chunk.
+
+    Rows are assigned by one seeded random stream, so the split is the same
+    for any chunksize and can be replayed on a later pass.
+    """
+    rng = np.random.default_rng(seed)
+    for chunk in chunks:
+        is_test = rng.random(len(chunk)) < test_size
+        yield chunk[is_test if want_test else ~is_test]
+
+
+def train(path, chunksize=CHUNKSIZE, test_size=0.2, seed=42, evaluate=True, categories=None):
+    """Fit on the training rows of path in one pass, then score the test rows in another.
+
+    `categories` fixes the categorical codes; by default they are collected
+    and sorted by scan_categories first, matching the notebook's encoding.
+    """
+    if categories is None:
+        categories = scan_categories(path, chunksize=chunksize)
+    encoder = CategoryCodes(categories=categories)
+    model = StreamingLinearRegression()
+    model.fit(split_chunks(read_chunks(path, chunksize, encoder=encoder), test_size, seed))
+    metrics = None
+    if evaluate:
+        errors = RunningErrors()
+        for chunk in split_chunks(read_chunks(path, chunksize, encoder=encoder), test_size, seed, want_test=True):
+            errors.update(chunk[TARGET], model.predict(chunk[model.features]))
+        metrics = errors.result()
+    return model, encoder, metrics
+
+
+def train_in_memory(path, test_size=0.2, seed=42):
+    """The notebook's pipeline: whole CSV in pandas, StandardScaler, LinearRegression"""
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    df = pd.read_csv(path)
+    df["Fuel type"] = df["Fuel type"].astype("category").cat.codes
+    X, y = df[FEATURES], df[TARGET]
+    X_scaled = StandardScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=test_size, random_state=seed)
+    model = LinearRegression().fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    return model, {"rows": len(y_test), "mae": mean_absolute_error(y_test, y_pred), "r2": r2_score(y_test, y_pred)}
+
+
+def main(args):
+    start = time.perf_counter()
+    model, encoder, metrics = train(args.path, args.chunksize, args.test_size, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Model trained on {model.moments.count} rows in {elapsed:.2f}s")
+    for name, mean, scale, coef in zip(model.features, model.mean_, model.scale_, model.coef_):
+        print(f"  {name:<20} mean {mean:12.2f}  scale {scale:12.2f}  coef {coef:12.2f}")
+    print(f"  intercept {model.intercept_:.2f}; fuel type codes {encoder.categories('Fuel type')}")
+    print(f"Test rows {metrics['rows']}: MAE {metrics['mae']:.2f}, R² {metrics['r2']:.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default="car_sales_data.csv")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
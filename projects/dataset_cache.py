@@ -0,0 +1,222 @@
+"""Columnar, memory-mapped cache of the CSV datasets used by the notebooks.
+
+The first load of a CSV parses it once, in chunks, into one .npy file per
+column plus a schema.json. Text columns are dictionary encoded: the .npy
+holds integer codes and the schema the sorted categories, so the codes
+equal `astype('category').cat.codes`. Later loads memory-map only the
+columns asked for, without parsing or copying. The cache is rebuilt when
+the SHA-256 of the source changes; the hash is only recomputed when the
+file's size or modification time does.
+
+    import sys; sys.path.append("../projects")
+    from dataset_cache import load
+    data = load("student_success_predictor.csv", columns=["stress_level", "gender"])
+    data["stress_level"]          # numpy memmap, zero-copy
+    data.to_pandas()              # DataFrame, categoricals as pandas Categorical
+
+    python dataset_cache.py car_sales_data.csv "../unsupervise/student_success_predictor.csv"
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = ".dataset_cache"  # Created next to each CSV
+CHUNKSIZE = 200_000  # Rows parsed at a time while converting
+SCHEMA_VERSION = 1
+
+
+class Dataset:
+    """Columns of a converted CSV, memory-mapped on first access"""
+
+    def __init__(self, directory, schema, columns=None):
+        self.directory = directory
+        self.schema = schema
+        self.columns = list(columns or schema["columns"])
+        unknown = [name for name in self.columns if name not in schema["columns"]]
+        if unknown:
+            raise KeyError(f"no such columns: {unknown}")
+        self.arrays = {}
+
+    def __len__(self):
+        return self.schema["rows"]
+
+    def __getitem__(self, name):
+        """The column as a read-only memmap; categorical columns as their int codes"""
+        if name not in self.columns:
+            raise KeyError(name)
+        if name not in self.arrays:
+            path = os.path.join(self.directory, self.schema["columns"][name]["file"])
+            self.arrays[name] = np.load(path, mmap_mode="r")
+        return self.arrays[name]
+
+    def categories(self, name):
+        """Values of a categorical column, in code order"""
+        return self.schema["columns"][name].get("categories")
+
+    def to_numpy(self, columns=None, dtype=np.float64):
+        """Columns stacked into one 2-D array (this one copies)"""
+        columns = columns or self.columns
+        out = np.empty((len(self), len(columns)), dtype=dtype)
+        for i, name in enumerate(columns):
+            out[:, i] = self[name]
+        return out
+
+    def to_pandas(self, columns=None):
+        """A DataFrame of the columns, with categorical columns decoded"""
+        frame = {}
+        for name in columns or self.columns:
+            categories = self.categories(name)
+            if categories is None:
+                frame[name] = self[name]
+            else:
+                frame[name] = pd.Categorical.from_codes(self[name], categories=categories)
+        return pd.DataFrame(frame, copy=False)
+
+
+def load(csv_path, columns=None, cache_dir=None):
+    """The cached Dataset for csv_path, converting it first if needed"""
+    directory = cache_dir or _default_cache_dir(csv_path)
+    schema = _valid_schema(csv_path, directory)
+    if schema is None:
+        schema = convert(csv_path, directory)
+    return Dataset(directory, schema, columns)
+
+
+def convert(csv_path, cache_dir=None, chunksize=CHUNKSIZE):
+    """Parse csv_path once into per-column .npy files; returns the schema"""
+    directory = cache_dir or _default_cache_dir(csv_path)
+    building = f"{directory}.building-{os.getpid()}"
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(os.path.join(building, "parts"))
+
+    digest, stat = _file_hash(csv_path), os.stat(csv_path)
+    parts = {}  # column -> [(file, dtype, rows)] written per chunk
+    vocab = {}  # text column -> {value: first-seen code}
+    files = {}
+    rows = 0
+    for index, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunksize)):
+        for position, name in enumerate(chunk.columns):
+            values = chunk[name]
+            numeric = values.dtype.kind in "biuf"
+            if index and numeric == (name in vocab):
+                raise ValueError(f"column {name!r} of {csv_path} mixes numbers and text; clean it before caching")
+            if numeric:
+                array = values.to_numpy()
+            else:
+                codes, uniques = pd.factorize(values)
+                seen = vocab.setdefault(name, {})
+                lookup = np.array([seen.setdefault(value, len(seen)) for value in uniques] + [-1], dtype=np.int64)
+                array = lookup[codes]  # -1 (missing) indexes the trailing -1
+            path = os.path.join(building, "parts", f"{position:03d}.{index}.bin")
+            array.tofile(path)
+            parts.setdefault(name, []).append((path, array.dtype, len(array)))
+            files[name] = f"{position:03d}_{_slug(name)}.npy"
+        rows += len(chunk)
+
+    columns = {}
+    for name, pieces in parts.items():
+        file = files[name]
+        if name in vocab:
+            categories = sorted(vocab[name], key=str)
+            remap = np.empty(len(categories) + 1, dtype=np.int64)
+            remap[[vocab[name][value] for value in categories]] = np.arange(len(categories))
+            remap[-1] = -1
+            dtype = _code_dtype(len(categories))
+            columns[name] = {"file": file, "dtype": np.dtype(dtype).name, "categories": categories}
+        else:
+            remap = None
+            dtype = np.result_type(*(piece_dtype for _, piece_dtype, _ in pieces))
+            columns[name] = {"file": file, "dtype": np.dtype(dtype).name}
+
+        out = np.lib.format.open_memmap(os.path.join(building, file), mode="w+", dtype=dtype, shape=(rows,))
+        offset = 0
+        for path, piece_dtype, count in pieces:
+            piece = np.fromfile(path, dtype=piece_dtype, count=count)
+            out[offset:offset + count] = remap[piece] if remap is not None else piece
+            offset += count
+        out.flush()
+        del out
+
+    shutil.rmtree(os.path.join(building, "parts"))
+    schema = {"version": SCHEMA_VERSION, "source": os.path.basename(csv_path), "sha256": digest,
+              "size": stat.st_size, "mtime": stat.st_mtime, "rows": rows, "columns": columns,
+              "converted_at": time.time()}
+    with open(os.path.join(building, "schema.json"), "w") as f:
+        json.dump(schema, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(building, directory)
+    return schema
+
+
+def _valid_schema(csv_path, directory):
+    """The cached schema if it still describes csv_path, else None"""
+    schema_path = os.path.join(directory, "schema.json")
+    try:
+        with open(schema_path) as f:
+            schema = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if schema.get("version") != SCHEMA_VERSION:
+        return None
+
+    stat = os.stat(csv_path)
+    if (stat.st_size, stat.st_mtime) == (schema["size"], schema["mtime"]):
+        return schema
+    if stat.st_size != schema["size"] or _file_hash(csv_path) != schema["sha256"]:
+        return None
+    # Touched but unchanged: remember the new mtime so it isn't hashed again
+    schema["mtime"] = stat.st_mtime
+    with open(schema_path, "w") as f:
+        json.dump(schema, f, indent=2)
+    return schema
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _default_cache_dir(csv_path):
+    folder, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(folder, CACHE_DIR, os.path.splitext(name)[0])
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower() or "column"
+
+
+def _code_dtype(count):
+    """Smallest signed integer type holding codes 0..count-1 and -1 for missing"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if count <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def main(args):
+    for path in args.paths:
+        start = time.perf_counter()
+        if args.force:
+            schema = convert(path)
+        else:
+            schema = load(path).schema
+        kinds = ", ".join(f"{name}: {'category' if 'categories' in column else column['dtype']}"
+                          for name, column in schema["columns"].items())
+        print(f"✅ {path}: {schema['rows']} rows in {time.perf_counter() - start:.2f}s ({kinds})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="CSV files to convert (skipped when the cache is current)")
+    parser.add_argument("--force", action="store_true", help="convert even if the cache is current")
+    main(parser.parse_args())
@@ -0,0 +1,100 @@
+"""Compare sklearn's full-batch KMeans with streaming_kmeans on wall time, peak memory and inertia.
+
+Writes --rows synthetic customers (Age, Annual Income, Spending Score,
+drawn from --clusters segments around the notebook's customers) to a
+temporary CSV, then clusters it once with the notebook's pandas + sklearn
+KMeans and once with StreamingKMeans, each in a fresh process so its peak
+RSS is its own. Both use the same number of clusters and restarts, and
+both report the inertia over every row. Peak RSS is the main process's;
+the forked restart workers share its pages, and their own peaks can't be
+told apart from it, so they are not reported.
+
+    python bench_streaming_kmeans.py --rows 2000000 --clusters 4 --n-init 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from peak_rss import format_mb, lower_peak, peak_rss_mb
+from streaming_kmeans import FEATURES, StreamingKMeans
+
+
+def build_csv(path, rows, clusters, seed=0, chunksize=500_000):
+    """Customers from clusters Gaussian segments, written a chunk at a time"""
+    rng = np.random.default_rng(seed)
+    centers = np.column_stack([rng.uniform(22, 60, clusters), rng.uniform(30_000, 120_000, clusters),
+                               rng.uniform(20, 90, clusters)])
+    spread = np.array([6, 9_000, 10])
+    for begin in range(0, rows, chunksize):
+        count = min(chunksize, rows - begin)
+        segment = rng.integers(clusters, size=count)
+        values = centers[segment] + rng.normal(size=(count, 3)) * spread
+        chunk = pd.DataFrame({"Customer": np.arange(begin, begin + count),
+                              "Age": values[:, 0].round().clip(18, 80).astype(int),
+                              "Annual Income": values[:, 1].round(-2).clip(10_000, None).astype(int),
+                              "Spending Score": values[:, 2].round().clip(1, 100).astype(int)})
+        chunk.to_csv(path, mode="w" if begin == 0 else "a", header=begin == 0, index=False)
+
+
+def run(mode, path, clusters, n_init, jobs):
+    """Cluster in this process and print timing, inertia and peak RSS as JSON"""
+    start = time.perf_counter()
+    if mode == "sklearn":
+        from sklearn.cluster import KMeans
+
+        X = pd.read_csv(path)[FEATURES]
+        inertia = KMeans(n_clusters=clusters, random_state=42, n_init=n_init).fit(X).inertia_
+    else:
+        inertia = StreamingKMeans(clusters, n_init, n_jobs=jobs).fit(path).label_csv(path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_rss_mb(), "inertia": float(inertia)}))
+
+
+def measure(mode, path, args):
+    output = subprocess.run([sys.executable, __file__, "--run", mode, "--path", path, "--clusters", str(args.clusters),
+                             "--n-init", str(args.n_init), "--jobs", str(args.jobs or 0)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "customers.csv")
+        build_csv(path, args.rows, args.clusters)
+        size_mb = os.path.getsize(path) / 1e6
+        results = {mode: measure(mode, path, args) for mode in ("sklearn", "streaming")}
+
+    print(f"{args.rows} customers ({size_mb:.0f} MB CSV), {args.clusters} clusters, n_init {args.n_init}")
+    best = min(result["inertia"] for result in results.values())
+    for mode, result in results.items():
+        print(f"{mode:>10}: {result['seconds']:7.2f}s  peak RSS {format_mb(result['peak_mb'])}  "
+              f"inertia {result['inertia']:.6g} (+{result['inertia'] / best - 1:.3%})")
+    streaming, sklearn = results["streaming"], results["sklearn"]
+    close = streaming["inertia"] <= sklearn["inertia"] * 1.01
+    return 0 if close and lower_peak(streaming["peak_mb"], sklearn["peak_mb"]) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--clusters", type=int, default=4)
+    parser.add_argument("--n-init", type=int, default=4)
+    parser.add_argument("--jobs", type=int, help="processes for the streaming restarts (default: one per CPU)")
+    parser.add_argument("--run", choices=["sklearn", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run(args.run, args.path, args.clusters, args.n_init, args.jobs or None)
+    else:
+        sys.exit(main(args))
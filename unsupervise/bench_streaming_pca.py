@@ -0,0 +1,120 @@
+"""Compare the notebook's in-memory StandardScaler + PCA with streaming_pca on accuracy, time and memory.
+
+With --width 3 the data is --rows synthetic customers (Age, Annual Income,
+Spending Score); a larger --width builds that many correlated features from
+a few latent factors instead, to exercise the randomized method on wide
+data. Each method fits and writes the PCA columns of every row to a CSV in
+a fresh process, so its peak RSS is its own. Accuracy is the largest
+difference in explained_variance_ratio_ from exact PCA and the smallest
+|cosine| between matching components.
+
+    python bench_streaming_pca.py --rows 2000000
+    python bench_streaming_pca.py --rows 200000 --width 200 --components 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from bench_streaming_kmeans import build_csv
+from peak_rss import format_mb, lower_peak, peak_rss_mb
+from streaming_pca import METHODS, StreamingPCA
+
+LATENT_FACTORS = 5
+
+
+def build_wide_csv(path, rows, width, seed=0, chunksize=100_000):
+    """rows x width features driven by a few latent factors plus noise"""
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(size=(LATENT_FACTORS, width)) * np.linspace(3, 0.5, LATENT_FACTORS)[:, None]
+    offsets, scales = rng.uniform(-100, 100, width), rng.uniform(0.1, 1000, width)
+    columns = [f"Feature {i + 1}" for i in range(width)]
+    for begin in range(0, rows, chunksize):
+        count = min(chunksize, rows - begin)
+        values = rng.normal(size=(count, LATENT_FACTORS)) @ loadings + rng.normal(size=(count, width))
+        chunk = pd.DataFrame(values * scales + offsets, columns=columns)
+        chunk.insert(0, "Customer", np.arange(begin, begin + count))
+        chunk.to_csv(path, mode="w" if begin == 0 else "a", header=begin == 0, index=False, float_format="%.6g")
+    return columns
+
+
+def run(method, path, out_path, features, components):
+    """Fit and transform in this process and print timing, results and peak RSS as JSON"""
+    start = time.perf_counter()
+    if method == "exact":
+        from sklearn.decomposition import PCA
+        from sklearn.preprocessing import StandardScaler
+
+        df = pd.read_csv(path)
+        pca = PCA(n_components=components)
+        pca_result = pca.fit_transform(StandardScaler().fit_transform(df[features]))
+        pca_df = pd.DataFrame(pca_result, columns=[f"PCA{i + 1}" for i in range(components)])
+        pca_df.insert(0, "Customer", df["Customer"])
+        pca_df.to_csv(out_path, index=False)
+    else:
+        pca = StreamingPCA(components, method, features=features).fit(path)
+        pca.transform_csv(path, out_path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_rss_mb(),
+                      "ratio": pca.explained_variance_ratio_.tolist(), "components": pca.components_.tolist()}))
+
+
+def measure(method, path, out_path, features, components):
+    output = subprocess.run([sys.executable, __file__, "--run", method, "--path", path, "--out", out_path,
+                             "--features", ",".join(features), "--components", str(components)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        path, out_path = os.path.join(directory, "customers.csv"), os.path.join(directory, "pca.csv")
+        if args.width == 3:
+            build_csv(path, args.rows, clusters=4)
+            features = ["Age", "Annual Income", "Spending Score"]
+        else:
+            features = build_wide_csv(path, args.rows, args.width)
+        size_mb = os.path.getsize(path) / 1e6
+        results = {method: measure(method, path, out_path, features, args.components)
+                   for method in ("exact",) + METHODS}
+
+    exact = results["exact"]
+    print(f"{args.rows} rows x {len(features)} features ({size_mb:.0f} MB CSV), {args.components} components")
+    print(f"exact explained variance: {np.round(np.array(exact['ratio']) * 100, 2)}")
+    worst = 0.0
+    for method, result in results.items():
+        ratio_error = np.abs(np.array(result["ratio"]) - exact["ratio"]).max()
+        cosine = np.abs((np.array(result["components"]) * exact["components"]).sum(axis=1)).min()
+        if method != "exact":
+            worst = max(worst, ratio_error)
+        print(f"{method:>12}: {result['seconds']:7.2f}s  peak RSS {format_mb(result['peak_mb'])}  "
+              f"ratio error {ratio_error:.1e}  min |cos| {cosine:.6f}")
+    lower = all(lower_peak(result["peak_mb"], exact["peak_mb"]) for method, result in results.items()
+                if method != "exact")
+    return 0 if worst < 1e-3 and lower else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--width", type=int, default=3)
+    parser.add_argument("--components", type=int, default=2)
+    parser.add_argument("--run", choices=("exact",) + METHODS, help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    parser.add_argument("--features", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run(args.run, args.path, args.out, args.features.split(","), args.components)
+    else:
+        sys.exit(main(args))
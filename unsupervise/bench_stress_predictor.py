@@ -0,0 +1,104 @@
+"""Check StressPredictor against sklearn and compare their single-row and batch latency.
+
+Trains the notebook's pipeline, saves and reloads the artifact, then checks
+that the NumPy predictor gives the same stress level and probabilities as
+sklearn for the dataset and for --rows random students. Latency is the
+median over --repeats runs of scoring one student: the notebook's way
+(a DataFrame through scaler and model), sklearn on a NumPy row, and
+StressPredictor. Batch throughput is measured on the --rows students.
+
+    python bench_stress_predictor.py --rows 1000000 --repeats 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from stress_predictor import FEATURES, StressPredictor, save, train
+
+
+def per_call(function, calls, repeats):
+    """Median seconds per call of function() over repeats timed runs of calls calls"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        timings.append((time.perf_counter() - start) / calls)
+    return statistics.median(timings)
+
+
+def random_students(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(0.5, 1.0, rows), rng.uniform(0.0, 4.0, rows)])
+
+
+def main(args):
+    # sklearn was fitted on DataFrames, as in the notebook, and warns about every bare NumPy array
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    warnings.filterwarnings("ignore", message="X has feature names")
+    le, scaler, model, _ = train(HERE / "student_success_predictor.csv")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stress_model.npz")
+        save(path, le, scaler, model)
+        size = os.path.getsize(path)
+        predictor = StressPredictor.load(path)
+
+    def sklearn_predict(X):
+        return le.inverse_transform(model.predict(scaler.transform(X)))
+
+    data = pd.read_csv(HERE / "student_success_predictor.csv")[FEATURES].to_numpy(dtype=np.float64)
+    X = np.concatenate([data, random_students(args.rows)])
+    expected, expected_proba = sklearn_predict(X), model.predict_proba(scaler.transform(X))
+    proba_error = np.abs(predictor.predict_proba(X) - expected_proba).max()
+    mismatches = int((predictor.predict(X) != expected).sum())
+    one_by_one = sum(predictor.predict_one(*row) != label for row, label in zip(X[:10_000].tolist(), expected))
+
+    attendance_rate, previous_gpa = 0.85, 3.2
+    row = np.array([[attendance_rate, previous_gpa]])
+
+    def notebook():
+        input_data = pd.DataFrame([[attendance_rate, previous_gpa]], columns=FEATURES)
+        input_data[FEATURES] = scaler.transform(input_data[FEATURES])
+        return le.inverse_transform(model.predict(input_data))[0]
+
+    single = {
+        "notebook (DataFrame)": per_call(notebook, 200, args.repeats),
+        "sklearn (NumPy row)": per_call(lambda: sklearn_predict(row)[0], 1000, args.repeats),
+        "StressPredictor.predict": per_call(lambda: predictor.predict(row)[0], 20_000, args.repeats),
+        "StressPredictor.predict_one": per_call(lambda: predictor.predict_one(attendance_rate, previous_gpa),
+                                                200_000, args.repeats),
+    }
+    batch = {
+        "sklearn": per_call(lambda: sklearn_predict(X), 1, args.repeats),
+        "StressPredictor": per_call(lambda: predictor.predict(X), 1, args.repeats),
+    }
+
+    print(f"artifact {size} bytes; parity on {len(X)} students: {mismatches} label mismatches "
+          f"({one_by_one} with predict_one on 10000), max probability difference {proba_error:.1e}")
+    print("one student:")
+    for label, seconds in single.items():
+        print(f"{label:>28}: {seconds * 1e6:10.2f} µs")
+    print(f"{len(X)} students in one batch:")
+    for label, seconds in batch.items():
+        print(f"{label:>28}: {len(X) / seconds / 1e6:10.1f} M rows/s")
+    speedup = single["notebook (DataFrame)"] / single["StressPredictor.predict_one"]
+    print(f"one student: {speedup:.0f}x faster than the notebook")
+    return 0 if mismatches == 0 and one_by_one == 0 and proba_error < 1e-9 else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,30 @@
+"""Peak resident memory of the current process, for the benchmarks run in fresh processes.
+
+Used by the benchmarks here and by projects/bench_car_sales.py.
+"""
+
+
+def peak_rss_mb():
+    """This process's peak resident memory since it started, or None where it can't be read.
+
+    It comes from VmHWM in /proc/self/status, which starts over at exec.
+    getrusage's ru_maxrss is not a fallback: in a spawned child it also
+    counts the parent's memory at the time of the spawn.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def format_mb(value, width=6):
+    return f"{value:{width}.0f} MB" if value is not None else f"{'n/a':>{width}}   "
+
+
+def lower_peak(streaming, baseline):
+    """Whether the streaming run peaked below the baseline; True when either couldn't be measured"""
+    return streaming is None or baseline is None or streaming < baseline
@@ -0,0 +1,273 @@
+"""Out-of-core KMeans for the customer segmentation in kmeans.ipynb.
+
+The customer CSV is only ever read in chunks. One pass draws a uniform
+sample of rows; each restart seeds k-means++ on that sample and refines it
+with Lloyd iterations that skip distance computations the triangle
+inequality rules out (Hamerly's bounds, a single-lower-bound form of
+Elkan's). Restarts run in parallel across a process pool and the one with
+the lowest inertia on the sample wins. Mini-batch passes over the whole
+file then correct its centers for sampling error, and a last pass assigns
+every row its cluster and adds up the inertia, writing the labels out
+chunk by chunk.
+
+    python streaming_kmeans.py customers.csv --clusters 2 --n-init 10 --out customers_grouped.csv
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+FEATURES = ["Age", "Annual Income", "Spending Score"]
+LABEL = "Group"  # Column the notebook stores cluster labels in
+CHUNKSIZE = 200_000  # Rows parsed at a time
+SAMPLE_SIZE = 100_000  # Rows the restarts are seeded and refined on
+BATCH_SIZE = 4096  # Rows per mini-batch update
+
+
+def read_chunks(path, features=FEATURES, chunksize=CHUNKSIZE):
+    """float64 arrays of the feature columns, chunksize rows at a time"""
+    for chunk in pd.read_csv(path, usecols=features, chunksize=chunksize):
+        yield chunk[features].to_numpy(dtype=np.float64)
+
+
+def sample_rows(chunks, size, seed=0):
+    """A uniform random sample of up to size rows, drawn in one pass over chunks.
+
+    Every row gets a random key and the size smallest keys are kept, so
+    at most size + one chunk of rows are held at once.
+    """
+    rng = np.random.default_rng(seed)
+    kept, kept_keys, rows = None, None, 0
+    for X in chunks:
+        rows += len(X)
+        keys = rng.random(len(X))
+        if kept is not None:
+            X, keys = np.concatenate([kept, X]), np.concatenate([kept_keys, keys])
+        if len(X) > size:
+            smallest = np.argpartition(keys, size)[:size]
+            X, keys = X[smallest], keys[smallest]
+        kept, kept_keys = X, keys
+    return (kept if kept is not None else np.empty((0, 0))), rows
+
+
+def squared_distances(X, centers):
+    """(n, k) squared Euclidean distances, as ||x||² - 2x·c + ||c||² with one matrix product"""
+    distances = (X * X).sum(axis=1)[:, None] - 2 * X @ centers.T + (centers * centers).sum(axis=1)
+    return np.maximum(distances, 0, out=distances)
+
+
+def kmeans_plusplus(X, k, rng):
+    """k initial centers drawn from the rows of X with D² weighting"""
+    centers = np.empty((k, X.shape[1]))
+    centers[0] = X[rng.integers(len(X))]
+    closest = squared_distances(X, centers[:1])[:, 0]
+    for i in range(1, k):
+        total = closest.sum()
+        index = rng.choice(len(X), p=closest / total) if total > 0 else rng.integers(len(X))
+        centers[i] = X[index]
+        np.minimum(closest, squared_distances(X, centers[i:i + 1])[:, 0], out=closest)
+    return centers
+
+
+def cluster_sums(X, labels, k):
+    """Per-cluster row counts and feature sums"""
+    counts = np.bincount(labels, minlength=k).astype(np.float64)
+    sums = np.column_stack([np.bincount(labels, weights=X[:, i], minlength=k) for i in range(X.shape[1])])
+    return counts, sums
+
+
+def lloyd(X, centers, max_iter=100, tol=1e-4):
+    """Lloyd's iterations with Hamerly's bounds; returns (centers, labels, inertia, distance fraction).
+
+    Each row keeps an upper bound on the distance to its own center and a
+    lower bound on the distance to any other. After the centers move, the
+    bounds are loosened by how far they moved, and only rows whose bounds
+    overlap (or whose upper bound is above half the gap between their
+    center and the nearest other one) get their distances recomputed.
+    The last value is the fraction of row-center distances actually
+    computed, relative to plain Lloyd's.
+    """
+    k = len(centers)
+    D = np.sqrt(squared_distances(X, centers))
+    labels = D.argmin(axis=1)
+    order = np.partition(D, 1, axis=1) if k > 1 else np.column_stack([D[:, 0], np.full(len(X), np.inf)])
+    upper, lower = order[:, 0].copy(), order[:, 1].copy()
+    computed, full = len(X) * k, len(X) * k
+    threshold = tol * X.var(axis=0).mean()
+
+    for _ in range(max_iter):
+        counts, sums = cluster_sums(X, labels, k)
+        moved = centers.copy()
+        filled = counts > 0
+        moved[filled] = sums[filled] / counts[filled, None]
+        shift = np.sqrt(((moved - centers) ** 2).sum(axis=1))
+        centers = moved
+        if (shift ** 2).sum() <= threshold:
+            break
+        full += len(X) * k
+
+        upper += shift[labels]
+        lower -= shift.max()
+        gaps = np.sqrt(squared_distances(centers, centers))
+        np.fill_diagonal(gaps, np.inf)
+        half_gap = 0.5 * gaps.min(axis=1)
+
+        bound = np.maximum(half_gap[labels], lower)
+        check = np.flatnonzero(upper > bound)
+        if len(check):
+            own = centers[labels[check]]
+            upper[check] = np.sqrt(((X[check] - own) ** 2).sum(axis=1))
+            computed += len(check)
+            check = check[upper[check] > bound[check]]
+        if len(check):
+            D = np.sqrt(squared_distances(X[check], centers))
+            computed += len(check) * k
+            labels[check] = D.argmin(axis=1)
+            order = np.partition(D, 1, axis=1) if k > 1 else np.column_stack([D[:, 0], np.full(len(D), np.inf)])
+            upper[check], lower[check] = order[:, 0], order[:, 1]
+
+    inertia = squared_distances(X, centers)[np.arange(len(X)), labels].sum()
+    return centers, labels, inertia, computed / full
+
+
+def _restart(job):
+    """One restart on the sample: k-means++ seeding then pruned Lloyd's"""
+    X, k, seed, max_iter, tol = job
+    centers = kmeans_plusplus(X, k, np.random.default_rng(seed))
+    centers, labels, inertia, computed = lloyd(X, centers, max_iter, tol)
+    return inertia, centers, np.bincount(labels, minlength=k), computed
+
+
+class StreamingKMeans:
+    """KMeans fitted on a CSV too large to load, using a sample, mini-batches and a process pool.
+
+    `n_jobs` processes run the `n_init` restarts (default: one per CPU).
+    `max_passes` mini-batch passes follow over the whole file, stopping
+    early once the centers move less than `tol` in a pass.
+    """
+
+    def __init__(self, n_clusters=2, n_init=10, sample_size=SAMPLE_SIZE, batch_size=BATCH_SIZE, max_passes=2,
+                 max_iter=100, tol=1e-4, n_jobs=None, chunksize=CHUNKSIZE, features=FEATURES, seed=42):
+        self.n_clusters = n_clusters
+        self.n_init = n_init
+        self.sample_size = sample_size
+        self.batch_size = batch_size
+        self.max_passes = max_passes
+        self.max_iter = max_iter
+        self.tol = tol
+        self.n_jobs = n_jobs or min(n_init, os.cpu_count() or 1)
+        self.chunksize = chunksize
+        self.features = list(features)
+        self.seed = seed
+        self.cluster_centers_ = None
+        self.sample_inertia_ = None
+        self.stats = {}
+
+    def fit(self, path):
+        """Fit the centers to the rows of the CSV at path"""
+        start = time.perf_counter()
+        sample, rows = sample_rows(self._chunks(path), self.sample_size, self.seed)
+        if len(sample) < self.n_clusters:
+            raise ValueError(f"{path} has {rows} rows, fewer than {self.n_clusters} clusters")
+        self.stats.update(rows=rows, sample_rows=len(sample), sample_seconds=time.perf_counter() - start)
+
+        start = time.perf_counter()
+        seeds = np.random.SeedSequence(self.seed).generate_state(self.n_init)
+        jobs = [(sample, self.n_clusters, int(seed), self.max_iter, self.tol) for seed in seeds]
+        if self.n_jobs > 1:
+            with ProcessPoolExecutor(self.n_jobs) as pool:
+                restarts = list(pool.map(_restart, jobs))
+        else:
+            restarts = [_restart(job) for job in jobs]
+        self.sample_inertia_, centers, counts, _ = min(restarts, key=lambda restart: restart[0])
+        self.stats.update(restart_seconds=time.perf_counter() - start,
+                          distances_computed=float(np.mean([restart[3] for restart in restarts])))
+
+        start = time.perf_counter()
+        # The sample's cluster sizes weight the centers, so mini-batches refine them rather than start over
+        counts = counts.astype(np.float64)
+        threshold = self.tol * sample.var(axis=0).mean()
+        passes = 0
+        for passes in range(1, self.max_passes + 1):
+            before = centers.copy()
+            for X in self._chunks(path):
+                for begin in range(0, len(X), self.batch_size):
+                    centers, counts = self._partial_fit(X[begin:begin + self.batch_size], centers, counts)
+            if ((centers - before) ** 2).sum() <= threshold:
+                break
+        self.cluster_centers_ = centers
+        self.stats.update(passes=passes, minibatch_seconds=time.perf_counter() - start)
+        return self
+
+    def predict(self, X):
+        """Cluster of each row of X (an in-memory array of the features)"""
+        return squared_distances(np.asarray(X, dtype=np.float64), self.cluster_centers_).argmin(axis=1)
+
+    def label_csv(self, path, out_path=None):
+        """Assign every row of path, appending them with a Group column to out_path if given; returns inertia.
+
+        Only one chunk is in memory at a time. The per-cluster row counts
+        end up in stats["cluster_sizes"].
+        """
+        inertia, sizes = 0.0, np.zeros(self.n_clusters, dtype=np.int64)
+        first = True
+        for chunk in pd.read_csv(path, chunksize=self.chunksize):
+            distances = squared_distances(chunk[self.features].to_numpy(dtype=np.float64), self.cluster_centers_)
+            labels = distances.argmin(axis=1)
+            inertia += distances[np.arange(len(labels)), labels].sum()
+            sizes += np.bincount(labels, minlength=self.n_clusters)
+            if out_path:
+                chunk[LABEL] = labels
+                chunk.to_csv(out_path, mode="w" if first else "a", header=first, index=False)
+            first = False
+        self.stats["cluster_sizes"] = sizes.tolist()
+        return inertia
+
+    def _chunks(self, path):
+        return read_chunks(path, self.features, self.chunksize)
+
+    @staticmethod
+    def _partial_fit(X, centers, counts):
+        """One mini-batch step: each center moves toward its rows' mean by their share of its count"""
+        labels = squared_distances(X, centers).argmin(axis=1)
+        batch_counts, sums = cluster_sums(X, labels, len(centers))
+        hit = batch_counts > 0
+        counts = counts + batch_counts
+        centers = centers.copy()
+        centers[hit] += (sums[hit] - batch_counts[hit, None] * centers[hit]) / counts[hit, None]
+        return centers, counts
+
+
+def main(args):
+    start = time.perf_counter()
+    model = StreamingKMeans(args.clusters, args.n_init, args.sample_size, args.batch_size, args.max_passes,
+                            n_jobs=args.jobs, chunksize=args.chunksize, seed=args.seed).fit(args.path)
+    inertia = model.label_csv(args.path, args.out)
+    stats = model.stats
+    print(f"✅ {stats['rows']} rows in {time.perf_counter() - start:.2f}s: sample {stats['sample_seconds']:.2f}s, "
+          f"{args.n_init} restarts {stats['restart_seconds']:.2f}s "
+          f"({stats['distances_computed']:.0%} of Lloyd's distances), "
+          f"{stats['passes']} mini-batch passes {stats['minibatch_seconds']:.2f}s")
+    for group, (center, size) in enumerate(zip(model.cluster_centers_, stats["cluster_sizes"])):
+        shown = ", ".join(f"{name} {value:.1f}" for name, value in zip(model.features, center))
+        print(f"Group {group}: {size} customers, center {shown}")
+    print(f"Inertia: {inertia:.6g}")
+    if args.out:
+        print(f"labels written to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV with Age, Annual Income and Spending Score columns")
+    parser.add_argument("--clusters", type=int, default=2)
+    parser.add_argument("--n-init", type=int, default=10)
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-passes", type=int, default=2)
+    parser.add_argument("--jobs", type=int, help="processes for the restarts (default: one per CPU)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the rows with their Group here")
+    main(parser.parse_args())
@@ -0,0 +1,234 @@
+"""Out-of-core standardization and PCA for the customer features in kmeans.ipynb.
+
+The notebook's StandardScaler + PCA(n_components=2) needs the whole matrix
+in memory. Here the CSV is only read in chunks. A first pass merges
+per-chunk means and variances into the scaler's parameters, then one of
+three methods finds the components from the standardized chunks:
+
+    incremental  sklearn's IncrementalPCA, partial_fit chunk by chunk
+    randomized   randomized SVD by subspace iteration, one pass per power
+                 iteration; memory grows with the number of features times
+                 (components + oversamples), never with the rows, which
+                 suits wide data
+    covariance   eigenvectors of the correlation matrix gathered in the
+                 first pass itself; exact, for data narrow enough that a
+                 features x features matrix fits
+
+All three report explained_variance_ratio_ the way sklearn's PCA does, with
+the same sign convention, and transform_csv() writes PCA1, PCA2, ... back
+out a chunk at a time.
+
+    python streaming_pca.py customers.csv --method randomized --out customers_pca.csv
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from streaming_kmeans import CHUNKSIZE, FEATURES, read_chunks
+
+METHODS = ("incremental", "randomized", "covariance")
+CHUNK_CELLS = CHUNKSIZE * len(FEATURES)  # Values parsed at a time; wider files get proportionally fewer rows
+
+
+class StreamingScaler:
+    """StandardScaler whose mean and variance are merged chunk by chunk.
+
+    Chunks are combined with Chan et al.'s pairwise update. With
+    `covariance`, the centered co-moment matrix of the features is kept too.
+    """
+
+    def __init__(self, covariance=False):
+        self.covariance = covariance
+        self.n_samples_seen_ = 0
+        self.mean_ = None
+        self.m2 = None  # Sum of squared deviations per feature, or the co-moment matrix with covariance
+        self.var_ = None
+        self.scale_ = None
+
+    def partial_fit(self, X):
+        count = len(X)
+        if not count:
+            return self
+        mean = X.mean(axis=0)
+        centered = X - mean
+        m2 = centered.T @ centered if self.covariance else (centered * centered).sum(axis=0)
+        if self.mean_ is None:
+            self.n_samples_seen_, self.mean_, self.m2 = count, mean, m2
+        else:
+            total = self.n_samples_seen_ + count
+            delta = mean - self.mean_
+            correction = np.outer(delta, delta) if self.covariance else delta * delta
+            self.m2 = self.m2 + m2 + correction * (self.n_samples_seen_ * count / total)
+            self.mean_ = self.mean_ + delta * (count / total)
+            self.n_samples_seen_ = total
+        self.var_ = (np.diag(self.m2) if self.covariance else self.m2) / self.n_samples_seen_
+        scale = np.sqrt(self.var_)
+        self.scale_ = np.where(scale == 0, 1.0, scale)  # Constant columns are left unscaled, as StandardScaler does
+        return self
+
+    def transform(self, X):
+        return (X - self.mean_) / self.scale_
+
+    def correlation(self):
+        """Co-moment matrix of the standardized features (requires covariance=True)"""
+        return self.m2 / np.outer(self.scale_, self.scale_)
+
+
+def flip_signs(components):
+    """Make the largest-magnitude loading of each component positive, like sklearn's svd_flip"""
+    largest = np.abs(components).argmax(axis=1)
+    signs = np.sign(components[np.arange(len(components)), largest])
+    return components * np.where(signs == 0, 1, signs)[:, None]
+
+
+class StreamingPCA:
+    """PCA of standardized CSV columns, fitted without loading the file.
+
+    `n_iter` power iterations (one pass each) and `n_oversamples` extra
+    directions set the randomized method's accuracy.
+    """
+
+    def __init__(self, n_components=2, method="incremental", n_oversamples=10, n_iter=2, features=FEATURES,
+                 chunksize=None, seed=0):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {', '.join(METHODS)}")
+        self.n_components = n_components
+        self.method = method
+        self.n_oversamples = n_oversamples
+        self.n_iter = n_iter
+        self.features = list(features)
+        self.chunksize = chunksize or max(1000, CHUNK_CELLS // len(self.features))
+        self.seed = seed
+        self.scaler = None
+        self.components_ = None
+        self.explained_variance_ = None
+        self.explained_variance_ratio_ = None
+        self.stats = {}
+
+    def fit(self, path):
+        """Fit the scaler and the components to the CSV at path"""
+        start = time.perf_counter()
+        self.scaler = StreamingScaler(covariance=self.method == "covariance")
+        for X in self._chunks(path):
+            self.scaler.partial_fit(X)
+        n = self.scaler.n_samples_seen_
+        if n < 2 or self.n_components > min(n, len(self.features)):
+            raise ValueError(f"can't find {self.n_components} components of {n} rows x {len(self.features)} features")
+        self.stats.update(rows=n, passes=1)
+
+        if self.method == "incremental":
+            components, variance, ratio = self._fit_incremental(path)
+        elif self.method == "randomized":
+            components, variance, ratio = self._fit_randomized(path)
+        else:
+            components, variance, ratio = self._fit_covariance()
+        self.components_ = flip_signs(components)
+        self.explained_variance_, self.explained_variance_ratio_ = variance, ratio
+        self.stats["seconds"] = time.perf_counter() - start
+        return self
+
+    def transform(self, X):
+        """PCA coordinates of X, an in-memory array of the raw features"""
+        return self.scaler.transform(np.asarray(X, dtype=np.float64)) @ self.components_.T
+
+    def columns(self):
+        return [f"PCA{i + 1}" for i in range(self.n_components)]
+
+    def transform_csv(self, path, out_path, keep=None):
+        """Write the PCA columns of every row of path to out_path, one chunk at a time; returns the row count.
+
+        `keep` lists input columns copied alongside them (default: every
+        column that isn't a feature, e.g. the customer's name or id).
+        """
+        rows, first = 0, True
+        for chunk in pd.read_csv(path, chunksize=self.chunksize):
+            carried = keep if keep is not None else [name for name in chunk.columns if name not in self.features]
+            projected = self.transform(chunk[self.features].to_numpy(dtype=np.float64))
+            out = chunk[carried].copy()
+            for i, name in enumerate(self.columns()):
+                out[name] = projected[:, i]
+            out.to_csv(out_path, mode="w" if first else "a", header=first, index=False)
+            rows += len(out)
+            first = False
+        return rows
+
+    def _chunks(self, path):
+        return read_chunks(path, self.features, self.chunksize)
+
+    def _scaled_chunks(self, path):
+        self.stats["passes"] += 1
+        for X in self._chunks(path):
+            yield self.scaler.transform(X)
+
+    def _fit_incremental(self, path):
+        from sklearn.decomposition import IncrementalPCA
+
+        pca = IncrementalPCA(n_components=self.n_components)
+        pending = None  # Held back a chunk, so a short last one is fitted with it (batches need n_components rows)
+        for X in self._scaled_chunks(path):
+            if pending is not None and len(pending) >= self.n_components and len(X) >= self.n_components:
+                pca.partial_fit(pending)
+                pending = X
+            else:
+                pending = X if pending is None else np.concatenate([pending, X])
+        pca.partial_fit(pending)
+        return pca.components_, pca.explained_variance_, pca.explained_variance_ratio_
+
+    def _fit_randomized(self, path):
+        """Subspace iteration on the standardized data A, which is only ever seen chunk by chunk.
+
+        Each pass computes Z = A^T A Q for an orthonormal Q one chunk at a
+        time (d x l memory). After the last one, Q^T Z = (AQ)^T (AQ), whose
+        eigenvectors rotate Q onto the top right singular vectors of A
+        without another pass.
+        """
+        n, width = self.scaler.n_samples_seen_, len(self.features)
+        size = min(width, self.n_components + self.n_oversamples)
+        Z = np.random.default_rng(self.seed).standard_normal((width, size))
+        for _ in range(self.n_iter + 1):
+            Q, _ = np.linalg.qr(Z)
+            Z = np.zeros_like(Q)
+            for A in self._scaled_chunks(path):
+                Z += A.T @ (A @ Q)
+
+        # Each standardized column's squares sum to n, or to 0 if it is constant
+        total = n * (self.scaler.var_ / self.scaler.scale_ ** 2).sum()
+        eigenvalues, vectors = np.linalg.eigh(Q.T @ Z)
+        order = np.argsort(eigenvalues)[::-1][:self.n_components]
+        squared_singular = np.maximum(eigenvalues[order], 0)
+        return (Q @ vectors[:, order]).T, squared_singular / (n - 1), squared_singular / total
+
+    def _fit_covariance(self):
+        n = self.scaler.n_samples_seen_
+        correlation = self.scaler.correlation()
+        eigenvalues, vectors = np.linalg.eigh(correlation)
+        order = np.argsort(eigenvalues)[::-1][:self.n_components]
+        squared_singular = np.maximum(eigenvalues[order], 0)
+        return vectors[:, order].T, squared_singular / (n - 1), squared_singular / np.trace(correlation)
+
+
+def main(args):
+    features = args.features.split(",") if args.features else FEATURES
+    pca = StreamingPCA(args.components, args.method, n_iter=args.n_iter, features=features,
+                       chunksize=args.chunksize).fit(args.path)
+    print(f"✅ {pca.stats['rows']} rows, {args.method} PCA in {pca.stats['seconds']:.2f}s "
+          f"({pca.stats['passes']} passes over the file)")
+    print("Explained variance by each component:")
+    print(np.round(pca.explained_variance_ratio_ * 100, 2))
+    if args.out:
+        start = time.perf_counter()
+        rows = pca.transform_csv(args.path, args.out)
+        print(f"{', '.join(pca.columns())} of {rows} rows written to {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--method", choices=METHODS, default="incremental")
+    parser.add_argument("--components", type=int, default=2)
+    parser.add_argument("--features", help="comma-separated columns (default: Age, Annual Income, Spending Score)")
+    parser.add_argument("--n-iter", type=int, default=2, help="power iterations of the randomized method")
+    parser.add_argument("--chunksize", type=int, help="rows parsed at a time (default: fewer for wider files)")
+    parser.add_argument("--out", help="write the PCA columns here")
+    main(parser.parse_args())
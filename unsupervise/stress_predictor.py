@@ -0,0 +1,159 @@
+"""Saved, NumPy-only predictor for the stress-level model from project.ipynb.
+
+`train` fits the notebook's pipeline (LabelEncoder on stress_level,
+StandardScaler on attendance_rate and previous_gpa, LogisticRegression on
+an 80/20 split) and saves what prediction needs as a .npz artifact: the
+class labels, the scaler's mean and scale and the model's coefficients,
+with no pickled objects. StressPredictor folds the scaling into the
+coefficients, so a single student is scored with a few float operations in
+plain Python and a batch with one matrix product, without pandas or
+sklearn.
+
+    python stress_predictor.py train student_success_predictor.csv --out stress_model.npz
+    python stress_predictor.py predict --attendance-rate 0.85 --gpa 3.2
+    python stress_predictor.py score students.csv --out students_scored.csv
+"""
+import argparse
+import math
+import time
+import numpy as np
+import pandas as pd
+
+FEATURES = ["attendance_rate", "previous_gpa"]
+TARGET = "stress_level"
+PREDICTION = "predicted_stress_level"  # Column added by score_csv
+ARTIFACT = "stress_model.npz"
+CHUNKSIZE = 200_000  # Rows scored at a time by score_csv
+ARTIFACT_VERSION = 1
+
+
+def train(path, test_size=0.2, seed=42):
+    """The notebook's encoder, scaler and model fitted on the CSV at path, plus its test accuracy"""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+    data = pd.read_csv(path)
+    le = LabelEncoder()
+    y = le.fit_transform(data[TARGET])
+    scaler = StandardScaler()
+    x = pd.DataFrame(scaler.fit_transform(data[FEATURES]), columns=FEATURES)
+    X_train, X_test, y_train, y_test = train_test_split(x, y, test_size=test_size, random_state=seed)
+    model = LogisticRegression()
+    model.fit(X_train, y_train)
+    return le, scaler, model, model.score(X_test, y_test)
+
+
+def save(path, le, scaler, model):
+    """Write the fitted pipeline's parameters to path as a .npz of plain arrays"""
+    import sklearn
+
+    np.savez(path, version=ARTIFACT_VERSION, features=np.array(FEATURES),
+             labels=le.classes_[model.classes_],  # Model classes are encoded; store what they decode to
+             mean=scaler.mean_, scale=scaler.scale_, coef=model.coef_, intercept=model.intercept_,
+             sklearn_version=np.array(sklearn.__version__))
+
+
+class StressPredictor:
+    """Scores students from a saved artifact with NumPy (batches) or plain floats (one row)"""
+
+    def __init__(self, labels, mean, scale, coef, intercept, features=FEATURES):
+        self.features = list(features)
+        self.labels = np.asarray(labels)
+        coef, intercept = np.asarray(coef, dtype=np.float64), np.asarray(intercept, dtype=np.float64)
+        # (x - mean) / scale @ coef.T + intercept, with the scaling folded into the weights
+        self.weights = coef / np.asarray(scale, dtype=np.float64)
+        self.bias = intercept - self.weights @ np.asarray(mean, dtype=np.float64)
+        self.binary = len(self.weights) == 1
+        self._rows = [(float(b), *map(float, w)) for w, b in zip(self.weights, self.bias)]
+        self._labels = self.labels.tolist()
+
+    @classmethod
+    def load(cls, path=ARTIFACT):
+        with np.load(path, allow_pickle=False) as artifact:
+            if int(artifact["version"]) != ARTIFACT_VERSION:
+                raise ValueError(f"{path} is artifact version {int(artifact['version'])}, expected {ARTIFACT_VERSION}")
+            return cls(artifact["labels"], artifact["mean"], artifact["scale"], artifact["coef"],
+                       artifact["intercept"], artifact["features"].tolist())
+
+    @classmethod
+    def from_sklearn(cls, le, scaler, model):
+        return cls(le.classes_[model.classes_], scaler.mean_, scaler.scale_, model.coef_, model.intercept_)
+
+    def predict_one(self, attendance_rate, previous_gpa):
+        """Stress level of one student, computed without allocating arrays"""
+        if self.binary:
+            b, w0, w1 = self._rows[0]
+            return self._labels[1 if b + w0 * attendance_rate + w1 * previous_gpa > 0 else 0]
+        best, best_score = 0, -math.inf
+        for index, (b, w0, w1) in enumerate(self._rows):
+            score = b + w0 * attendance_rate + w1 * previous_gpa
+            if score > best_score:
+                best, best_score = index, score
+        return self._labels[best]
+
+    def decision_function(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(f"expected rows of {len(self.features)} values ({', '.join(self.features)})")
+        return X @ self.weights.T + self.bias
+
+    def predict(self, X):
+        """Stress levels of a (n, 2) array of attendance_rate, previous_gpa rows"""
+        scores = self.decision_function(X)
+        index = (scores[:, 0] > 0).astype(np.intp) if self.binary else scores.argmax(axis=1)
+        return self.labels[index]
+
+    def predict_proba(self, X):
+        """Class probabilities, columns in the order of `labels`, as LogisticRegression gives them"""
+        scores = self.decision_function(X)
+        if self.binary:
+            positive = 1 / (1 + np.exp(-scores[:, 0]))
+            return np.column_stack([1 - positive, positive])
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def score_csv(self, path, out_path, chunksize=CHUNKSIZE):
+        """Append a predicted_stress_level column to every row of path, written to out_path chunk by chunk"""
+        rows, first = 0, True
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            chunk[PREDICTION] = self.predict(chunk[self.features].to_numpy(dtype=np.float64))
+            chunk.to_csv(out_path, mode="w" if first else "a", header=first, index=False)
+            rows += len(chunk)
+            first = False
+        return rows
+
+
+def main(args):
+    if args.command == "train":
+        le, scaler, model, accuracy = train(args.path)
+        save(args.out, le, scaler, model)
+        print(f"✅ model saved to {args.out} (test accuracy {accuracy:.2f}, classes {le.classes_.tolist()})")
+    elif args.command == "predict":
+        predictor = StressPredictor.load(args.model)
+        print(f"Predicted Stress Level: {predictor.predict_one(args.attendance_rate, args.gpa)}")
+    else:
+        predictor = StressPredictor.load(args.model)
+        start = time.perf_counter()
+        rows = predictor.score_csv(args.path, args.out, args.chunksize)
+        print(f"✅ {rows} students scored in {time.perf_counter() - start:.2f}s, written to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_parser = commands.add_parser("train", help="fit the notebook's pipeline and save the artifact")
+    train_parser.add_argument("path", nargs="?", default="student_success_predictor.csv")
+    train_parser.add_argument("--out", default=ARTIFACT)
+    predict_parser = commands.add_parser("predict", help="score one student")
+    predict_parser.add_argument("--attendance-rate", type=float, required=True, help="as in the CSV, e.g. 0.85")
+    predict_parser.add_argument("--gpa", type=float, required=True, help="previous GPA (0.0-4.0)")
+    predict_parser.add_argument("--model", default=ARTIFACT)
+    score_parser = commands.add_parser("score", help="score every row of a CSV with attendance_rate and previous_gpa")
+    score_parser.add_argument("path")
+    score_parser.add_argument("--out", required=True)
+    score_parser.add_argument("--model", default=ARTIFACT)
+    score_parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    main(parser.parse_args())